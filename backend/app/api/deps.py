@@ -3,10 +3,11 @@ from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 
-from app.core.database import SessionLocal, get_db
+from app.core.database import SessionLocal, get_db, get_read_db, get_async_db, get_async_read_db
 from ..models.user import User
 from app.repositories.user_repository import UserRepository
 from app.services.role_service import RoleService
@@ -64,6 +65,54 @@ def get_current_user(
     return user
 
 
+# Decode and check the bearer token without touching the database
+def get_token_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    try:
+        payload = jwt.decode(
+            credentials.credentials,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+
+    if payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload"
+        )
+    return payload
+
+
+# Load the token's user on an AsyncSession; 401 when it no longer exists
+async def load_user_async(db: AsyncSession, claims: dict) -> User:
+    user = await db.run_sync(
+        UserRepository.get_by_email, email=claims["sub"], user_role=claims.get("role")
+    )
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return user
+
+
+# Async counterpart of get_current_user for the async read routes: the user is
+# loaded on the request's AsyncSession, so no sync pool connection is held.
+# No SET LOCAL - these routes only read, and the audit triggers fire on writes.
+async def get_current_user_async(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> User:
+    return await load_user_async(db, claims)
+
+
 # Active & authenticated user
 def get_active_user(
     current_user: User = Depends(get_current_user)
@@ -75,6 +124,16 @@ def get_active_user(
         )
     return current_user
 
+async def get_active_user_async(
+    current_user: User = Depends(get_current_user_async)
+) -> User:
+    if current_user.is_deleted or not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    return current_user
+
 def get_db_with_user(
     db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user)
@@ -105,3 +164,28 @@ def require_permission(permission_key: str):
         return current_user
 
     return _permission_guard
+
+
+# Permission guard for async routes
+def require_permission_async(permission_key: str):
+
+    async def _permission_guard(
+        current_user: User = Depends(get_active_user_async),
+        db: AsyncSession = Depends(get_async_read_db)
+    ) -> User:
+
+        has_permission = await db.run_sync(
+            RoleService.user_has_permission,
+            user_id=current_user.user_id,
+            permission_key=permission_key
+        )
+
+        if not has_permission:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Permission denied"
+            )
+
+        return current_user
+
+    return _permission_guard
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
-from app.api.deps import get_db, get_active_user, require_permission
+from app.api.deps import get_async_read_db, require_permission_async
 from app.models.audit_trail import AuditTrail
 from app.models.user import User
 from app.schemas.audit import AuditTrailList
@@ -10,12 +11,16 @@ router = APIRouter(prefix="/audit", tags=["Audit Trail"])
 
 
 @router.get("", response_model=AuditTrailList)
-def get_all_audit_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_permission("MANAGE_USERS")), 
+async def get_all_audit_logs(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(require_permission_async("MANAGE_USERS")), 
     limit: int = 100,
     offset: int = 0
 ):
+    return await db.run_sync(_list_audit_logs, limit, offset)
+
+
+def _list_audit_logs(db: Session, limit: int, offset: int) -> dict:
     raw_items = db.query(
         AuditTrail.action_id,
         AuditTrail.user_id,
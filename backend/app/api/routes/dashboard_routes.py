@@ -1,15 +1,39 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from app.api.deps import get_db, get_active_user
+from app.api.deps import get_active_user_async, get_token_claims, load_user_async
 from app.models.log_entries import LogEntry, LogSeverity, LogCategory
 from app.models.raw_file import RawFile
+from app.services.dashboard_cache import DashboardCache
+from app.services.rollup_service import RollupService
 from datetime import datetime, date, time
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 @router.get("/summary")
-def get_dashboard_summary(db: Session = Depends(get_db), current_user = Depends(get_active_user)):
+async def get_dashboard_summary(
+    request: Request,
+    response: Response,
+    claims: dict = Depends(get_token_claims)
+):
+    # 1. Revalidation: a current ETag gets its 304 from memory once the token
+    # verifies - no session is opened - as long as the user passed the full
+    # active-user check recently (see DashboardCache.not_modified)
+    not_modified = DashboardCache.not_modified("global", request, claims.get("user_id"))
+    if not_modified is not None:
+        return not_modified
+
+    # 2. Load the user, then serve the cached payload or a fresh build; a miss
+    # runs the sync query code on the asyncpg connection via run_sync (on the
+    # primary while a recent change may not have reached the replica)
+    factory = await DashboardCache.build_sessionmaker("global")
+    async with factory() as db:
+        current_user = await get_active_user_async(await load_user_async(db, claims))
+        DashboardCache.mark_active(current_user.user_id)
+        return await DashboardCache.respond("global", request, response, lambda: db.run_sync(_build_summary))
+
+
+def _build_summary(db: Session) -> dict:
     today = date.today()
 
     # Create "Today" range in UTC (or your local timezone)
@@ -20,44 +44,58 @@ def get_dashboard_summary(db: Session = Depends(get_db), current_user = Depends(
     files_uploaded_today = db.query(func.count(RawFile.file_id))\
         .filter(RawFile.uploaded_at >= today_start)\
         .filter(RawFile.uploaded_at <= today_end)\
+        .filter(RawFile.is_pending_delete.is_(False))\
         .scalar() or 0
         
+    # Log counts come from the hourly rollups rather than a scan of log_entries;
+    # files awaiting background deletion are already netted out of them, so
+    # groups that only held such files sum to 0 and are left out
+    counts = RollupService.visible_counts()
+    log_count = func.sum(counts.c.log_count)
+
     # 2. Security Logs (Count of logs in the 'SECURITY' category)
-    security_logs_count = db.query(func.count(LogEntry.log_id))\
-        .join(LogCategory)\
-        .filter(LogCategory.category_name == 'SECURITY').scalar() or 0
+    security_logs_count = int(db.query(log_count).select_from(counts)\
+        .join(LogCategory, counts.c.category_id == LogCategory.category_id)\
+        .filter(LogCategory.category_name == 'SECURITY').scalar() or 0)
 
     # 3. Severity Distribution (for the Pie Chart)
     severity_dist = db.query(
         LogSeverity.severity_code.label("name"),
-        func.count(LogEntry.log_id).label("value")
-    ).join(LogSeverity)\
-     .group_by(LogSeverity.severity_code).all()
+        log_count.label("value")
+    ).select_from(counts)\
+     .join(LogSeverity, counts.c.severity_id == LogSeverity.severity_id)\
+     .group_by(LogSeverity.severity_code)\
+     .having(log_count > 0).all()
 
     # 4. Most Active Systems (for the list)
     active_systems = db.query(
         LogCategory.category_name.label("system"),
-        func.count(LogEntry.log_id).label("count")
-    ).join(LogCategory)\
+        log_count.label("count")
+    ).select_from(counts)\
+     .join(LogCategory, counts.c.category_id == LogCategory.category_id)\
      .group_by(LogCategory.category_name)\
+     .having(log_count > 0)\
      .order_by(desc("count")).limit(5).all()
 
     # 5. Last 7 Days Trend (for the Line Chart)
+    trend_day = func.date(counts.c.bucket_hour)
     logs_trend = db.query(
-        func.date(LogEntry.log_timestamp).label("date"),
-        func.count(LogEntry.log_id).label("count")
-    ).group_by(func.date(LogEntry.log_timestamp))\
-     .order_by(func.date(LogEntry.log_timestamp)).limit(7).all()
+        trend_day.label("date"),
+        log_count.label("count")
+    ).group_by(trend_day)\
+     .having(log_count > 0)\
+     .order_by(trend_day).limit(7).all()
 
     # 6. Last Uploaded File Info
-    last_file = db.query(RawFile).order_by(desc(RawFile.uploaded_at)).first()
+    last_file = db.query(RawFile).filter(RawFile.is_pending_delete.is_(False))\
+        .order_by(desc(RawFile.uploaded_at)).first()
 
     return {
        "files_uploaded_today": files_uploaded_today,
         "security_logs_count": security_logs_count,
-        "severity_distribution": [{"name": s.name, "value": s.value} for s in severity_dist],
-        "active_systems": [{"system": a.system, "count": a.count} for a in active_systems],
-        "logs_trend": [{"date": str(t.date), "count": t.count} for t in logs_trend],
+        "severity_distribution": [{"name": s.name, "value": int(s.value)} for s in severity_dist],
+        "active_systems": [{"system": a.system, "count": int(a.count)} for a in active_systems],
+        "logs_trend": [{"date": str(t.date), "count": int(t.count)} for t in logs_trend],
         "last_file": {
             "name": last_file.original_name,
             "at": last_file.uploaded_at,
@@ -71,19 +109,40 @@ def get_dashboard_summary(db: Session = Depends(get_db), current_user = Depends(
     
 
 @router.get("/user-summary")
-def get_user_dashboard_summary(
-    db: Session = Depends(get_db), 
-    current_user = Depends(get_active_user)
+async def get_user_dashboard_summary(
+    request: Request,
+    response: Response,
+    claims: dict = Depends(get_token_claims)
 ):
+    # 1. Revalidation from memory, scoped by the token's user_id (see get_dashboard_summary)
+    if claims.get("user_id") is not None:
+        not_modified = DashboardCache.not_modified(("user", claims["user_id"]), request, claims["user_id"])
+        if not_modified is not None:
+            return not_modified
+
+    # 2. Load the user and serve the cached payload or a fresh build
+    factory = await DashboardCache.build_sessionmaker(("user", claims.get("user_id")))
+    async with factory() as db:
+        current_user = await get_active_user_async(await load_user_async(db, claims))
+        DashboardCache.mark_active(current_user.user_id)
+        return await DashboardCache.respond(
+            ("user", current_user.user_id), request, response,
+            lambda: db.run_sync(_build_user_summary, current_user)
+        )
+
+
+def _build_user_summary(db: Session, current_user) -> dict:
     # 1. Total Logs uploaded by THIS user (via their files)
     total_logs = db.query(func.count(LogEntry.log_id))\
         .join(RawFile)\
-        .filter(RawFile.uploaded_by == current_user.user_id).scalar() or 0
+        .filter(RawFile.uploaded_by == current_user.user_id)\
+        .filter(RawFile.is_pending_delete.is_(False)).scalar() or 0
 
     # 2. Security Logs uploaded by THIS user
     security_logs = db.query(func.count(LogEntry.log_id))\
         .join(RawFile).join(LogCategory)\
         .filter(RawFile.uploaded_by == current_user.user_id)\
+        .filter(RawFile.is_pending_delete.is_(False))\
         .filter(LogCategory.category_name == 'SECURITY').scalar() or 0
 
     # 3. Severity Summaries (Errors, Warnings, Info)
@@ -93,6 +152,7 @@ def get_user_dashboard_summary(
     ).join(LogEntry, LogEntry.severity_id == LogSeverity.severity_id)\
      .join(RawFile, LogEntry.file_id == RawFile.file_id)\
      .filter(RawFile.uploaded_by == current_user.user_id)\
+     .filter(RawFile.is_pending_delete.is_(False))\
      .group_by(LogSeverity.severity_code).all()
 
     # Convert to a dictionary for easy frontend access: {"ERROR": 5, "INFO": 10...}
@@ -101,6 +161,7 @@ def get_user_dashboard_summary(
     # 4. Recent File info
     last_file = db.query(RawFile)\
         .filter(RawFile.uploaded_by == current_user.user_id)\
+        .filter(RawFile.is_pending_delete.is_(False))\
         .order_by(desc(RawFile.uploaded_at)).first()
 
     return {
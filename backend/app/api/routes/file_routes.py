@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text, desc, func
 from app.api.deps import get_db, get_active_user, require_permission
@@ -9,6 +9,9 @@ from app.schemas.file import (
     FileListResponse,
     FileFilter
 )
+from app.services.archive_service import ArchiveService
+from app.services.dashboard_cache import DashboardCache
+from app.services.file_deletion_service import FileDeletionService
 from app.services.file_service import FileService
 from app.repositories.file_repository import FileRepository
 from app.services.team_service import TeamService
@@ -59,6 +62,8 @@ def get_all_files(
     environment: str = Query(None),
     category: str = Query(None),
     start_date: str = Query(None),
+    end_date: str = Query(None),
+    tz: Optional[str] = Query(None),
     limit: int = 50,
     offset: int = 0
 ):
@@ -71,23 +76,29 @@ def get_all_files(
             return {"total": 0, "items": []}
 
     # Use repository which handles the complex joins (User, Team, Format)
-    items = FileRepository.list_files(
-        db, team_id=team_id, search=search, severity=severity,
-        environment=environment, category=category, start_date=start_date,
-        limit=limit, offset=offset
-    )
+    try:
+        items = FileRepository.list_files(
+            db, team_id=team_id, search=search, severity=severity,
+            environment=environment, category=category, start_date=start_date,
+            end_date=end_date, tz=tz, limit=limit, offset=offset
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     
     total = FileRepository.count_files(db, team_id=team_id)
     return {"total": total, "items": items}
 
 # 3. Secure Delete Route
-@router.delete("/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
+# The file is hidden at once and its rows are removed in the background;
+# GET /files/{file_id}/delete-status reports progress until it is gone
+@router.delete("/{file_id}", status_code=status.HTTP_202_ACCEPTED)
 def delete_file_permanently(
     file_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_active_user)
 ):
-    file = db.query(RawFile).filter(RawFile.file_id == file_id).first()
+    file = db.query(RawFile).filter(RawFile.file_id == file_id).with_for_update().first()
     if not file:
         raise HTTPException(status_code=404, detail="File not found")
 
@@ -95,42 +106,53 @@ def delete_file_permanently(
     if current_user.user_role != "ADMIN" and file.uploaded_by != current_user.user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this file")
 
-    try:
-        db.execute(text(f"SET app.current_user_id = '{current_user.user_id}'"))
-        
-        # Cleanup children to avoid ForeignKey errors
-        db.query(LogEntry).filter(LogEntry.file_id == file_id).delete(synchronize_session=False)
-        db.query(Archive).filter(Archive.file_id == file_id).delete(synchronize_session=False)
-        db.flush() 
-
-        db.delete(file)
-        db.commit()
-        return None
-    except Exception as e:
+    # A repeated request reports the deletion already under way (and restarts
+    # its purge if that was interrupted; purges of one file never overlap)
+    if file.is_pending_delete:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    else:
+        try:
+            FileDeletionService.request_delete(db, file, current_user.user_id)
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-# 4. Manual Archive
-@router.patch("/{file_id}/archive", status_code=status.HTTP_200_OK)
+    background_tasks.add_task(FileDeletionService.purge_in_background, file_id)
+    return FileDeletionService.status(file)
+
+# 3b. Background deletion progress
+@router.get("/{file_id}/delete-status")
+def get_delete_status(
+    file_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_active_user)
+):
+    file = db.query(RawFile).filter(RawFile.file_id == file_id).first()
+    # Once the purge finishes the file no longer exists
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+    if current_user.user_role != "ADMIN" and file.uploaded_by != current_user.user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this file")
+    if not file.is_pending_delete:
+        raise HTTPException(status_code=409, detail="File is not being deleted")
+    return FileDeletionService.status(file)
+
+# 4. Manual Archive (export and purge run after the response; the file shows
+# is_archived once its rows are in the Parquet file)
+@router.patch("/{file_id}/archive", status_code=status.HTTP_202_ACCEPTED)
 def manual_archive_file(
     file_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("ARCHIVE_LOG"))
 ):
     file = db.query(RawFile).filter(RawFile.file_id == file_id).first()
-    if not file or file.is_archived:
+    if not file or file.is_archived or file.is_pending_delete:
         raise HTTPException(status_code=400, detail="File not found or already archived")
 
-    try:
-        db.execute(text(f"SET app.current_user_id = '{current_user.user_id}'"))
-        file.is_archived = True
-        log_count = db.query(LogEntry).filter(LogEntry.file_id == file_id).count()
-        db.add(Archive(file_id=file_id, total_records=log_count))
-        db.commit()
-        return {"message": "File manually archived"}
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+    # The task re-checks under a row lock, so a repeated request is a no-op
+    background_tasks.add_task(ArchiveService.archive_in_background, file_id, current_user.user_id)
+    return {"message": "File archiving started", "file_id": file_id}
 
 # 5. List My Files (User Dashboard View)
 @router.get("/me", response_model=FileListResponse)
@@ -154,7 +176,8 @@ def get_user_files(
     query = db.query(
         RawFile,
         User.username.label("uploader_name")
-    ).outerjoin(User, RawFile.uploaded_by == User.user_id)
+    ).outerjoin(User, RawFile.uploaded_by == User.user_id) \
+     .filter(RawFile.is_pending_delete.is_(False))
 
     # 3. APPLY THE EXCLUSION LOGIC
     if scope == "me":
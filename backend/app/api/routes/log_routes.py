@@ -1,19 +1,29 @@
+import re
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Optional
 
-from app.api.deps import get_db, get_active_user, require_permission
+from app.api.deps import get_db, get_read_db, get_async_read_db, get_active_user, get_active_user_async, require_permission
 from app.models.user import User
 from app.schemas.log import (
     LogCreate,
     LogBulkCreate,
     LogListResponse
 )
+from app.services.dashboard_cache import DashboardCache
+from app.services.file_stats_service import FileStatsService
+from app.services.log_export_service import LogExportService
 from app.services.log_service import LogService
+from app.services.rollup_service import RollupService
 from app.models.log_entries import LogEntry
-from app.repositories.log_repository import LogRepository
+from app.core.time_range import resolve_range
+from app.repositories.log_repository import FACET_COLUMNS, LogRepository, decode_cursor, encode_cursor
 from app.models.raw_file import RawFile
 from pydantic import BaseModel
 
@@ -22,82 +32,188 @@ router = APIRouter(
     tags=["Logs"]
 )
 
+# Postgres SQLSTATE for a pattern its regex engine cannot compile
+INVALID_REGULAR_EXPRESSION = "2201B"
+
+
+def _validate_search(db: Session, search: Optional[str], search_mode: str):
+    # Reject malformed patterns up front instead of letting the query raise a 500.
+    # Postgres itself compiles the pattern, since it runs as a POSIX ARE (~*):
+    # Python's re accepts syntax such as (?P<name>...) that Postgres rejects.
+    # The savepoint keeps a failure from aborting the request's transaction.
+    if search_mode == "regex" and search:
+        savepoint = db.begin_nested()
+        try:
+            db.execute(text("SELECT '' ~* :pattern"), {"pattern": search})
+            savepoint.commit()
+        except DBAPIError as exc:
+            savepoint.rollback()
+            # psycopg2 exposes the SQLSTATE as pgcode, asyncpg as sqlstate
+            code = getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+            if code != INVALID_REGULAR_EXPRESSION:
+                raise
+            reason = re.search(r"invalid regular expression: ([^\n]*)", str(exc.orig))
+            raise HTTPException(status_code=400, detail=f"Invalid regex: {reason.group(1) if reason else search}")
+
+
+def _validate_cursor(cursor: Optional[str]):
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _validate_range(start_date: Optional[str], end_date: Optional[str], tz: Optional[str]):
+    # Bad dates or unknown timezones are client errors, not 500s
+    try:
+        resolve_range(start_date, end_date, tz)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _parse_facets(facets: Optional[str]) -> Optional[List[str]]:
+    # "severity,category" -> ["severity", "category"]; unknown names are client errors
+    if not facets or not facets.strip():
+        return None
+    names = list(dict.fromkeys(name.strip().lower() for name in facets.split(",") if name.strip()))
+    unknown = [name for name in names if name not in FACET_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown facet(s): {', '.join(unknown)}; use {', '.join(FACET_COLUMNS)}"
+        )
+    return names
+
+
+def _next_cursor(items: list, limit: int, has_more: Optional[bool] = None) -> Optional[str]:
+    # A full page means there may be more rows; point the cursor at its last row.
+    # The window / has_more count modes know for sure, which saves a final empty page.
+    if not items or len(items) < limit or has_more is False:
+        return None
+    last = items[-1]
+    return encode_cursor(last["log_timestamp"], last["log_id"])
+
+
+# Every LogListResponse field at its default, for the fields a page leaves out
+PAGE_DEFAULTS = LogListResponse(total=0, items=[]).model_dump()
+
+
+def _page_response(page: dict, limit: int) -> ORJSONResponse:
+    # Items are already plain dicts in LogResponse shape, so skip the
+    # response_model round trip and encode them straight away with orjson
+    next_cursor = _next_cursor(page["items"], limit, page.get("has_more"))
+    return ORJSONResponse({**PAGE_DEFAULTS, **page, "next_cursor": next_cursor})
+
+
+def _empty_page() -> ORJSONResponse:
+    return ORJSONResponse(PAGE_DEFAULTS)
+
+
 # 1. GET ALL LOGS (Admin & General Query)
 @router.get("", response_model=LogListResponse)
-def get_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_active_user),
+async def get_logs(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_active_user_async),
     search: str = Query(None),
+    search_mode: str = Query("auto", pattern="^(auto|text|substring|regex)$"),
     severity_code: Optional[str] = Query(None),
     environment_code: Optional[str] = Query(None),
     category_name: Optional[str] = Query(None),
     team_id: Optional[int] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    tz: Optional[str] = Query(None),
     limit: int = 10,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = Query(None),
+    count_mode: str = Query("exact", pattern="^(exact|estimate|capped|cached|window|has_more)$"),
+    include_archived: bool = Query(False),
+    facets: Optional[str] = Query(None)
 ):
     """
     Main endpoint for Log Explorer. 
     Admin: Sees all logs by default, can filter by team_id.
     User: Strictly restricted to their own team's logs.
+    search_mode: auto (full-text for word queries, substring otherwise),
+    text (full-text: "phrase", prefix*, OR, -word), substring or regex.
+    Pagination: limit/offset, or pass the previous page's next_cursor as
+    `cursor` for constant-cost deep paging (offset is then ignored).
+    count_mode: how `total` is computed - exact, estimate (planner guess),
+    capped (exact up to a limit, then "N+") or cached (short-TTL exact count).
+    window returns page and total in one query; has_more skips the total
+    and only reports whether another page exists.
+    start_date / end_date: dates (end day inclusive) or ISO datetimes (end
+    exclusive), read in `tz` (IANA name, default UTC) unless they carry an offset.
+    include_archived: also search archived files' cold-tier copies, merged
+    into the same timestamp order (slower; meant for occasional lookups).
+    facets: comma-separated severity, category, environment - adds value
+    counts over all matching rows (not just the page) in one extra query;
+    with include_archived they count archived rows too.
     """
+    await db.run_sync(_validate_search, search, search_mode)
+    _validate_cursor(cursor)
+    _validate_range(start_date, end_date, tz)
+    facet_names = _parse_facets(facets)
     target_user_id = None
     target_team_id = team_id
 
     if current_user.user_role != "ADMIN":
         from app.services.team_service import TeamService
         try:
-            team = TeamService.get_active_team_for_user(db, user_id=current_user.user_id)
+            team = await db.run_sync(TeamService.get_active_team_for_user, user_id=current_user.user_id)
             target_team_id = team.team_id
         except ValueError:
-            return {"total": 0, "items": []}
+            return _empty_page()
     
-    
-    items = LogRepository.list_logs(
-        db, 
+    # The sync repository code runs on the asyncpg connection via run_sync and
+    # archive files are read on a thread pool, so the event loop stays free
+    page = await LogService.list_logs_page_async(
+        db,
+        count_mode=count_mode,
         team_id=target_team_id, 
         user_id=target_user_id, 
         search=search,
+        search_mode=search_mode,
         severity_code=severity_code, 
         environment_code=environment_code,
         category_name=category_name, 
         start_date=start_date, 
         end_date=end_date,
+        tz=tz,
         limit=limit, 
-        offset=offset
-    )
-    
-    total = LogRepository.count_logs(
-        db, 
-        team_id=target_team_id, 
-        user_id=target_user_id,
-        search=search,
-        severity_code=severity_code,
-        environment_code=environment_code,
-        category_name=category_name,
-        start_date=start_date,
-        end_date=end_date
+        offset=offset,
+        cursor=cursor,
+        include_archived=include_archived,
+        facets=facet_names
     )
     
-    return {"total": total, "items": items}
+    return _page_response(page, limit)
 
 
 # 2. GET MY LOGS (User Scoped Toggle: Me vs Team)
 @router.get("/me/entries", response_model=LogListResponse)
-def get_user_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_active_user),
+async def get_user_logs(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: User = Depends(get_active_user_async),
     scope: str = Query("me", pattern="^(me|team)$"),
     search: str = Query(None),
+    search_mode: str = Query("auto", pattern="^(auto|text|substring|regex)$"),
     severity_code: str = Query(None),
     environment_code: str = Query(None),
     category_name: str = Query(None),
     start_date: str = Query(None),
     end_date: str = Query(None),
+    tz: Optional[str] = Query(None),
     limit: int = 10,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = Query(None),
+    count_mode: str = Query("exact", pattern="^(exact|estimate|capped|cached|window|has_more)$")
 ):
+    await db.run_sync(_validate_search, search, search_mode)
+    _validate_cursor(cursor)
+    _validate_range(start_date, end_date, tz)
+
     # Initialize targets as None
     target_user_id = None
     target_team_id = None
@@ -106,42 +222,36 @@ def get_user_logs(
         target_user_id = current_user.user_id
     else:
         from app.models.user_teams import UserTeam
-        membership = db.query(UserTeam).filter(
-            UserTeam.user_id == current_user.user_id, 
-            UserTeam.is_active == True
-        ).first()
+        membership = (await db.execute(
+            select(UserTeam).where(
+                UserTeam.user_id == current_user.user_id, 
+                UserTeam.is_active == True
+            )
+        )).scalars().first()
         
         if not membership:
-            return {"total": 0, "items": []}
+            return _empty_page()
         target_team_id = membership.team_id
 
-    items = LogRepository.list_logs(
-        db, 
+    page = await LogService.list_logs_page_async(
+        db,
+        count_mode=count_mode,
         user_id=target_user_id,
         team_id=target_team_id, 
         search=search,
+        search_mode=search_mode,
         severity_code=severity_code, 
         category_name=category_name, 
         environment_code=environment_code, 
         start_date=start_date, 
         end_date=end_date, 
+        tz=tz,
         limit=limit, 
-        offset=offset
-    )
-    
-    total = LogRepository.count_logs(
-        db, 
-        user_id=target_user_id, 
-        team_id=target_team_id, 
-        search=search,
-        severity_code=severity_code, 
-        category_name=category_name, 
-        environment_code=environment_code, 
-        start_date=start_date, 
-        end_date=end_date
+        offset=offset,
+        cursor=cursor
     )
 
-    return {"total": total, "items": items}
+    return _page_response(page, limit)
 
 # 3. LOG MANAGEMENT (Upload/Delete)
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -158,11 +268,16 @@ def add_log(
 
 @router.delete("/{log_id}", status_code=204)
 def delete_log(log_id: int, db: Session = Depends(get_db), current_user: User = Depends(require_permission("DELETE_LOG"))):
-    log = db.query(LogEntry).filter(LogEntry.log_id == log_id).first()
+    log = db.query(
+        LogEntry.log_id, LogEntry.file_id, LogEntry.team_id, LogEntry.uploaded_by,
+        LogEntry.severity_id, LogEntry.category_id, LogEntry.environment_id
+    ).filter(LogEntry.log_id == log_id).first()
     if not log:
         raise HTTPException(status_code=404, detail="Log not found")
-    db.delete(log)
+    RollupService.delete_log(db, log_id)
+    FileStatsService.remove_log(db, log.file_id, log.severity_id, log.category_id, log.environment_id)
     db.commit()
+    DashboardCache.invalidate(team_id=log.team_id, user_id=log.uploaded_by)
     return None
 
 
@@ -174,6 +289,63 @@ class EnvironmentResponse(BaseModel):
     class Config: from_attributes = True
 
 @router.get("/environments", response_model=list[EnvironmentResponse])
-def get_environments(db: Session = Depends(get_db)):
+def get_environments(db: Session = Depends(get_read_db)):
     from app.models.log_entries import Environment
-    return db.query(Environment).all()
\ No newline at end of file
+    return db.query(Environment).all()
+
+# 5. EXPORT (streamed CSV / NDJSON)
+@router.get("/export")
+def export_logs(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_active_user),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False),
+    search: str = Query(None),
+    search_mode: str = Query("auto", pattern="^(auto|text|substring|regex)$"),
+    severity_code: Optional[str] = Query(None),
+    environment_code: Optional[str] = Query(None),
+    category_name: Optional[str] = Query(None),
+    team_id: Optional[int] = Query(None),
+    file_id: Optional[int] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    tz: Optional[str] = Query(None)
+):
+    """
+    Every log matching the Log Explorer filters, streamed as CSV or NDJSON
+    (optionally gzipped). Scoping follows GET /logs: non-admins only export
+    their active team's logs.
+    """
+    _validate_search(db, search, search_mode)
+    _validate_range(start_date, end_date, tz)
+    target_team_id = team_id
+
+    if current_user.user_role != "ADMIN":
+        from app.services.team_service import TeamService
+        try:
+            team = TeamService.get_active_team_for_user(db, user_id=current_user.user_id)
+            target_team_id = team.team_id
+        except ValueError:
+            raise HTTPException(status_code=403, detail="No active team")
+
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    filename = LogExportService.filename(format, gzip, stamp)
+
+    return StreamingResponse(
+        LogExportService.stream(
+            format,
+            gzip=gzip,
+            team_id=target_team_id,
+            file_id=file_id,
+            search=search,
+            search_mode=search_mode,
+            severity_code=severity_code,
+            environment_code=environment_code,
+            category_name=category_name,
+            start_date=start_date,
+            end_date=end_date,
+            tz=tz
+        ),
+        media_type=LogExportService.media_type(format, gzip),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, require_permission
+from app.models.user import User
+from app.schemas.retention import (
+    RetentionPolicyCreate,
+    RetentionPolicyUpdate,
+    RetentionPolicyResponse
+)
+from app.services.maintenance_service import request_maintenance
+from app.services.retention_service import RetentionService
+
+
+router = APIRouter(
+    prefix="/retention-policies",
+    tags=["Retention"]
+)
+
+
+# Create policy (ADMIN)
+@router.post(
+    "",
+    response_model=RetentionPolicyResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def create_policy(
+    payload: RetentionPolicyCreate,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("MANAGE_USERS"))
+):
+    try:
+        return RetentionService.create_policy(
+            db,
+            team_id=payload.team_id,
+            environment_code=payload.environment_code,
+            severity_code=payload.severity_code,
+            retain_days=payload.retain_days
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+# List policies with their last run (ADMIN)
+@router.get(
+    "",
+    response_model=list[RetentionPolicyResponse]
+)
+def list_policies(
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("MANAGE_USERS"))
+):
+    return RetentionService.list_policies(db)
+
+
+# Change retention period / enable or disable (ADMIN)
+@router.patch(
+    "/{policy_id}",
+    response_model=RetentionPolicyResponse
+)
+def update_policy(
+    policy_id: int,
+    payload: RetentionPolicyUpdate,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("MANAGE_USERS"))
+):
+    try:
+        return RetentionService.update_policy(
+            db,
+            policy_id,
+            retain_days=payload.retain_days,
+            is_active=payload.is_active
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+
+
+# Delete policy (ADMIN)
+@router.delete("/{policy_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_policy(
+    policy_id: int,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_permission("MANAGE_USERS"))
+):
+    try:
+        RetentionService.delete_policy(db, policy_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    return None
+
+
+# Run a maintenance pass (retention included) now instead of waiting for the loop (ADMIN)
+@router.post("/run", status_code=status.HTTP_202_ACCEPTED)
+def run_retention(
+    _: User = Depends(require_permission("MANAGE_USERS"))
+):
+    # The pass runs on the maintenance thread, under its advisory lock, so it never
+    # overlaps a scheduled one or holds a request worker through its pacing and lag waits
+    if not request_maintenance():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Maintenance loop is not running")
+    return {"message": "Retention pass requested; results appear on each policy's last_run_* fields"}
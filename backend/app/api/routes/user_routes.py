@@ -18,6 +18,7 @@ from app.models.login_history import UserLoginHistory
 from app.models.raw_file import RawFile
 from app.models.user_credentials import UserCredential
 from app.services.team_service import TeamService
+from app.services.dashboard_cache import DashboardCache
 
 
 router = APIRouter(
@@ -167,6 +168,7 @@ def delete_user(
         # Postgres will automatically keep the files but set uploaded_by to NULL.
         db.delete(user)
         db.commit()
+        DashboardCache.revoke_user(user_id)
         return None
     except Exception as e:
         db.rollback()
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with per-entry expiry.
+    Used for short-lived query results such as log counts.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            if len(self._data) > self.max_entries:
+                self._evict()
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self):
+        # Drop expired entries first, then the oldest inserts
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+            del self._data[key]
+        while len(self._data) > self.max_entries:
+            del self._data[next(iter(self._data))]
+
+
+class VersionCounter:
+    """
+    Per-scope change counters. Writers bump the scopes they touched; readers
+    fold the current version into cache keys and ETags, so a bump retires
+    every cached value for that scope at once.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._bumped_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, scope: Hashable) -> int:
+        with self._lock:
+            return self._versions.get(scope, 0)
+
+    def bump(self, *scopes: Hashable):
+        with self._lock:
+            now = time.monotonic()
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+                self._bumped_at[scope] = now
+
+    # True when the scope was bumped less than `seconds` ago
+    def changed_within(self, scope: Hashable, seconds: float) -> bool:
+        with self._lock:
+            bumped_at = self._bumped_at.get(scope)
+            return bumped_at is not None and time.monotonic() - bumped_at < seconds
@@ -16,7 +16,7 @@ def create_access_token(data: dict) -> str:
 
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Database Settings
@@ -26,12 +26,71 @@ class Settings(BaseSettings):
     DB_PORT: int
     DB_NAME: str
     # DATABASE_URL: str
+
+    # asyncpg pool behind the async read endpoints (get_async_db / get_async_read_db)
+    DB_ASYNC_POOL_SIZE: int = 20
+    DB_ASYNC_MAX_OVERFLOW: int = 30
+
+    # Optional read replica for query / dashboard endpoints (see get_read_db).
+    # Unset host = everything uses the primary; other unset fields reuse the primary's.
+    DB_REPLICA_HOST: Optional[str] = None
+    DB_REPLICA_PORT: Optional[int] = None
+    DB_REPLICA_USER: Optional[str] = None
+    DB_REPLICA_PASSWORD: Optional[str] = None
+    DB_REPLICA_NAME: Optional[str] = None
+    # Reads fall back to the primary while the replica is further behind than this
+    DB_REPLICA_MAX_LAG_SECONDS: float = 30
+    # How long a replica lag / health check result is reused
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 10
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 300
- 
+
+    # Ingestion
+    # Parsed rows are flushed to the DB whenever a job's buffer reaches this size
+    INGEST_MEMORY_BUDGET_MB: int = 64
+    # Rows per pandas chunk on the vectorised CSV path
+    INGEST_CSV_CHUNK_ROWS: int = 50000
+    # Upper bound for one multi-line event (e.g. a stack trace) in text logs
+    INGEST_MAX_EVENT_LINES: int = 200
+    INGEST_MAX_EVENT_CHARS: int = 65536
+
+    # log_entries partitioning
+    LOG_PARTITION_INTERVAL: str = "month"  # "month" or "day"
+    LOG_PARTITION_PREMAKE: int = 3  # upcoming partitions kept ready
+    LOG_PARTITION_RETENTION_DAYS: Optional[int] = None  # detach older partitions; None keeps everything
+    MAINTENANCE_INTERVAL_MINUTES: int = 60
+
+    # Rows removed per transaction by the background purge behind DELETE /files/{id}
+    FILE_DELETE_BATCH_ROWS: int = 5000
+
+    # Retention enforcement (retention_policies, run from the maintenance loop)
+    RETENTION_BATCH_ROWS: int = 5000  # rows deleted per transaction
+    RETENTION_BATCH_PAUSE_SECONDS: float = 0.2  # sleep between batches to spread WAL
+    RETENTION_MAX_REPLICATION_LAG_SECONDS: float = 30  # pause while any standby is further behind
+    RETENTION_LAG_WAIT_SECONDS: float = 300  # give up the pass after waiting this long for standbys
+    RETENTION_MAX_ROWS_PER_RUN: int = 1000000  # per pass; the rest waits for the next pass
+
+    # Rows fetched per server-side cursor batch by GET /logs/export
+    LOG_EXPORT_BATCH_ROWS: int = 5000
+
+    # Cold-tier archives (zstd Parquet under uploads/archives)
+    LOG_ARCHIVE_ROW_GROUP_ROWS: int = 50000  # rows per Parquet row group
+    LOG_ARCHIVE_DELETE_BATCH_ROWS: int = 5000  # hot rows removed per transaction after export
+    LOG_ARCHIVE_SCAN_WORKERS: int = 4  # threads reading archive files for GET /logs?include_archived (process-wide)
+
+    # Timezone for date-only filters when the request gives none (IANA name)
+    DEFAULT_TIMEZONE: str = "UTC"
+
+    # Log listing totals (count_mode=capped / cached)
+    LOG_COUNT_CAP: int = 10000
+    LOG_COUNT_CACHE_TTL_SECONDS: int = 30
+
+    # Dashboard payload cache (also invalidated on ingest / delete / archive)
+    DASHBOARD_CACHE_TTL_SECONDS: int = 60
+
     # Add this field so the property below works
     CORS_ORIGINS: str = "http://localhost:5173,https://intelligent-log-system.vercel.app,http://localhost:8000,https://intelligent-log-management-system.onrender.com,http://192.168.0.193:5173,http://127.0.0.1:8000,*"
     
@@ -2,10 +2,14 @@ import os
 from dotenv import load_dotenv
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from sqlalchemy import event, text
 from sqlalchemy.orm import Session
+import asyncio
+import threading
+import time
 import urllib
 from .config import settings
 # Load environment variables from .env
@@ -39,6 +43,61 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine (asyncpg) for the async read endpoints; same database as `engine`
+ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{settings.DB_USER}:{password}@"
+    f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"ssl": "require"},
+    pool_pre_ping=True,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Optional read replica (DB_REPLICA_HOST); None when not configured
+ReplicaSessionLocal = None
+replica_engine = None
+AsyncReplicaSessionLocal = None
+
+if settings.DB_REPLICA_HOST:
+    replica_password = urllib.parse.quote_plus(settings.DB_REPLICA_PASSWORD or settings.DB_PASSWORD)
+    replica_location = (
+        f"{settings.DB_REPLICA_USER or settings.DB_USER}:{replica_password}@"
+        f"{settings.DB_REPLICA_HOST}:{settings.DB_REPLICA_PORT or settings.DB_PORT}/"
+        f"{settings.DB_REPLICA_NAME or settings.DB_NAME}"
+    )
+    replica_engine = create_engine(
+        f"postgresql+psycopg2://{replica_location}?sslmode=require",
+        connect_args={"sslmode": "require", "connect_timeout": 5},
+        pool_pre_ping=True
+    )
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=replica_engine
+    )
+    async_replica_engine = create_async_engine(
+        f"postgresql+asyncpg://{replica_location}",
+        connect_args={"ssl": "require", "timeout": 5},
+        pool_pre_ping=True,
+        pool_size=settings.DB_ASYNC_POOL_SIZE,
+        max_overflow=settings.DB_ASYNC_MAX_OVERFLOW
+    )
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        async_replica_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
 # Base class for all ORM models
 Base = declarative_base()
 
@@ -50,5 +109,90 @@ def get_db():
         yield db
     finally:
         db.close()
-        
 
+
+# Attribute the current transaction's writes to `user_id` in the audit triggers.
+# Transaction-local, so the id never outlives the commit on a pooled connection;
+# code that commits in batches calls this again at the start of each batch.
+def set_audit_user(db: Session, user_id):
+    db.execute(text("SELECT set_config('app.current_user_id', :user_id, true)"), {"user_id": str(user_id)})
+
+
+# Replay lag in seconds; 0 when the replica has replayed everything it received
+# (an idle primary would otherwise look like ever-growing lag)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_replica_state = {"checked_at": 0.0, "usable": False, "lag": None}
+_replica_lock = threading.Lock()
+
+
+def replica_status() -> dict:
+    """
+    Cached replica health: {"usable", "lag", "checked_at"}.
+    Re-checked at most every DB_REPLICA_CHECK_INTERVAL_SECONDS; an unreachable
+    replica or one lagging past DB_REPLICA_MAX_LAG_SECONDS is not usable.
+    """
+    if replica_engine is None:
+        return {"usable": False, "lag": None, "checked_at": None}
+
+    with _replica_lock:
+        now = time.monotonic()
+        if now - _replica_state["checked_at"] >= settings.DB_REPLICA_CHECK_INTERVAL_SECONDS:
+            try:
+                with replica_engine.connect() as conn:
+                    lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+                _replica_state.update(usable=lag <= settings.DB_REPLICA_MAX_LAG_SECONDS, lag=lag)
+            except Exception as exc:
+                print(f"Replica check failed, reading from primary: {str(exc).splitlines()[0]}")
+                _replica_state.update(usable=False, lag=None)
+            _replica_state["checked_at"] = now
+        return dict(_replica_state)
+
+
+def read_session() -> Session:
+    # Replica session when it is healthy and caught up, otherwise the primary
+    if ReplicaSessionLocal is not None and replica_status()["usable"]:
+        return ReplicaSessionLocal()
+    return SessionLocal()
+
+
+# Dependency for read-only endpoints (log queries, dashboards, audit trail)
+def get_read_db():
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def replica_usable_async() -> bool:
+    # Fresh cached result without leaving the event loop; a due re-check
+    # (a blocking connect) runs in a worker thread
+    if AsyncReplicaSessionLocal is None:
+        return False
+    if time.monotonic() - _replica_state["checked_at"] < settings.DB_REPLICA_CHECK_INTERVAL_SECONDS:
+        return _replica_state["usable"]
+    return (await asyncio.to_thread(replica_status))["usable"]
+
+
+# Async dependency on the primary
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Async session factory for reads: replica when usable, otherwise the primary
+async def async_read_sessionmaker():
+    return AsyncReplicaSessionLocal if await replica_usable_async() else AsyncSessionLocal
+
+
+# Async counterpart of get_read_db
+async def get_async_read_db():
+    factory = await async_read_sessionmaker()
+    async with factory() as db:
+        yield db
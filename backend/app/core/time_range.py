@@ -0,0 +1,65 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.config import settings
+
+
+def get_timezone(name: Optional[str] = None) -> ZoneInfo:
+    """IANA zone for a request (e.g. 'Asia/Kolkata'); defaults to settings.DEFAULT_TIMEZONE."""
+    name = (name or settings.DEFAULT_TIMEZONE).strip()
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"Unknown timezone '{name}'") from exc
+
+
+def is_date_only(value) -> bool:
+    if isinstance(value, datetime):
+        return False
+    if isinstance(value, date):
+        return True
+    return len(str(value).strip()) == 10
+
+
+def parse_bound(value, tz: ZoneInfo) -> datetime:
+    """
+    Turn a date or datetime (object or ISO string) into an aware datetime.
+    Dates mean local midnight in `tz`; naive datetimes are read as `tz` local
+    time; datetimes with an offset are kept as given.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime.combine(value, time.min)
+    else:
+        text = str(value).strip().replace("Z", "+00:00")
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError as exc:
+            raise ValueError(f"Invalid date or datetime '{value}'") from exc
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed
+
+
+def resolve_range(start=None, end=None, tz_name: Optional[str] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Half-open [start, end) timestamp range for date filters.
+
+    A date-only end is inclusive of that whole day, so it becomes the next
+    local midnight; a datetime end is used as the exclusive upper bound.
+    Callers compare the bare timestamp column against these bounds, which
+    keeps the filter index- and partition-friendly.
+    """
+    tz = get_timezone(tz_name)
+    start_ts = parse_bound(start, tz) if start else None
+    end_ts = None
+    if end:
+        end_ts = parse_bound(end, tz)
+        if is_date_only(end):
+            # Next local midnight; computed on the wall clock so DST days stay whole
+            next_day = end_ts.replace(tzinfo=None) + timedelta(days=1)
+            end_ts = next_day.replace(tzinfo=tz)
+    return start_ts, end_ts
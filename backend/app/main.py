@@ -11,11 +11,13 @@ from app.api.routes import (
     file_routes,
     log_routes,
     audit_routes,
+    retention_routes,
 )
 from app.api.routes.file_upload import router as file_router
 from app.api.routes import dashboard_routes
 from app.core.config import settings
 from app.models.log_entries import Environment
+from app.services.maintenance_service import start_maintenance_loop
 # Create FastAPI app
 app = FastAPI(
     title="Intelligent File & Log Management System",
@@ -34,6 +36,12 @@ app.add_middleware(
 
 
 
+# Background maintenance (log_entries partitions)
+@app.on_event("startup")
+def start_background_maintenance():
+    start_maintenance_loop()
+
+
 # Health check
 @app.get("/health", tags=["System"])
 def health_check():
@@ -51,6 +59,7 @@ app.include_router(log_routes.router)
 app.include_router(audit_routes.router)
 app.include_router(file_router)
 app.include_router(dashboard_routes.router)
+app.include_router(retention_routes.router)
 
 @app.get("/environments")
 def get_environments(db: Session = Depends(get_db)):
@@ -2,16 +2,25 @@ from sqlalchemy import (
     Column,
     BigInteger,
     Integer,
+    Text,
     TIMESTAMP,
-    ForeignKey
+    ForeignKey,
+    Index
 )
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.core.database import Base
 
 
 class Archive(Base):
     __tablename__ = "archives"
+    __table_args__ = (
+        # Lets maintenance find interrupted purges without a scan
+        Index(
+            "ix_archives_unpurged", "archive_id",
+            postgresql_where=text("purged_at IS NULL AND storage_path IS NOT NULL")
+        ),
+    )
 
     archive_id = Column(BigInteger, primary_key=True, index=True)
 
@@ -30,3 +39,15 @@ class Archive(Base):
     total_records = Column(
         Integer
     )
+
+    # Cold-tier copy of the file's log rows (zstd Parquet); NULL for archives
+    # made before rows were moved out of log_entries
+    storage_path = Column(Text)
+    size_bytes = Column(BigInteger)
+    min_log_ts = Column(TIMESTAMP(timezone=True))
+    max_log_ts = Column(TIMESTAMP(timezone=True))
+    # Highest log_id in the export; the purge never deletes past it
+    max_log_id = Column(BigInteger)
+
+    # Set once the exported rows are gone from log_entries
+    purged_at = Column(TIMESTAMP(timezone=True))
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, BigInteger, SmallInteger, String, Text, ForeignKey, DateTime, Boolean
-from sqlalchemy.sql import func
+from sqlalchemy import Column, BigInteger, SmallInteger, String, Text, ForeignKey, DateTime, Boolean, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 
 class LogSeverity(Base):
@@ -19,11 +21,34 @@ class Environment(Base):
 
 class LogEntry(Base):
     __tablename__ = "log_entries"
-    log_id = Column(BigInteger, primary_key=True, index=True)
+    # Range-partitioned on log_timestamp (see PartitionService), so the
+    # timestamp has to be part of the primary key.
+    __table_args__ = (
+        Index("ix_log_entries_log_timestamp", "log_timestamp"),
+        # Team / uploader scoped listings read straight off these, newest first
+        Index("ix_log_entries_team_ts", "team_id", text("log_timestamp DESC")),
+        Index("ix_log_entries_uploader_ts", "uploaded_by", text("log_timestamp DESC")),
+        Index("ix_log_entries_message_tsv", "message_tsv", postgresql_using="gin"),
+        # Trigram index (pg_trgm) for substring / regex search
+        Index(
+            "ix_log_entries_message_trgm", "message_line",
+            postgresql_using="gin", postgresql_ops={"message_line": "gin_trgm_ops"}
+        ),
+        {"postgresql_partition_by": "RANGE (log_timestamp)"},
+    )
+    log_id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
     file_id = Column(BigInteger, ForeignKey("raw_files.file_id", ondelete="CASCADE"))
-    log_timestamp = Column(DateTime(timezone=True), nullable=False)
+    # Copied from raw_files at ingest so scoped queries don't need to join it
+    team_id = Column(BigInteger)
+    uploaded_by = Column(BigInteger)
+    log_timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     severity_id = Column(SmallInteger, ForeignKey("log_severities.severity_id"))
     category_id = Column(SmallInteger, ForeignKey("log_categories.category_id"))
     environment_id = Column(SmallInteger, ForeignKey("environments.environment_id"))
     message_line = Column(Text, nullable=False)
+    # Word index for full-text search; deferred so normal row loads don't fetch it
+    message_tsv = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', message_line)", persisted=True)
+    ))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
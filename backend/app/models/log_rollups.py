@@ -0,0 +1,59 @@
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    SmallInteger,
+    TIMESTAMP,
+    Index
+)
+from sqlalchemy.sql import text
+
+from app.core.database import Base
+
+
+class LogRollupHourly(Base):
+    """
+    Pre-aggregated log_entries counts per UTC hour.
+    Maintained by RollupService on ingest and delete; 0 in an id column
+    stands for "not set" on the source rows so the key has no NULLs.
+    """
+    __tablename__ = "log_rollups_hourly"
+    __table_args__ = (
+        Index("ix_log_rollups_hourly_team_hour", "team_id", "bucket_hour"),
+        # Lets RollupService.prune find emptied buckets without a scan
+        Index("ix_log_rollups_hourly_empty", "bucket_hour", postgresql_where=text("log_count <= 0")),
+    )
+
+    bucket_hour = Column(TIMESTAMP(timezone=True), primary_key=True)
+
+    team_id = Column(BigInteger, primary_key=True, default=0)
+
+    environment_id = Column(SmallInteger, primary_key=True, default=0)
+
+    severity_id = Column(SmallInteger, primary_key=True, default=0)
+
+    category_id = Column(SmallInteger, primary_key=True, default=0)
+
+    log_count = Column(BigInteger, nullable=False, default=0)
+
+
+class LogRollupPending(Base):
+    """
+    Bucket counts of files awaiting background deletion. Readers subtract
+    them from log_rollups_hourly (RollupService.visible_counts) until the
+    purge has removed the rows; batch deletes release them as they go.
+    """
+    __tablename__ = "log_rollups_pending"
+
+    file_id = Column(BigInteger, primary_key=True)
+
+    bucket_hour = Column(TIMESTAMP(timezone=True), primary_key=True)
+
+    team_id = Column(BigInteger, primary_key=True, default=0)
+
+    environment_id = Column(SmallInteger, primary_key=True, default=0)
+
+    severity_id = Column(SmallInteger, primary_key=True, default=0)
+
+    category_id = Column(SmallInteger, primary_key=True, default=0)
+
+    log_count = Column(BigInteger, nullable=False, default=0)
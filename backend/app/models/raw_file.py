@@ -4,16 +4,22 @@ from sqlalchemy import (
     SmallInteger,
     Boolean,
     ForeignKey,
+    Index,
     String,
     TIMESTAMP
 )
-from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func, text
 
 from app.core.database import Base
 from . import file_formats
 
 class RawFile(Base):
     __tablename__ = "raw_files"
+    __table_args__ = (
+        # Pending deletions are few; queries exclude them through this
+        Index("ix_raw_files_pending_delete", "file_id", postgresql_where=text("is_pending_delete")),
+    )
 
     file_id = Column(BigInteger, primary_key=True, index=True)
 
@@ -43,5 +49,31 @@ class RawFile(Base):
 
     uploaded_at = Column(
         TIMESTAMP(timezone=True),
-        server_default=func.now()
+        server_default=func.now(),
+        index=True
     )
+
+    # Ingest-time summary of the file's log rows (kept by FileStatsService),
+    # so listings and archiving never have to scan log_entries for a file
+    line_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    min_log_ts = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    max_log_ts = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    # {code: rows}, e.g. {"ERROR": 12, "INFO": 340}
+    severity_counts = Column(JSONB, nullable=False, default=dict, server_default=text("'{}'::jsonb"))
+
+    category_counts = Column(JSONB, nullable=False, default=dict, server_default=text("'{}'::jsonb"))
+
+    environment_counts = Column(JSONB, nullable=False, default=dict, server_default=text("'{}'::jsonb"))
+
+    # Set by DELETE /files/{id}: the file is hidden from every query at once and
+    # FileDeletionService removes its rows in the background, counting them here
+    is_pending_delete = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+
+    delete_requested_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    delete_requested_by = Column(BigInteger, nullable=True)
+
+    deleted_rows = Column(BigInteger, nullable=False, default=0, server_default="0")
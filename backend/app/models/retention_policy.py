@@ -0,0 +1,43 @@
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    Boolean,
+    Integer,
+    SmallInteger,
+    TIMESTAMP,
+    ForeignKey
+)
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class RetentionPolicy(Base):
+    """
+    How long log rows are kept. Unset scope columns match everything, so a
+    policy with no team / environment / severity applies to all rows.
+    Enforced by RetentionService from the maintenance loop.
+    """
+    __tablename__ = "retention_policies"
+
+    policy_id = Column(BigInteger, primary_key=True, index=True)
+
+    team_id = Column(BigInteger, ForeignKey("teams.team_id"), nullable=True)
+
+    environment_id = Column(SmallInteger, ForeignKey("environments.environment_id"), nullable=True)
+
+    severity_id = Column(SmallInteger, ForeignKey("log_severities.severity_id"), nullable=True)
+
+    retain_days = Column(Integer, nullable=False)
+
+    is_active = Column(Boolean, nullable=False, default=True)
+
+    created_at = Column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now()
+    )
+
+    # Outcome of the latest enforcement pass
+    last_run_at = Column(TIMESTAMP(timezone=True))
+    last_deleted_rows = Column(BigInteger, nullable=False, default=0)
+    last_reclaimed_bytes = Column(BigInteger, nullable=False, default=0)
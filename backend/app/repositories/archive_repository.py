@@ -0,0 +1,329 @@
+import asyncio
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from itertools import islice
+from operator import and_, or_
+from typing import Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.time_range import resolve_range
+from app.models.archives import Archive
+from app.models.raw_file import RawFile
+from app.repositories.log_repository import FACET_COLUMNS, ROW_COLUMNS, SEARCH_WORD, decode_cursor, parse_search
+
+
+# Parquet layout of an archived file; same order as LogRepository.archive_select (ARCHIVE_COLUMNS)
+ARCHIVE_SCHEMA = pa.schema([
+    ("log_id", pa.int64()),
+    ("log_timestamp", pa.timestamp("us", tz="UTC")),
+    ("severity_code", pa.string()),
+    ("category_name", pa.string()),
+    ("environment_code", pa.string()),
+    ("file_name", pa.string()),
+    ("team_name", pa.string()),
+    ("message_line", pa.string()),
+    ("file_id", pa.int64()),
+    ("team_id", pa.int64()),
+    ("uploaded_by", pa.int64()),
+    ("environment_id", pa.int16()),
+    ("severity_id", pa.int16()),
+    ("category_id", pa.int16()),
+])
+
+TS_TYPE = ARCHIVE_SCHEMA.field("log_timestamp").type
+
+# Word boundary for archived text search: anything that is not a letter or digit
+NON_WORD = r"[^\pL\pN]"
+
+# Process-wide pool for reading archive files: Arrow releases the GIL while it
+# decodes, and one fixed pool keeps concurrent searches from multiplying threads
+SCAN_POOL = ThreadPoolExecutor(
+    max_workers=settings.LOG_ARCHIVE_SCAN_WORKERS, thread_name_prefix="archive-scan"
+)
+
+
+def row_key(row: dict):
+    # Listing order, newest first when used with reverse=True
+    return row["log_timestamp"], row["log_id"]
+
+
+class ArchiveRepository:
+    """
+    Read side of the cold tier: LogRepository-style filters evaluated
+    against the archived Parquet files instead of log_entries.
+    """
+
+    @staticmethod
+    def search(db: Session, *, keep: int, count: bool = True, cursor: Optional[str] = None,
+               facets: Optional[List[str]] = None, **filters) -> tuple:
+        """
+        (rows, total, facet_counts): the newest `keep` matching archived rows
+        (ROW_COLUMNS dicts, newest first); when `count` is set, how many
+        archived rows match in all; and for `facets` (FACET_COLUMNS names)
+        {facet: {label: n}} over every match, else None.
+        Plans and runs the scan in the calling thread; async callers use
+        plan() in run_sync and then ArchiveScan.run_async().
+        """
+        return ArchiveRepository.plan(
+            db, keep=keep, count=count, cursor=cursor, facets=facets, **filters
+        ).run()
+
+    @staticmethod
+    def plan(db: Session, *, keep: int, count: bool = True, cursor: Optional[str] = None,
+             facets: Optional[List[str]] = None, team_id=None, user_id=None, start_date=None, end_date=None, severity_code=None,
+             category_name=None, environment_code=None, file_id=None, search=None,
+             search_mode="auto", tz=None) -> "ArchiveScan":
+        """
+        The database half of an archive search: which files to read and the
+        scan to run on each. Nothing is decoded until the scan runs.
+
+        Pruning happens at three levels before any row is decoded:
+          1. archives whose file scope, stats or timestamp bounds rule them out
+             are never opened (one query on archives / raw_files, here)
+          2. row groups whose min/max statistics cannot satisfy the time range,
+             equality filters (or, when nothing is counted, the cursor) are skipped
+          3. the rest are filtered inside Arrow
+        Word searches are matched with an equivalent regex, so tokenisation can
+        differ slightly from Postgres full-text search on unusual input.
+        """
+        start_ts, end_ts = resolve_range(start_date, end_date, tz)
+        cursor_key = decode_cursor(cursor) if cursor else None
+        # Facet counts need every match read, just like the total
+        count = count or bool(facets)
+
+        paths = ArchiveRepository._candidate_paths(
+            db, team_id=team_id, user_id=user_id, file_id=file_id,
+            severity_code=severity_code, category_name=category_name,
+            environment_code=environment_code, start_ts=start_ts, end_ts=end_ts,
+            # The total counts every match, so files past the cursor are only
+            # skipped when nothing is being counted
+            before_ts=cursor_key[0] if cursor_key and not count else None
+        )
+
+        equals = {}
+        if user_id:
+            equals["uploaded_by"] = user_id
+        elif team_id:
+            equals["team_id"] = team_id
+        if file_id:
+            equals["file_id"] = file_id
+        for column, value in (("severity_code", severity_code), ("category_name", category_name),
+                              ("environment_code", environment_code)):
+            if value and value.strip():
+                equals[column] = value
+
+        scan = _FileScan(
+            start_ts=start_ts, end_ts=end_ts, cursor_key=cursor_key, equals=equals,
+            search=_search_expression(search, search_mode), keep=keep, count=count,
+            facets=facets or []
+        )
+        return ArchiveScan(paths, scan)
+
+    @staticmethod
+    def _candidate_paths(db: Session, *, team_id, user_id, file_id, severity_code, category_name,
+                         environment_code, start_ts, end_ts, before_ts) -> List[str]:
+        # Archives still being purged are included; the live side of the listing
+        # skips their exported rows (LogRepository exclude_archive_copies)
+        query = db.query(Archive.storage_path) \
+            .join(RawFile, RawFile.file_id == Archive.file_id) \
+            .filter(
+                Archive.storage_path.isnot(None),
+                Archive.total_records > 0,
+                RawFile.is_pending_delete.is_(False)
+            )
+
+        if user_id:
+            query = query.filter(RawFile.uploaded_by == user_id)
+        elif team_id:
+            query = query.filter(RawFile.team_id == team_id)
+        if file_id:
+            query = query.filter(Archive.file_id == file_id)
+
+        # Files whose ingest stats never saw the value cannot match
+        if severity_code and severity_code.strip():
+            query = query.filter(RawFile.severity_counts.has_key(severity_code))
+        if category_name and category_name.strip():
+            query = query.filter(RawFile.category_counts.has_key(category_name))
+        if environment_code and environment_code.strip():
+            query = query.filter(RawFile.environment_counts.has_key(environment_code))
+
+        if start_ts:
+            query = query.filter(Archive.max_log_ts >= start_ts)
+        if end_ts:
+            query = query.filter(Archive.min_log_ts < end_ts)
+        if before_ts:
+            query = query.filter(Archive.min_log_ts <= before_ts)
+
+        return [path for (path,) in query.all()]
+
+
+class ArchiveScan:
+    """
+    A planned archive search: the candidate files and the per-file scan.
+    Files are read on SCAN_POOL; the per-file results are merged into the
+    newest `keep` rows, the total when counting and the facet counts
+    (see ArchiveRepository.search).
+    """
+
+    def __init__(self, paths: List[str], scan: "_FileScan"):
+        self.paths = paths
+        self.scan = scan
+
+    def run(self) -> tuple:
+        return self._merge(list(SCAN_POOL.map(self.scan.run, self.paths)))
+
+    # Same, awaited from the event loop without holding a database connection
+    async def run_async(self) -> tuple:
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(SCAN_POOL, self.scan.run, path) for path in self.paths)
+        )
+        return self._merge(results)
+
+    def _merge(self, results) -> tuple:
+        rows = list(islice(
+            heapq.merge(*(rows for rows, _, _ in results), key=row_key, reverse=True), self.scan.keep
+        ))
+        total = sum(matched for _, matched, _ in results) if self.scan.count else None
+        facets = None
+        if self.scan.facets:
+            facets = {name: {} for name in self.scan.facets}
+            for _, _, counts in results:
+                for name, values in counts.items():
+                    for value, n in values.items():
+                        facets[name][value] = facets[name].get(value, 0) + n
+        return rows, total, facets
+
+
+class _FileScan:
+    """One archive query, run against a single Parquet file per call."""
+
+    def __init__(self, *, start_ts, end_ts, cursor_key, equals: dict, search, keep: int, count: bool,
+                 facets: List[str] = ()):
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.cursor_key = cursor_key
+        self.equals = equals
+        self.keep = keep
+        self.count = count
+        self.facets = list(facets)
+        self.expression = self._expression(search)
+        self.cursor_expression = self._cursor_expression()
+
+    # (top rows, matches, {facet: {label: n}}) for one file
+    def run(self, path: str) -> Tuple[list, int, Dict[str, dict]]:
+        parquet = pq.ParquetFile(path)
+        metadata = parquet.metadata
+        columns = {name: i for i, name in enumerate(metadata.schema.names)}
+
+        groups = []
+        for i in range(metadata.num_row_groups):
+            group = metadata.row_group(i)
+            if self._may_match(group, columns):
+                groups.append((group.column(columns["log_timestamp"]).statistics.max, i))
+        # Newest row groups first, so the top rows are found early
+        groups.sort(reverse=True)
+
+        best, matched = [], 0
+        facets = {name: {} for name in self.facets}
+        for group_max, i in groups:
+            # Without a count to finish, stop once no older group can improve the top rows
+            if not self.count and len(best) >= self.keep and group_max < best[-1]["log_timestamp"]:
+                break
+
+            table = parquet.read_row_group(i)
+            if self.expression is not None:
+                table = table.filter(self.expression)
+            # Counted before the cursor applies, like the live side's total
+            matched += table.num_rows
+            for name in self.facets:
+                # Parquet holds the lookup labels next to the ids; None = not set
+                column = table.column(FACET_COLUMNS[name][1].key)
+                for entry in pc.value_counts(column).to_pylist():
+                    values = facets[name]
+                    values[entry["values"]] = values.get(entry["values"], 0) + entry["counts"]
+            if self.cursor_expression is not None:
+                table = table.filter(self.cursor_expression)
+            if not table.num_rows:
+                continue
+
+            top = table.sort_by([("log_timestamp", "descending"), ("log_id", "descending")]) \
+                .slice(0, self.keep).select(list(ROW_COLUMNS)).to_pylist()
+            best = list(islice(heapq.merge(best, top, key=row_key, reverse=True), self.keep))
+
+        return best, matched, facets
+
+    # Row-group pruning on the min/max statistics
+    def _may_match(self, group, columns: dict) -> bool:
+        ts = group.column(columns["log_timestamp"]).statistics
+        if ts is not None and ts.has_min_max:
+            if self.start_ts and ts.max < self.start_ts:
+                return False
+            if self.end_ts and ts.min >= self.end_ts:
+                return False
+            if self.cursor_key and not self.count and ts.min > self.cursor_key[0]:
+                return False
+
+        for column, value in self.equals.items():
+            stats = group.column(columns[column]).statistics
+            if stats is not None and stats.has_min_max and not (stats.min <= value <= stats.max):
+                return False
+        return True
+
+    def _expression(self, search):
+        conditions = []
+        ts = pc.field("log_timestamp")
+        if self.start_ts:
+            conditions.append(ts >= pa.scalar(self.start_ts, type=TS_TYPE))
+        if self.end_ts:
+            conditions.append(ts < pa.scalar(self.end_ts, type=TS_TYPE))
+        for column, value in self.equals.items():
+            conditions.append(pc.field(column) == value)
+        if search is not None:
+            conditions.append(search)
+        return reduce(and_, conditions) if conditions else None
+
+    # Rows after the cursor position, in listing order
+    def _cursor_expression(self):
+        if not self.cursor_key:
+            return None
+        ts = pc.field("log_timestamp")
+        cursor_ts = pa.scalar(self.cursor_key[0], type=TS_TYPE)
+        return (ts < cursor_ts) | ((ts == cursor_ts) & (pc.field("log_id") < self.cursor_key[1]))
+
+
+def _search_expression(search, search_mode: str):
+    # Arrow counterpart of the keyword search in LogRepository._apply_filters
+    if not search or not str(search).strip():
+        return None
+    search = str(search).strip()
+    message = pc.field("message_line")
+
+    terms = parse_search(search) if search_mode in ("auto", "text") else None
+    if not terms and search_mode == "text":
+        # plainto_tsquery: every word must appear
+        terms = [("&", False, [w.lower()], False) for w in SEARCH_WORD.findall(search)]
+        if not terms:
+            return pc.scalar(False)
+
+    if terms:
+        # & binds tighter than |, as in tsquery
+        groups = [[]]
+        for operator, negate, words, prefix in terms:
+            if operator == "|" and groups[-1]:
+                groups.append([])
+            pattern = f"(?:^|{NON_WORD})" + f"{NON_WORD}+".join(words) + ("" if prefix else f"(?:{NON_WORD}|$)")
+            match = pc.match_substring_regex(message, pattern=pattern, ignore_case=True)
+            groups[-1].append(~match if negate else match)
+        return reduce(or_, (reduce(and_, group) for group in groups))
+
+    if search_mode == "regex":
+        # RE2 rather than POSIX syntax; the two agree on ordinary patterns
+        return pc.match_substring_regex(message, pattern=search, ignore_case=True)
+    return pc.match_substring(message, pattern=search, ignore_case=True)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import and_, func
 
+from app.core.time_range import is_date_only, resolve_range
 from app.models.raw_file import RawFile
 from sqlalchemy import or_
 from sqlalchemy.orm import joinedload
@@ -11,7 +12,6 @@ from app.models.raw_file import RawFile
 from app.models.user import User
 from app.models.teams import Team
 from app.models.file_formats import FileFormat
-from app.models.log_entries import LogEntry, LogSeverity, LogCategory, Environment
 
 
 class FileRepository:
@@ -35,18 +35,22 @@ class FileRepository:
     @staticmethod
     def get_by_id(
         db: Session,
-        file_id: int
+        file_id: int,
+        for_write: bool = False
     ) -> Optional[RawFile]:
-        return (
-            db.query(RawFile)
-            .filter(RawFile.file_id == file_id)
-            .first()
+        query = db.query(RawFile).filter(
+            RawFile.file_id == file_id, RawFile.is_pending_delete.is_(False)
         )
+        if for_write:
+            # Row lock until commit (the stats UPDATE would take the same one), so
+            # adding logs cannot interleave with an archive export of the file
+            query = query.with_for_update(key_share=True)
+        return query.first()
 
     @staticmethod
     def list_files(db: Session, *, team_id=None, search=None, severity=None, 
                    environment=None, category=None, start_date=None, 
-                   limit=50, offset=0):
+                   end_date=None, tz=None, limit=50, offset=0):
         
         # Base query with Joins to get names for the UI
         query = db.query(
@@ -56,7 +60,8 @@ class FileRepository:
             FileFormat.format_name.label("format_name")
         ).join(User, RawFile.uploaded_by == User.user_id, isouter=True) \
          .join(Team, RawFile.team_id == Team.team_id, isouter=True) \
-         .join(FileFormat, RawFile.format_id == FileFormat.format_id, isouter=True)
+         .join(FileFormat, RawFile.format_id == FileFormat.format_id, isouter=True) \
+         .filter(RawFile.is_pending_delete.is_(False))
 
         # Filter by Team (If provided by Admin or forced for User)
         if team_id:
@@ -67,21 +72,23 @@ class FileRepository:
             query = query.filter(RawFile.original_name.ilike(f"%{search}%"))
 
         # Filter by Date
-        if start_date:
-            query = query.filter(func.date(RawFile.uploaded_at) == start_date)
-
-        # Joins for Log Content (Only if these filters are active)
-        if severity or environment or category:
-            query = query.join(LogEntry, LogEntry.file_id == RawFile.file_id)
-            if severity:
-                query = query.join(LogSeverity).filter(LogSeverity.severity_code == severity)
-            if environment:
-                query = query.join(Environment).filter(Environment.environment_code == environment)
-            if category:
-                query = query.join(LogCategory).filter(LogCategory.category_name == category)
-
-        # Group by File ID to avoid duplicates from log joins
-        query = query.group_by(RawFile.file_id, User.username, Team.team_name, FileFormat.format_name)
+        # A lone start date means "uploaded on that day"; bounds are resolved in
+        # the caller's timezone and compared against the bare uploaded_at column.
+        if start_date and not end_date and is_date_only(start_date):
+            end_date = start_date
+        start_ts, end_ts = resolve_range(start_date, end_date, tz)
+        if start_ts:
+            query = query.filter(RawFile.uploaded_at >= start_ts)
+        if end_ts:
+            query = query.filter(RawFile.uploaded_at < end_ts)
+
+        # Log content filters read the file's ingest-time counts (one row per file)
+        if severity:
+            query = query.filter(RawFile.severity_counts.has_key(severity))
+        if environment:
+            query = query.filter(RawFile.environment_counts.has_key(environment))
+        if category:
+            query = query.filter(RawFile.category_counts.has_key(category))
 
         results = query.order_by(RawFile.uploaded_at.desc()).limit(limit).offset(offset).all()
         
@@ -108,7 +115,7 @@ class FileRepository:
         uploaded_before=None
     ) -> int:
 
-        query = db.query(RawFile)
+        query = db.query(RawFile).filter(RawFile.is_pending_delete.is_(False))
 
         if team_id is not None:
             query = query.filter(RawFile.team_id == team_id)
@@ -1,27 +1,162 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import base64
+import binascii
+import json
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, or_, select
+from app.core.time_range import resolve_range
+from app.models.archives import Archive
 from app.models.log_entries import LogEntry, LogSeverity, LogCategory, Environment
 from app.models.raw_file import RawFile
 from app.models.teams import Team
 
+# Search syntax for word queries: "exact phrase", prefix*, OR, -word / NOT word
+SEARCH_TOKEN = re.compile(r'-?"[^"]*"|\S+')
+SEARCH_WORD = re.compile(r"[^\W_]+")
+
+
+def parse_search(search: str) -> Optional[List[Tuple[str, bool, List[str], bool]]]:
+    """
+    Split a word-based search into (operator, negate, words, prefix) terms,
+    operator being "&" or "|" (how the term joins the previous one) and words
+    holding one word or the words of a "quoted phrase".
+    Returns None when the input is not purely words (e.g. 'user_id=42',
+    UUID fragments), so the caller can use a substring match instead.
+    """
+    terms = []
+    operator = "&"
+    negate = False
+
+    for token in SEARCH_TOKEN.findall(search):
+        if token == "OR":
+            operator = "|"
+            continue
+        if token == "AND":
+            continue
+        if token == "NOT":
+            negate = True
+            continue
+
+        if token.startswith("-"):
+            negate = True
+            token = token[1:]
+
+        if token.startswith('"'):
+            words = token.strip('"').split()
+            if not words or not all(SEARCH_WORD.fullmatch(w) for w in words):
+                return None
+            terms.append((operator, negate, [w.lower() for w in words], False))
+        else:
+            word = token[:-1] if token.endswith("*") else token
+            if not SEARCH_WORD.fullmatch(word):
+                return None
+            terms.append((operator, negate, [word.lower()], token.endswith("*")))
+        operator, negate = "&", False
+
+    return terms or None
+
+
+def build_tsquery(search: str) -> Optional[str]:
+    """
+    Translate a word-based search into to_tsquery syntax
+    (see parse_search); None when it is not a word query.
+    """
+    terms = parse_search(search)
+    if not terms:
+        return None
+
+    parts = []
+    for operator, negate, words, prefix in terms:
+        term = "(" + " <-> ".join(words) + ")" if len(words) > 1 else words[0]
+        if prefix:
+            term += ":*"
+        if parts:
+            parts.append(operator)
+        parts.append(f"!{term}" if negate else term)
+
+    return " ".join(parts)
+
+
+# Keys of the dicts returned by list_logs, in _rows_select column order
+ROW_COLUMNS = (
+    "log_id", "log_timestamp", "severity_code", "category_name",
+    "environment_code", "file_name", "team_name", "message_line"
+)
+
+# archive_select rows: the listing columns plus the ids filters work on
+ARCHIVE_COLUMNS = ROW_COLUMNS + (
+    "file_id", "team_id", "uploaded_by", "environment_id", "severity_id", "category_id"
+)
+
+
+# Facets GET /logs can break results down by: name -> (log_entries / log_rollups_hourly
+# id column, lookup label column)
+FACET_COLUMNS = {
+    "severity": ("severity_id", LogSeverity.severity_code),
+    "category": ("category_id", LogCategory.category_name),
+    "environment": ("environment_id", Environment.environment_code),
+}
+
+
+def split_grouping_sets(rows, facets: List[str]) -> Dict[str, Dict[Optional[int], int]]:
+    """
+    Turn GROUPING SETS rows laid out as (values..., GROUPING() flags..., count)
+    into {facet: {id: count}}. The flag that is 0 names the set a row belongs
+    to, since a NULL value cannot tell "grouped away" from "not set".
+    """
+    n = len(facets)
+    counts = {name: {} for name in facets}
+    for row in rows:
+        for i, name in enumerate(facets):
+            if row[n + i] == 0:
+                counts[name][row[i]] = int(row[2 * n])
+                break
+    return counts
+
+
+def encode_cursor(log_timestamp: datetime, log_id: int) -> str:
+    """Opaque page cursor for the (log_timestamp, log_id) position of a row."""
+    raw = f"{log_timestamp.isoformat()}|{log_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, log_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(ts), int(log_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
 class LogRepository:
     @staticmethod
-    def list_logs(db: Session, *, team_id=None, user_id=None, start_date=None, end_date=None, 
-                  severity_code=None, category_name=None, environment_code=None, 
-                  file_id=None, search=None, limit=10, offset=0):
+    def list_logs(db: Session, **kwargs):
+        items, _ = LogRepository._fetch_page(db, with_total=False, **kwargs)
+        return items
+
+    @staticmethod
+    def list_logs_with_total(db: Session, **kwargs) -> Tuple[list, Optional[int]]:
+        """
+        Page and total in one round trip: count(*) OVER () is evaluated over the
+        filtered rows before LIMIT/OFFSET. Total is None when the page is empty,
+        since there is then no row to carry it.
+        """
+        return LogRepository._fetch_page(db, with_total=True, **kwargs)
+
+    @staticmethod
+    def _fetch_page(db: Session, *, with_total: bool, team_id=None, user_id=None, start_date=None,
+                    end_date=None, severity_code=None, category_name=None, environment_code=None,
+                    file_id=None, search=None, search_mode="auto", tz=None, limit=10, offset=0,
+                    cursor=None, exclude_archive_copies=False):
         
-        query = db.query(
-            LogEntry,
-            LogSeverity.severity_code,
-            LogCategory.category_name,
-            Environment.environment_code,
-            RawFile.original_name.label("file_name"),
-            Team.team_name.label("team_name")
-        ).join(RawFile, LogEntry.file_id == RawFile.file_id) \
-         .outerjoin(LogSeverity, LogEntry.severity_id == LogSeverity.severity_id) \
-         .outerjoin(LogCategory, LogEntry.category_id == LogCategory.category_id) \
-         .outerjoin(Environment, LogEntry.environment_id == Environment.environment_id) \
-         .outerjoin(Team, RawFile.team_id == Team.team_id) # ensure team is joined
+        # Core select of the response columns: rows come back as plain tuples,
+        # with no ORM instances or identity-map bookkeeping per log line
+        query = LogRepository._rows_select()
 
         query = LogRepository._apply_filters(
             query=query,
@@ -33,34 +168,69 @@ class LogRepository:
             category_name=category_name,
             environment_code=environment_code,
             file_id=file_id,
-            search=search
+            search=search,
+            search_mode=search_mode,
+            tz=tz,
+            exclude_archive_copies=exclude_archive_copies
         )
 
-        # Ordering by timestamp ensures newest logs appear first
-        results = query.order_by(LogEntry.log_timestamp.desc()).limit(limit).offset(offset).all()
-        
-        items = []
-        for row in results:
-            log_obj = row[0]
-            log_obj.severity_code = row.severity_code
-            log_obj.category_name = row.category_name
-            log_obj.environment_code = row.environment_code
-            log_obj.file_name = row.file_name
-            log_obj.team_name = row.team_name 
-            items.append(log_obj)
-        return items
+        # Keyset pagination: continue strictly after the last row of the previous page.
+        # Written as ts <= x AND (ts < x OR id < y) so the timestamp indexes and
+        # partition pruning still apply; only rows sharing the boundary timestamp
+        # are checked against log_id.
+        if cursor:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            query = query.filter(
+                LogEntry.log_timestamp <= cursor_ts,
+                or_(
+                    LogEntry.log_timestamp < cursor_ts,
+                    LogEntry.log_id < cursor_id
+                )
+            )
+            offset = 0
+
+        if with_total:
+            query = query.add_columns(func.count().over().label("total_rows"))
+
+        # Ordering by timestamp ensures newest logs appear first; log_id keeps ties stable
+        results = db.execute(
+            query.order_by(LogEntry.log_timestamp.desc(), LogEntry.log_id.desc())
+            .limit(limit).offset(offset)
+        ).all()
+
+        # Plain dicts shaped like LogResponse, ready for direct JSON encoding
+        items = [dict(zip(ROW_COLUMNS, row)) for row in results]
+
+        total = results[0].total_rows if with_total and results else None
+        return items, total
+
+    @staticmethod
+    def _rows_select():
+        # LogResponse columns: log_entries plus the joined lookup / file / team names
+        return select(
+            LogEntry.log_id,
+            LogEntry.log_timestamp,
+            LogSeverity.severity_code,
+            LogCategory.category_name,
+            Environment.environment_code,
+            RawFile.original_name.label("file_name"),
+            Team.team_name.label("team_name"),
+            LogEntry.message_line
+        ).select_from(LogEntry) \
+         .outerjoin(RawFile, LogEntry.file_id == RawFile.file_id) \
+         .outerjoin(LogSeverity, LogEntry.severity_id == LogSeverity.severity_id) \
+         .outerjoin(LogCategory, LogEntry.category_id == LogCategory.category_id) \
+         .outerjoin(Environment, LogEntry.environment_id == Environment.environment_id) \
+         .outerjoin(Team, LogEntry.team_id == Team.team_id)
     
     @staticmethod
     def count_logs(db: Session, *, team_id=None, user_id=None, start_date=None, end_date=None, 
                    severity_code=None, category_name=None, environment_code=None, 
-                   file_id=None, search=None):
+                   file_id=None, search=None, search_mode="auto", tz=None,
+                   exclude_archive_copies=False):
         
-        # CHANGE: count_logs MUST have the same joins as list_logs or filters will fail
-        query = db.query(func.count(LogEntry.log_id)) \
-            .join(RawFile, LogEntry.file_id == RawFile.file_id) \
-            .outerjoin(LogSeverity, LogEntry.severity_id == LogSeverity.severity_id) \
-            .outerjoin(LogCategory, LogEntry.category_id == LogCategory.category_id) \
-            .outerjoin(Environment, LogEntry.environment_id == Environment.environment_id)
+        # Filters only touch log_entries columns, so the count needs no joins
+        query = db.query(func.count(LogEntry.log_id))
 
         query = LogRepository._apply_filters(
             query=query,
@@ -72,41 +242,167 @@ class LogRepository:
             category_name=category_name,
             environment_code=environment_code,
             file_id=file_id,
-            search=search
+            search=search,
+            search_mode=search_mode,
+            tz=tz,
+            exclude_archive_copies=exclude_archive_copies
         )
         
         return query.scalar() or 0
 
     @staticmethod
-    def _apply_filters(query, team_id, user_id, start_date, end_date, 
-                       severity_code, category_name, environment_code, 
-                       file_id, search):
+    def facet_counts(db: Session, facets: List[str], **filters) -> Dict[str, Dict[Optional[int], int]]:
+        """
+        Matching rows per id for each facet (FACET_COLUMNS names), all from one
+        scan: GROUPING SETS groups the filtered rows once per facet.
+        """
+        columns = [getattr(LogEntry, FACET_COLUMNS[name][0]) for name in facets]
+        query = select(*columns, *(func.grouping(c) for c in columns), func.count()).select_from(LogEntry)
+        query = LogRepository._apply_filters(query=query, **filters).group_by(func.grouping_sets(*columns))
+        return split_grouping_sets(db.execute(query).all(), facets)
+
+    # id -> label of each facet's lookup table (a handful of rows each)
+    @staticmethod
+    def facet_labels(db: Session, facets: List[str]) -> Dict[str, Dict[int, str]]:
+        labels = {}
+        for name in facets:
+            label = FACET_COLUMNS[name][1]
+            id_column = getattr(label.class_, FACET_COLUMNS[name][0])
+            labels[name] = dict(db.execute(select(id_column, label)).all())
+        return labels
+
+    @staticmethod
+    def export_select(**filters):
+        """
+        Core SELECT of flat export rows for the given filters, newest first.
+        Plain tuples (no ORM identity map), so it can be streamed from a
+        server-side cursor without memory growing with the result size.
+        """
+        stmt = LogRepository._apply_filters(query=LogRepository._rows_select(), **filters)
+        return stmt.order_by(LogEntry.log_timestamp.desc(), LogEntry.log_id.desc())
+
+    @staticmethod
+    def archive_select(file_id: int, min_ts=None, max_ts=None):
+        """
+        Core SELECT of one file's rows (ARCHIVE_COLUMNS), oldest first, for
+        the cold-tier export. The file's stored timestamp bounds, when known,
+        let the planner skip partitions that cannot hold its rows.
+        """
+        stmt = LogRepository._rows_select().add_columns(
+            LogEntry.file_id, LogEntry.team_id, LogEntry.uploaded_by,
+            LogEntry.environment_id, LogEntry.severity_id, LogEntry.category_id
+        ).where(LogEntry.file_id == file_id)
+        if min_ts is not None and max_ts is not None:
+            stmt = stmt.where(LogEntry.log_timestamp.between(min_ts, max_ts))
+        return stmt.order_by(LogEntry.log_timestamp, LogEntry.log_id)
+
+    @staticmethod
+    def count_logs_capped(db: Session, *, cap: int, **filters) -> Tuple[int, bool]:
+        """
+        Count matching rows but stop scanning after cap + 1 of them.
+        Returns (count, exceeded); when exceeded the count is reported as `cap`.
+        """
+        matching = LogRepository._apply_filters(query=db.query(LogEntry.log_id), **filters) \
+            .limit(cap + 1).subquery()
+        found = db.query(func.count()).select_from(matching).scalar() or 0
+        if found > cap:
+            return cap, True
+        return found, False
+
+    @staticmethod
+    def estimate_logs(db: Session, **filters) -> int:
+        """
+        Planner row estimate for the filtered query, read from EXPLAIN (FORMAT JSON).
+        Costs one planning pass and no table scan; accuracy depends on ANALYZE statistics.
+        """
+        query = LogRepository._apply_filters(query=db.query(LogEntry.log_id), **filters)
+        compiled = query.statement.compile(dialect=db.get_bind().dialect)
+        params = compiled.params
+        if compiled.positional:
+            # e.g. asyncpg's $1 placeholders when called through AsyncSession.run_sync
+            params = tuple(params[name] for name in compiled.positiontup)
+        plan = db.connection().exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + str(compiled), params
+        ).scalar()
+        if isinstance(plan, str):
+            # asyncpg hands json back undecoded
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @staticmethod
+    def _apply_filters(query, team_id=None, user_id=None, start_date=None, end_date=None, 
+                       severity_code=None, category_name=None, environment_code=None, 
+                       file_id=None, search=None, search_mode="auto", tz=None,
+                       exclude_archive_copies=False):
         
-        # 1. Keyword Search (Case-insensitive)
+        # 1. Keyword Search
+        # Word queries go through the message_tsv GIN index; anything else
+        # (raw fragments, punctuation) falls back to a case-insensitive substring match.
+        # search_mode="regex" matches a POSIX regular expression instead.
         if search and str(search).strip():
-            search_term = f"%{str(search).strip()}%"
-            query = query.filter(LogEntry.message_line.ilike(search_term))
+            search = str(search).strip()
+            tsquery = build_tsquery(search) if search_mode in ("auto", "text") else None
+
+            if tsquery:
+                query = query.filter(LogEntry.message_tsv.op("@@")(func.to_tsquery("simple", tsquery)))
+            elif search_mode == "text":
+                query = query.filter(LogEntry.message_tsv.op("@@")(func.plainto_tsquery("simple", search)))
+            elif search_mode == "regex":
+                # Case-insensitive POSIX regex; served by the pg_trgm index
+                query = query.filter(LogEntry.message_line.op("~*")(search))
+            else:
+                # Substring; served by the pg_trgm index for terms of 3+ characters
+                query = query.filter(LogEntry.message_line.ilike(f"%{search}%"))
         
-        # 2. ID Based Filters
+        # 2. ID Based Filters (denormalised onto log_entries, no raw_files join needed)
         if user_id: 
-            query = query.filter(RawFile.uploaded_by == user_id)
+            query = query.filter(LogEntry.uploaded_by == user_id)
         elif team_id: 
-            query = query.filter(RawFile.team_id == team_id)
+            query = query.filter(LogEntry.team_id == team_id)
         if file_id: 
             query = query.filter(LogEntry.file_id == file_id)
             
         # 3. Metadata String Filters (Exact match)
+        # Resolved to ids via scalar subqueries so they compare log_entries columns directly
         if severity_code and severity_code.strip(): 
-            query = query.filter(LogSeverity.severity_code == severity_code)
+            query = query.filter(LogEntry.severity_id == select(LogSeverity.severity_id)
+                                 .where(LogSeverity.severity_code == severity_code).scalar_subquery())
         if environment_code and environment_code.strip(): 
-            query = query.filter(Environment.environment_code == environment_code)
+            query = query.filter(LogEntry.environment_id == select(Environment.environment_id)
+                                 .where(Environment.environment_code == environment_code).scalar_subquery())
         if category_name and category_name.strip(): 
-            query = query.filter(LogCategory.category_name == category_name)
+            query = query.filter(LogEntry.category_id == select(LogCategory.category_id)
+                                 .where(LogCategory.category_name == category_name).scalar_subquery())
         
-        # 4. Date Range Filters (Handling potential string/date mismatch)
-        if start_date: 
-            query = query.filter(func.date(LogEntry.log_timestamp) >= start_date)
-        if end_date: 
-            query = query.filter(func.date(LogEntry.log_timestamp) <= end_date)
-            
-        return query
\ No newline at end of file
+        # 4. Date Range Filters
+        # Compare the bare column against a half-open [start, end) range resolved
+        # in the caller's timezone, so the planner can prune log_entries partitions
+        # and use the timestamp indexes.
+        start_ts, end_ts = resolve_range(start_date, end_date, tz)
+        if start_ts:
+            query = query.filter(LogEntry.log_timestamp >= start_ts)
+        if end_ts:
+            query = query.filter(LogEntry.log_timestamp < end_ts)
+
+        # 5. Files awaiting background deletion are already gone as far as readers go.
+        # Anti-join against the few flagged raw_files rows (partial index);
+        # aliased so it never correlates with the listing's own raw_files join.
+        pending = aliased(RawFile)
+        query = query.filter(~select(pending.file_id).where(
+            pending.file_id == LogEntry.file_id,
+            pending.is_pending_delete.is_(True)
+        ).exists())
+
+        # 6. Listings that also read the archives: rows an archive has already
+        # exported but whose purge is still under way are served from the Parquet
+        # copy, so they are skipped here (archives without max_log_id cover the file)
+        if exclude_archive_copies:
+            unpurged = aliased(Archive)
+            query = query.filter(~select(unpurged.archive_id).where(
+                unpurged.file_id == LogEntry.file_id,
+                unpurged.storage_path.isnot(None),
+                unpurged.purged_at.is_(None),
+                or_(unpurged.max_log_id.is_(None), LogEntry.log_id <= unpurged.max_log_id)
+            ).exists())
+
+        return query
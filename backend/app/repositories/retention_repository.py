@@ -0,0 +1,42 @@
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.retention_policy import RetentionPolicy
+
+
+class RetentionRepository:
+    """
+    Repository layer for retention policy DB operations.
+    """
+
+    # Create policy
+    @staticmethod
+    def create_policy(db: Session, policy: RetentionPolicy) -> RetentionPolicy:
+        db.add(policy)
+        db.commit()
+        db.refresh(policy)
+        return policy
+
+    # Get policy by ID
+    @staticmethod
+    def get_by_id(db: Session, policy_id: int) -> Optional[RetentionPolicy]:
+        return (
+            db.query(RetentionPolicy)
+            .filter(RetentionPolicy.policy_id == policy_id)
+            .first()
+        )
+
+    # List policies
+    @staticmethod
+    def list_policies(db: Session, *, active_only: bool = False) -> List[RetentionPolicy]:
+        query = db.query(RetentionPolicy)
+        if active_only:
+            query = query.filter(RetentionPolicy.is_active.is_(True))
+        return query.order_by(RetentionPolicy.policy_id).all()
+
+    # Delete policy
+    @staticmethod
+    def delete_policy(db: Session, policy: RetentionPolicy):
+        db.delete(policy)
+        db.commit()
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, Field
 
 
@@ -39,6 +39,14 @@ class FileListItem(BaseModel):
     team_name: Optional[str] = None
     format_name: Optional[str] = None
 
+    # Ingest-time summary of the file's log rows
+    line_count: Optional[int] = None
+    min_log_ts: Optional[datetime] = None
+    max_log_ts: Optional[datetime] = None
+    severity_counts: Optional[Dict[str, int]] = None
+    category_counts: Optional[Dict[str, int]] = None
+    environment_counts: Optional[Dict[str, int]] = None
+
     class Config:
         from_attributes = True
 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -62,6 +62,21 @@ class LogResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class FacetCount(BaseModel):
+    # Lookup label (severity code, category or environment name); None = not set
+    value: Optional[str] = None
+    count: int
+
 class LogListResponse(BaseModel):
     total: int
     items: List[LogResponse]
+    # Opaque keyset cursor for the next page (None on the last page)
+    next_cursor: Optional[str] = None
+    # Count strategy used for `total`; total_is_exact is False for planner
+    # estimates and for capped counts that hit the cap (i.e. "10,000+")
+    count_mode: str = "exact"
+    total_is_exact: bool = True
+    # Set by the window / has_more modes, which know whether another page exists
+    has_more: Optional[bool] = None
+    # Requested facets ({"severity": [...], ...}) over the whole filtered set
+    facets: Optional[Dict[str, List[FacetCount]]] = None
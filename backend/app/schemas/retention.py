@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+# Create request; codes are resolved to ids, omitted scopes match everything
+class RetentionPolicyCreate(BaseModel):
+    team_id: Optional[int] = None
+    environment_code: Optional[str] = None
+    severity_code: Optional[str] = None
+    retain_days: int = Field(..., ge=1)
+
+
+# Update request
+class RetentionPolicyUpdate(BaseModel):
+    retain_days: Optional[int] = Field(None, ge=1)
+    is_active: Optional[bool] = None
+
+
+# Response schema
+class RetentionPolicyResponse(BaseModel):
+    policy_id: int
+    team_id: Optional[int]
+    environment_id: Optional[int]
+    severity_id: Optional[int]
+    retain_days: int
+    is_active: bool
+    created_at: Optional[datetime]
+    last_run_at: Optional[datetime]
+    last_deleted_rows: int
+    last_reclaimed_bytes: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,177 @@
+import os
+import traceback
+from datetime import datetime, timezone
+from typing import List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, set_audit_user
+from app.models.archives import Archive
+from app.models.raw_file import RawFile
+from app.repositories.archive_repository import ARCHIVE_SCHEMA
+from app.repositories.log_repository import LogRepository
+from app.services.dashboard_cache import DashboardCache
+from app.services.file_storage import archive_path
+from app.services.rollup_service import RollupService
+
+
+class ArchiveService:
+    """
+    Cold-tier archiving of uploaded files.
+
+    A file's log rows are written oldest first to a zstd-compressed Parquet
+    file (one row group per LOG_ARCHIVE_ROW_GROUP_ROWS rows, each with
+    min/max statistics) and then deleted from log_entries in small committed
+    batches, taking their hourly rollups with them. The raw_files summary
+    stats are left alone: they describe the file, which is still there.
+    The purge only deletes rows up to the highest exported log_id.
+    """
+
+    # Background task entry point for PATCH /files/{id}/archive
+    @staticmethod
+    def archive_in_background(file_id: int, user_id: int):
+        db = SessionLocal()
+        try:
+            # Audit triggers attribute the writes to the requesting user
+            set_audit_user(db, user_id)
+            # Held until the archive record commits: a second request waits here and
+            # then finds the file archived, and log writers wait for the flag too
+            raw_file = db.query(RawFile).filter(RawFile.file_id == file_id).with_for_update().first()
+            if not raw_file or raw_file.is_archived or raw_file.is_pending_delete:
+                db.rollback()
+                return
+            team_id, uploaded_by = raw_file.team_id, raw_file.uploaded_by
+            ArchiveService.archive_file(db, raw_file, user_id)
+            DashboardCache.invalidate(team_id=team_id, user_id=uploaded_by)
+        except Exception:
+            db.rollback()
+            print(f"--- ARCHIVE ERROR (file {file_id}) ---")
+            print(traceback.format_exc())
+        finally:
+            db.close()
+
+    # Export, record and purge one file. The caller holds the raw_files row
+    # (ideally locked FOR UPDATE) and has checked it is not archived yet;
+    # `user_id` is the audit user for the purge batches.
+    @staticmethod
+    def archive_file(db: Session, raw_file: RawFile, user_id=None) -> Archive:
+        # 1. Export to a temp file so a failure never leaves a truncated archive behind
+        path = archive_path(raw_file.team_id, raw_file.file_id)
+        tmp_path = path + ".tmp"
+        try:
+            rows, min_ts, max_ts, max_log_id = ArchiveService._export(db, raw_file, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # 2. Record it; from this commit on the Parquet file is the copy of record
+        archive = Archive(
+            file_id=raw_file.file_id,
+            total_records=rows,
+            storage_path=path,
+            size_bytes=os.path.getsize(path),
+            min_log_ts=min_ts,
+            max_log_ts=max_ts,
+            max_log_id=max_log_id,
+            purged_at=None if rows else datetime.now(timezone.utc)
+        )
+        raw_file.is_archived = True
+        db.add(archive)
+        db.commit()
+
+        # 3. Take the rows out of the hot table
+        if rows:
+            ArchiveService.purge(db, archive, user_id)
+        return archive
+
+    # Delete an archive's rows from log_entries, one LOG_ARCHIVE_DELETE_BATCH_ROWS
+    # transaction at a time. Safe to re-run after an interruption.
+    @staticmethod
+    def purge(db: Session, archive: Archive, user_id=None) -> int:
+        raw_file = db.get(RawFile, archive.file_id)
+        where = "file_id = :file_id"
+        params = {"file_id": archive.file_id}
+        if archive.min_log_ts is not None and archive.max_log_ts is not None:
+            where += " AND log_timestamp BETWEEN :min_ts AND :max_ts"
+            params.update(min_ts=archive.min_log_ts, max_ts=archive.max_log_ts)
+        # Rows the export never saw stay put
+        if archive.max_log_id is not None:
+            where += " AND log_id <= :max_log_id"
+            params["max_log_id"] = archive.max_log_id
+
+        # The audit user is transaction-local, so every batch sets it again
+        before_batch = (lambda: set_audit_user(db, user_id)) if user_id is not None else None
+        total = RollupService.delete_in_batches(
+            db, where, params, settings.LOG_ARCHIVE_DELETE_BATCH_ROWS, before_batch=before_batch
+        )
+
+        archive.purged_at = datetime.now(timezone.utc)
+        db.commit()
+        if raw_file:
+            DashboardCache.invalidate(team_id=raw_file.team_id, user_id=raw_file.uploaded_by)
+        print(f"Archive {archive.archive_id}: purged {total} rows of file {archive.file_id} from log_entries")
+        return total
+
+    # Finish purges cut short by a restart or error (maintenance hook)
+    @staticmethod
+    def resume_purges(db: Session) -> List[int]:
+        pending = db.query(Archive).filter(
+            Archive.purged_at.is_(None),
+            Archive.storage_path.isnot(None)
+        ).order_by(Archive.archive_id).all()
+
+        for archive in pending:
+            ArchiveService.purge(db, archive)
+        return [archive.archive_id for archive in pending]
+
+    # Remove a file's archive rows and Parquet files (file deletion); the
+    # caller commits, and disk files are only removed for the returned paths
+    @staticmethod
+    def delete_archives(db: Session, file_id: int) -> List[str]:
+        archives = db.query(Archive).filter(Archive.file_id == file_id).all()
+        paths = [a.storage_path for a in archives if a.storage_path]
+        for archive in archives:
+            db.delete(archive)
+        return paths
+
+    @staticmethod
+    def remove_archive_files(paths: List[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _export(db: Session, raw_file: RawFile, path: str):
+        result = db.execute(
+            LogRepository.archive_select(
+                raw_file.file_id, raw_file.min_log_ts, raw_file.max_log_ts
+            ).execution_options(
+                stream_results=True,
+                yield_per=settings.LOG_ARCHIVE_ROW_GROUP_ROWS
+            )
+        )
+
+        rows = 0
+        min_ts = max_ts = max_log_id = None
+        with pq.ParquetWriter(path, ARCHIVE_SCHEMA, compression="zstd") as writer:
+            # Each fetched batch becomes one row group; rows arrive in timestamp order
+            for batch in result.partitions():
+                columns = list(zip(*batch))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, ARCHIVE_SCHEMA)],
+                    schema=ARCHIVE_SCHEMA
+                ))
+                rows += len(batch)
+                if min_ts is None:
+                    min_ts = batch[0].log_timestamp
+                max_ts = batch[-1].log_timestamp
+                max_log_id = max(max_log_id or 0, max(row.log_id for row in batch))
+        return rows, min_ts, max_ts, max_log_id
+
@@ -0,0 +1,102 @@
+import hashlib
+import json
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.cache import TTLCache, VersionCounter
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_read_sessionmaker
+
+
+# Change counters per dashboard scope: "global", ("team", id), ("user", id)
+_versions = VersionCounter()
+# (scope, version) -> (etag, payload)
+_payloads = TTLCache(ttl_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS)
+# user_id -> True for users whose active status a full request checked recently
+_active_users = TTLCache(ttl_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS, max_entries=10000)
+
+
+class DashboardCache:
+    """
+    In-process cache for dashboard payloads.
+    Entries live for DASHBOARD_CACHE_TTL_SECONDS or until a write bumps the
+    scope's version (ingest commit, file delete / archive, log delete).
+    """
+
+    # Retire cached dashboards touched by a change to one file's logs
+    @staticmethod
+    def invalidate(team_id: Optional[int] = None, user_id: Optional[int] = None):
+        scopes = ["global"]
+        if team_id is not None:
+            scopes.append(("team", team_id))
+        if user_id is not None:
+            scopes.append(("user", user_id))
+        _versions.bump(*scopes)
+
+    # Record that a request loaded `user_id` from the database and found it active
+    @staticmethod
+    def mark_active(user_id: int):
+        _active_users.set(user_id, True)
+
+    # Called when a user is deactivated or deleted: their next dashboard request
+    # goes through the full user check, and their own cached dashboard is retired.
+    # Other worker processes keep their entry until DASHBOARD_CACHE_TTL_SECONDS.
+    @staticmethod
+    def revoke_user(user_id: int):
+        _active_users.pop(user_id)
+        _versions.bump(("user", user_id))
+
+    # Session factory for building `scope`. Right after a bump a replica may not
+    # have replayed the write yet, and a payload built there would be cached under
+    # the new version until the TTL, so builds within the worst-case lag (allowed
+    # lag plus one health-check interval) go to the primary.
+    @staticmethod
+    async def build_sessionmaker(scope):
+        window = settings.DB_REPLICA_MAX_LAG_SECONDS + settings.DB_REPLICA_CHECK_INTERVAL_SECONDS
+        if _versions.changed_within(scope, window):
+            return AsyncSessionLocal
+        return await async_read_sessionmaker()
+
+    # 304 for an If-None-Match naming the scope's current cached ETag, else None.
+    # Needs no database work, so routes call it before loading the user; it only
+    # answers for a user a full request found active within the cache TTL, so a
+    # deactivated user with an unexpired token falls through to the user check.
+    @staticmethod
+    def not_modified(scope, request: Request, user_id: Optional[int]) -> Optional[Response]:
+        if user_id is None or _active_users.get(user_id) is None:
+            return None
+        cached = _payloads.get((scope, _versions.get(scope)))
+        if cached is None or not DashboardCache._etag_matches(request.headers.get("if-none-match"), cached[0]):
+            return None
+        return Response(status_code=304, headers={"ETag": cached[0], "Cache-Control": "private, no-cache"})
+
+    # Serve a dashboard for `scope`: cached payload, 304 on a matching ETag, or a fresh build.
+    # `build` is an async callable so a miss can await the queries.
+    @staticmethod
+    async def respond(scope, request: Request, response: Response, build: Callable[[], Awaitable[dict]]):
+        # Version read before building, so a write landing mid-build retires this entry
+        key = (scope, _versions.get(scope))
+        cached = _payloads.get(key)
+        if cached is None:
+            payload = jsonable_encoder(await build())
+            body = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+            cached = ('"' + hashlib.sha1(body.encode()).hexdigest() + '"', payload)
+            _payloads.set(key, cached)
+
+        etag, payload = cached
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if DashboardCache._etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return payload
+
+    @staticmethod
+    def _etag_matches(header: Optional[str], etag: str) -> bool:
+        if not header:
+            return False
+        candidates = [t.strip() for t in header.split(",")]
+        # Weak validators are fine for a GET revalidation
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -0,0 +1,152 @@
+import traceback
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, set_audit_user
+from app.models.raw_file import RawFile
+from app.services.archive_service import ArchiveService
+from app.services.dashboard_cache import DashboardCache
+from app.services.rollup_service import RollupService
+
+
+# pg advisory lock class for file purges (second key is the file id), so the
+# request's background task and the maintenance loop never purge one file twice
+PURGE_LOCK_CLASS = 4821002
+
+
+class FileDeletionService:
+    """
+    Two-phase file deletion.
+
+    request_delete only flags the raw_files row and holds its rollup counts
+    back from readers; from that commit on the file and its log rows are
+    excluded from every query. purge then removes the rows in
+    FILE_DELETE_BATCH_ROWS transactions (rollups, held counts and progress
+    updated per batch), and finally the archives and the raw_files row itself.
+    """
+
+    # Hide the file and record who asked; the caller schedules the purge
+    @staticmethod
+    def request_delete(db: Session, raw_file: RawFile, user_id: int) -> RawFile:
+        raw_file.is_pending_delete = True
+        raw_file.delete_requested_at = datetime.now(timezone.utc)
+        raw_file.delete_requested_by = user_id
+        raw_file.deleted_rows = 0
+        # Dashboards and facet counts keep reading the rollups, minus this file
+        where, params = FileDeletionService._rows_of(raw_file)
+        RollupService.hold_file(db, raw_file.file_id, where, params)
+        db.commit()
+        DashboardCache.invalidate(team_id=raw_file.team_id, user_id=raw_file.uploaded_by)
+        return raw_file
+
+    # Progress of a pending deletion
+    @staticmethod
+    def status(raw_file: RawFile) -> dict:
+        deleted = raw_file.deleted_rows or 0
+        # Archived files have no rows left in log_entries to remove
+        total = 0 if raw_file.is_archived else max(raw_file.line_count or 0, deleted)
+        return {
+            "file_id": raw_file.file_id,
+            "status": "pending_delete",
+            "requested_at": raw_file.delete_requested_at,
+            "deleted_rows": deleted,
+            "total_rows": total,
+            "progress": round(100.0 * deleted / total, 1) if total else 0.0
+        }
+
+    # Background task entry point: the request's session is gone by the time it runs
+    @staticmethod
+    def purge_in_background(file_id: int):
+        db = SessionLocal()
+        try:
+            FileDeletionService.purge(db, file_id)
+        except Exception:
+            db.rollback()
+            print(f"--- FILE DELETE ERROR (file {file_id}) ---")
+            print(traceback.format_exc())
+        finally:
+            db.close()
+
+    # Remove a pending file's rows, archives and record. Safe to re-run after an
+    # interruption; False when the file is not pending or another worker has it.
+    @staticmethod
+    def purge(db: Session, file_id: int) -> bool:
+        # Session-level advisory locks belong to a connection, and the Session hands
+        # its connection back to the pool on every commit, so the lock gets its own
+        lock = {"cls": PURGE_LOCK_CLASS, "file_id": file_id}
+        lock_conn = db.get_bind().connect()
+        locked = lock_conn.execute(text("SELECT pg_try_advisory_lock(:cls, :file_id)"), lock).scalar()
+        lock_conn.commit()
+        if not locked:
+            lock_conn.close()
+            return False
+
+        try:
+            raw_file = db.get(RawFile, file_id)
+            if not raw_file or not raw_file.is_pending_delete:
+                return False
+
+            # Audit triggers attribute the deletes to the requesting user; the
+            # setting is transaction-local, so each batch transaction sets it again
+            requested_by = raw_file.delete_requested_by
+
+            def _audit_user():
+                if requested_by is not None:
+                    set_audit_user(db, requested_by)
+
+            # 1. Log rows, oldest first
+            where, params = FileDeletionService._rows_of(raw_file)
+
+            def _progress(batch: dict):
+                raw_file.deleted_rows = (raw_file.deleted_rows or 0) + batch["rows"]
+
+            total = RollupService.delete_in_batches(
+                db, where, params, settings.FILE_DELETE_BATCH_ROWS,
+                on_batch=_progress, before_batch=_audit_user
+            )
+
+            # 2. Archives and the file record; cold-tier copies go once nothing points at them
+            _audit_user()
+            team_id, uploaded_by = raw_file.team_id, raw_file.uploaded_by
+            archive_paths = ArchiveService.delete_archives(db, file_id)
+            RollupService.release_file(db, file_id)
+            db.flush()
+            db.delete(raw_file)
+            db.commit()
+            ArchiveService.remove_archive_files(archive_paths)
+
+            DashboardCache.invalidate(team_id=team_id, user_id=uploaded_by)
+            print(f"File {file_id}: deleted {total} log rows and {len(archive_paths)} archive file(s)")
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:cls, :file_id)"), lock)
+            lock_conn.commit()
+            lock_conn.close()
+
+    # WHERE clause for a file's log rows; the ingest-time bounds keep it on the timestamp index
+    @staticmethod
+    def _rows_of(raw_file: RawFile):
+        where = "file_id = :file_id"
+        params = {"file_id": raw_file.file_id}
+        if raw_file.min_log_ts is not None and raw_file.max_log_ts is not None:
+            where += " AND log_timestamp BETWEEN :min_ts AND :max_ts"
+            params.update(min_ts=raw_file.min_log_ts, max_ts=raw_file.max_log_ts)
+        return where, params
+
+    # Finish deletions cut short by a restart or error (maintenance hook)
+    @staticmethod
+    def resume_pending(db: Session) -> List[int]:
+        pending = [
+            file_id for (file_id,) in db.query(RawFile.file_id)
+            .filter(RawFile.is_pending_delete.is_(True))
+            .order_by(RawFile.delete_requested_at)
+            .all()
+        ]
+        return [file_id for file_id in pending if FileDeletionService.purge(db, file_id)]
@@ -0,0 +1,173 @@
+from collections import Counter
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.log_entries import LogSeverity, LogCategory, Environment
+from app.models.raw_file import RawFile
+
+
+class FileStatsAccumulator:
+    """
+    Running per-file totals for one ingest job, fed with each flushed batch of
+    (timestamp, severity_id, category_id, message_line) rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.min_ts = None
+        self.max_ts = None
+        self.severities = Counter()
+        self.categories = Counter()
+
+    def add_rows(self, rows: list):
+        self.rows += len(rows)
+        self.severities.update(map(itemgetter(1), rows))
+        self.categories.update(map(itemgetter(2), rows))
+
+    def add_bounds(self, min_ts, max_ts):
+        self.min_ts = _earliest(self.min_ts, min_ts)
+        self.max_ts = _latest(self.max_ts, max_ts)
+
+
+class FileStatsService:
+    """
+    Maintains the summary columns on raw_files (line_count, min/max_log_ts and
+    per-severity / category / environment counts). Changes are made on the
+    ORM object and committed by the caller with the log rows themselves.
+    """
+
+    # Fold a finished ingest job into the file's stats
+    @staticmethod
+    def record_ingest(raw_file: RawFile, stats: FileStatsAccumulator, severities: dict,
+                      categories: dict, environment_code: Optional[str]):
+        # Parsers work with code -> id lookups; the stats are keyed by code
+        severity_codes = {v: k for k, v in severities.items()}
+        category_names = {v: k for k, v in categories.items()}
+
+        FileStatsService._apply(
+            raw_file,
+            rows=stats.rows,
+            min_ts=stats.min_ts,
+            max_ts=stats.max_ts,
+            severity_counts=_named(stats.severities, severity_codes),
+            category_counts=_named(stats.categories, category_names),
+            environment_counts={environment_code: stats.rows} if environment_code else {}
+        )
+
+    # Fold ORM-created LogEntry rows into the file's stats
+    @staticmethod
+    def record_entries(db: Session, raw_file: RawFile, entries: Iterable):
+        entries = list(entries)
+        if not entries:
+            return
+        severity_codes, category_names, environment_codes = FileStatsService._names(db)
+        timestamps = [_aware(e.log_timestamp) for e in entries]
+
+        FileStatsService._apply(
+            raw_file,
+            rows=len(entries),
+            min_ts=min(timestamps),
+            max_ts=max(timestamps),
+            severity_counts=_named(Counter(e.severity_id for e in entries), severity_codes),
+            category_counts=_named(Counter(e.category_id for e in entries), category_names),
+            environment_counts=_named(Counter(e.environment_id for e in entries), environment_codes)
+        )
+
+    # Take one deleted log row out of the file's counts (min/max stay as outer bounds)
+    @staticmethod
+    def remove_log(db: Session, file_id: int, severity_id, category_id, environment_id):
+        raw_file = db.get(RawFile, file_id)
+        if not raw_file:
+            return
+        severity_codes, category_names, environment_codes = FileStatsService._names(db)
+
+        raw_file.line_count = max((raw_file.line_count or 0) - 1, 0)
+        raw_file.severity_counts = _decrement(raw_file.severity_counts, severity_codes.get(severity_id))
+        raw_file.category_counts = _decrement(raw_file.category_counts, category_names.get(category_id))
+        raw_file.environment_counts = _decrement(raw_file.environment_counts, environment_codes.get(environment_id))
+
+    # Take batch-deleted rows out of their files' counts:
+    # (file_id, severity_id, category_id, environment_id, rows) groups
+    @staticmethod
+    def remove_groups(db: Session, groups: Iterable):
+        groups = list(groups)
+        if not groups:
+            return
+        severity_codes, category_names, environment_codes = FileStatsService._names(db)
+
+        for file_id, severity_id, category_id, environment_id, rows in groups:
+            raw_file = db.get(RawFile, file_id) if file_id is not None else None
+            if not raw_file:
+                continue
+            raw_file.line_count = max((raw_file.line_count or 0) - rows, 0)
+            raw_file.severity_counts = _decrement(raw_file.severity_counts, severity_codes.get(severity_id), rows)
+            raw_file.category_counts = _decrement(raw_file.category_counts, category_names.get(category_id), rows)
+            raw_file.environment_counts = _decrement(raw_file.environment_counts, environment_codes.get(environment_id), rows)
+
+    @staticmethod
+    def _apply(raw_file: RawFile, *, rows, min_ts, max_ts, severity_counts, category_counts, environment_counts):
+        raw_file.line_count = (raw_file.line_count or 0) + rows
+        raw_file.min_log_ts = _earliest(raw_file.min_log_ts, min_ts)
+        raw_file.max_log_ts = _latest(raw_file.max_log_ts, max_ts)
+        # New dicts rather than in-place updates so the JSONB columns are flagged dirty
+        raw_file.severity_counts = _merge(raw_file.severity_counts, severity_counts)
+        raw_file.category_counts = _merge(raw_file.category_counts, category_counts)
+        raw_file.environment_counts = _merge(raw_file.environment_counts, environment_counts)
+
+    @staticmethod
+    def _names(db: Session):
+        return (
+            dict(db.query(LogSeverity.severity_id, LogSeverity.severity_code).all()),
+            dict(db.query(LogCategory.category_id, LogCategory.category_name).all()),
+            dict(db.query(Environment.environment_id, Environment.environment_code).all()),
+        )
+
+
+def _named(counts: Counter, names: dict) -> dict:
+    # Rows without a known lookup id are left out of the breakdown
+    named = {}
+    for key, count in counts.items():
+        name = names.get(key)
+        if name is not None:
+            named[name] = named.get(name, 0) + count
+    return named
+
+
+def _merge(current: Optional[dict], extra: dict) -> dict:
+    merged = dict(current or {})
+    for key, count in extra.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def _decrement(current: Optional[dict], key: Optional[str], by: int = 1) -> dict:
+    updated = dict(current or {})
+    if key in updated:
+        updated[key] -= by
+        if updated[key] <= 0:
+            del updated[key]
+    return updated
+
+
+def _earliest(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+def _latest(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+def _aware(ts: datetime) -> datetime:
+    # API payloads may carry naive timestamps; stored stats are timestamptz
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
@@ -2,11 +2,13 @@ import os
 import shutil
 from fastapi import UploadFile
 import os
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Get the absolute path of the project root
 BASE_DIR = Path(__file__).resolve().parent.parent 
 BASE_UPLOAD_DIR = os.path.join(BASE_DIR, "uploads", "teams")
+BASE_ARCHIVE_DIR = os.path.join(BASE_DIR, "uploads", "archives")
 
 
 def save_file_locally(
@@ -29,3 +31,12 @@ def save_file_locally(
     file_size = os.path.getsize(file_path)
 
     return file_path, file_size
+
+
+def archive_path(team_id: int, file_id: int) -> str:
+    # Cold-tier location of an archived file's log rows (see ArchiveService).
+    # Time-stamped so an existing archive is never overwritten.
+    team_dir = os.path.join(BASE_ARCHIVE_DIR, f"team_{team_id}")
+    os.makedirs(team_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return os.path.join(team_dir, f"file_{file_id}_{stamp}.parquet")
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterator
+
+from app.core.config import settings
+from app.core.database import read_session
+from app.repositories.log_repository import ROW_COLUMNS, LogRepository
+
+
+EXPORT_COLUMNS = list(ROW_COLUMNS)
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+class LogExportService:
+    """
+    Streams filtered log rows as CSV or NDJSON.
+    Rows come from a server-side cursor in LOG_EXPORT_BATCH_ROWS batches and
+    each batch is encoded (and optionally gzipped) before the next is fetched,
+    so memory stays flat however many rows match.
+    """
+
+    @staticmethod
+    def media_type(fmt: str, gzip: bool) -> str:
+        return "application/gzip" if gzip else MEDIA_TYPES[fmt]
+
+    @staticmethod
+    def filename(fmt: str, gzip: bool, stamp: str) -> str:
+        return f"logs-export-{stamp}.{fmt}" + (".gz" if gzip else "")
+
+    @staticmethod
+    def stream(fmt: str, gzip: bool = False, **filters) -> Iterator[bytes]:
+        # Own session: the response body is produced after the request's
+        # dependencies (and their session) may already have been closed.
+        # Read-only, so it goes to the replica when one is usable.
+        db = read_session()
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+        encode = LogExportService._csv_batch if fmt == "csv" else LogExportService._ndjson_batch
+        try:
+            if fmt == "csv":
+                yield LogExportService._pack(",".join(EXPORT_COLUMNS) + "\r\n", compressor)
+
+            result = db.execute(
+                LogRepository.export_select(**filters).execution_options(
+                    stream_results=True,
+                    yield_per=settings.LOG_EXPORT_BATCH_ROWS
+                )
+            )
+            for batch in result.partitions():
+                chunk = LogExportService._pack(encode(batch), compressor)
+                if chunk:
+                    yield chunk
+
+            if compressor:
+                yield compressor.flush()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _pack(text: str, compressor) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    @staticmethod
+    def _csv_batch(rows) -> str:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for row in rows:
+            writer.writerow([
+                row.log_id, row.log_timestamp.isoformat(), row.severity_code, row.category_name,
+                row.environment_code, row.file_name, row.team_name, row.message_line
+            ])
+        return out.getvalue()
+
+    @staticmethod
+    def _ndjson_batch(rows) -> str:
+        lines = []
+        for row in rows:
+            record = dict(zip(EXPORT_COLUMNS, row))
+            record["log_timestamp"] = row.log_timestamp.isoformat()
+            lines.append(json.dumps(record, ensure_ascii=False))
+        return "\n".join(lines) + "\n"
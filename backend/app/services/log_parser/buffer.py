@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+import psutil
+
+
+class IngestBuffer:
+    """
+    Bounded buffer between the parsers and the database writer.
+
+    Rows are kept as plain tuples and handed to `flush_rows` as soon as the
+    estimated footprint reaches `budget_bytes`, so one large upload never
+    holds more than a single budget's worth of parsed rows at a time.
+    """
+
+    # Approximate cost of the row tuple, its datetime and the small ints
+    # on top of the message string itself.
+    ROW_OVERHEAD_BYTES = 160
+
+    def __init__(self, flush_rows, budget_bytes: int):
+        self.flush_rows = flush_rows
+        self.budget_bytes = max(int(budget_bytes), 1)
+
+        self.rows = []
+        self.buffered_bytes = 0
+        self.total_rows = 0
+        self.flush_count = 0
+
+        self._process = psutil.Process(os.getpid())
+        self.start_rss = self._process.memory_info().rss
+        self.peak_rss = self.start_rss
+        self.started_at = time.perf_counter()
+
+    def add(self, row: tuple, message: str):
+        self.rows.append(row)
+        self.buffered_bytes += sys.getsizeof(message) + self.ROW_OVERHEAD_BYTES
+
+        if self.buffered_bytes >= self.budget_bytes:
+            self.flush()
+
+    def extend(self, rows: list, size_bytes: int):
+        """Add a pre-built batch of rows (e.g. one CSV chunk) in one step."""
+        self.rows.extend(rows)
+        self.buffered_bytes += size_bytes + self.ROW_OVERHEAD_BYTES * len(rows)
+
+        if self.buffered_bytes >= self.budget_bytes:
+            self.flush()
+
+    def flush(self):
+        # RSS is highest right before the buffer is released, so sample here
+        self.sample_rss()
+        if not self.rows:
+            return
+
+        self.flush_rows(self.rows)
+        self.total_rows += len(self.rows)
+        self.flush_count += 1
+
+        self.rows = []
+        self.buffered_bytes = 0
+
+    def sample_rss(self):
+        rss = self._process.memory_info().rss
+        if rss > self.peak_rss:
+            self.peak_rss = rss
+
+    def metrics(self) -> dict:
+        mb = 1024 * 1024
+        return {
+            "rows": self.total_rows,
+            "flushes": self.flush_count,
+            "budget_mb": round(self.budget_bytes / mb, 2),
+            "start_rss_mb": round(self.start_rss / mb, 2),
+            "peak_rss_mb": round(self.peak_rss / mb, 2),
+            "rss_growth_mb": round((self.peak_rss - self.start_rss) / mb, 2),
+            "elapsed_s": round(time.perf_counter() - self.started_at, 3),
+        }
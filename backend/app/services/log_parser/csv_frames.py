@@ -0,0 +1,104 @@
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+from .parsers import row_fingerprint
+from .utils import CATEGORY_KEYWORDS
+
+# One alternation per category, e.g. "login|auth|token|permission"
+CATEGORY_PATTERNS = [
+    (category, "|".join(re.escape(k) for k in keywords))
+    for category, keywords in CATEGORY_KEYWORDS
+]
+
+
+def classify_series(messages: pd.Series) -> pd.Series:
+    """Vectorised classify_log: one substring scan per category over the whole column."""
+    lowered = messages.str.lower()
+    conditions = [lowered.str.contains(pattern, regex=True) for _, pattern in CATEGORY_PATTERNS]
+    categories = [category for category, _ in CATEGORY_PATTERNS]
+    return pd.Series(
+        np.select(conditions, categories, default="UNCATEGORIZED"),
+        index=messages.index
+    )
+
+
+def parse_csv_frames(text: str, chunk_rows: int):
+    """
+    Column-oriented counterpart of parsers.parse_csv.
+    Reads the CSV in chunks of `chunk_rows` and yields cleaned, de-duplicated
+    DataFrames with timestamp / severity / service / message columns.
+    """
+    reader = pd.read_csv(
+        io.StringIO(text.strip()),
+        chunksize=chunk_rows,
+        dtype=str,
+        keep_default_na=False,
+        skipinitialspace=True,
+        on_bad_lines="skip"
+    )
+    seen_hashes = set()
+
+    for chunk in reader:
+        # Standardize headers to lowercase to handle 'Timestamp' vs 'timestamp'
+        chunk.columns = [str(c).lower().strip() for c in chunk.columns]
+        if "timestamp" not in chunk.columns or "message" not in chunk.columns:
+            return
+
+        frame = pd.DataFrame({
+            "timestamp": pd.to_datetime(
+                chunk["timestamp"].str.strip(), format="%Y-%m-%d %H:%M:%S", errors="coerce"
+            ),
+            "severity": _column(chunk, "severity", "INFO").str.strip().str.upper(),
+            "service": _column(chunk, "service", "CSV-SVC").str.strip(),
+            "message": chunk["message"].str.strip(),
+        })
+
+        # Skip rows with unparseable timestamps or empty messages
+        frame = frame[frame["timestamp"].notna() & (frame["message"] != "")]
+        if frame.empty:
+            continue
+
+        # Dedup on the same 128-bit row digest as the line parsers, within and
+        # across chunks; a 64-bit hash would drop a distinct row on a collision
+        keep = []
+        for row in zip(frame["timestamp"].array.to_pydatetime(), frame["severity"], frame["service"], frame["message"]):
+            fingerprint = row_fingerprint(*row)
+            keep.append(fingerprint not in seen_hashes)
+            seen_hashes.add(fingerprint)
+
+        frame = frame[keep]
+        if not frame.empty:
+            yield frame
+
+
+def resolve_frame(frame: pd.DataFrame, severities: dict, categories: dict, def_sev, def_cat) -> list:
+    """
+    Map a parsed chunk onto writer rows:
+    (timestamp, severity_id, category_id, message_line) tuples.
+    """
+    sev_ids = _ids(frame["severity"].map(severities), def_sev)
+    cat_ids = _ids(classify_series(frame["message"]).map(categories), def_cat)
+    message_lines = "[" + frame["service"] + "] " + frame["message"]
+
+    return list(zip(
+        frame["timestamp"].array.to_pydatetime(),
+        sev_ids,
+        cat_ids,
+        message_lines.tolist()
+    ))
+
+
+def _column(chunk: pd.DataFrame, name: str, default: str) -> pd.Series:
+    if name in chunk.columns:
+        return chunk[name]
+    return pd.Series(default, index=chunk.index)
+
+
+def _ids(mapped: pd.Series, default) -> list:
+    # Lookup misses come back as NaN; fall back to the default id (which may be None)
+    if default is not None:
+        return mapped.fillna(default).astype(int).tolist()
+    return [None if pd.isna(v) else int(v) for v in mapped.tolist()]
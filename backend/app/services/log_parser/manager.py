@@ -1,68 +1,144 @@
+from psycopg2.extras import execute_values
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.models.log_entries import LogEntry, LogSeverity, LogCategory, Environment
+from app.models.raw_file import RawFile
+from app.services.dashboard_cache import DashboardCache
+from app.services.file_stats_service import FileStatsAccumulator, FileStatsService
+from app.services.rollup_service import rollup_upsert_sql
+from .buffer import IngestBuffer
+from .csv_frames import parse_csv_frames, resolve_frame
 from .utils import detect_actual_format, get_lookups, classify_log
 from . import parsers
 
 def parse_and_store_logs(db: Session, file_id: int, raw_text: str, format_name: str, environment_code: str = "DEV"):
     print(f"\n--- PARSER START: FileID {file_id} | Format: {format_name} ---")
-    
+
     lookups = get_lookups(db, environment_code)
-    
+
     # 1. Select Parser based on format name
     # fmt = format_name.upper().strip()
     fmt = detect_actual_format(raw_text, format_name.upper())
-    
+
     print(f"DEBUG: Extension said {format_name}, Content suggests {fmt}")
-    entries = []
-    
+
+    # Parsers are generators, so entries are consumed one at a time below.
+    # CSV goes through the column-oriented pandas path and yields whole chunks instead.
+    entries = frames = None
     if fmt in ['LOG', 'TXT']:
         print("Action: Using TEXT Parser")
-        entries = parsers.parse_text(raw_text)
+        entries = parsers.parse_text(
+            raw_text,
+            max_event_lines=settings.INGEST_MAX_EVENT_LINES,
+            max_event_chars=settings.INGEST_MAX_EVENT_CHARS
+        )
     elif fmt == 'JSON':
         print("Action: Using JSON Parser")
         entries = parsers.parse_json(raw_text)
     elif fmt == 'CSV':
-        print("Action: Using CSV Parser")
-        entries = parsers.parse_csv(raw_text)   
-    elif fmt == 'XML': 
+        print("Action: Using CSV Parser (vectorised)")
+        frames = parse_csv_frames(raw_text, settings.INGEST_CSV_CHUNK_ROWS)
+    elif fmt == 'XML':
         entries = parsers.parse_xml(raw_text)
+    elif fmt == 'ACCESS':
+        print("Action: Using ACCESS LOG Parser")
+        entries = parsers.parse_access_log(raw_text)
+    elif fmt == 'LOGFMT':
+        print("Action: Using LOGFMT Parser")
+        entries = parsers.parse_logfmt(raw_text)
+    elif fmt == 'SYSLOG':
+        print("Action: Using SYSLOG Parser")
+        entries = parsers.parse_syslog(raw_text)
     else:
         print(f"ERROR: Unsupported format '{fmt}'")
         return 0
 
-    print(f"Diagnostic: Parser returned {len(entries)} raw entries")
-
     # 2. Get Safe Defaults (Prevent NULL crashes)
     def_sev = db.query(LogSeverity.severity_id).filter(LogSeverity.severity_code == 'INFO').scalar()
     def_cat = db.query(LogCategory.category_id).filter(LogCategory.category_name == 'UNCATEGORIZED').scalar()
+    env_id = lookups['env'].environment_id if lookups['env'] else None
+    raw_file = db.get(RawFile, file_id)
 
-    log_objects = []
-    for i, e in enumerate(entries):
+    # 3. Buffer rows and flush them to the DB whenever the job's memory budget is reached
+    stats = FileStatsAccumulator()
+    buffer = IngestBuffer(
+        flush_rows=lambda rows: _write_rows(db, raw_file, env_id, rows, stats),
+        budget_bytes=settings.INGEST_MEMORY_BUDGET_MB * 1024 * 1024
+    )
+
+    severities = lookups['severities']
+    categories = lookups['categories']
+
+    for frame in frames or ():
+        rows = resolve_frame(frame, severities, categories, def_sev, def_cat)
+        buffer.extend(rows, int(frame["message"].str.len().sum()))
+
+    for e in entries or ():
         # Map Severity
-        sev_id = lookups['severities'].get(e['severity'].upper()) or def_sev
-        
+        sev_id = severities.get(e.severity) or def_sev
+
         # Map Category
-        cat_name = classify_log(e['message'])
-        cat_id = lookups['categories'].get(cat_name) or def_cat
-
-        # Create SQLAlchemy Object
-        log_entry = LogEntry(
-            file_id=file_id,
-            log_timestamp=e['timestamp'],
-            severity_id=sev_id,
-            category_id=cat_id,
-            environment_id=lookups['env'].environment_id if lookups['env'] else None,
-            message_line=f"[{e.get('service', 'N/A')}] {e['message']}"
-        )
-        log_objects.append(log_entry)
+        cat_id = categories.get(classify_log(e.message)) or def_cat
 
-    # 3. Save to Database
-    if log_objects:
-        print(f"Action: Bulk saving {len(log_objects)} objects to log_entries table...")
-        db.bulk_save_objects(log_objects) # it is used save all the log entries into database
+        message_line = f"[{e.service or 'N/A'}] {e.message}"
+        buffer.add((e.timestamp, sev_id, cat_id, message_line), message_line)
+
+    buffer.flush()
+
+    # 4. Commit everything flushed so far, plus the file's summary stats, as one unit
+    if buffer.total_rows:
+        FileStatsService.record_ingest(
+            raw_file, stats, severities, categories,
+            lookups['env'].environment_code if lookups['env'] else None
+        )
         db.commit()
-        print("--- PARSER SUCCESS: Database Committed ---\n")
+        DashboardCache.invalidate(team_id=raw_file.team_id, user_id=raw_file.uploaded_by)
+        print(f"--- PARSER SUCCESS: {buffer.total_rows} rows committed in {buffer.flush_count} flush(es) ---")
     else:
-        print("--- PARSER FAILED: No valid log lines found ---\n")
-    
-    return len(log_objects)
\ No newline at end of file
+        print("--- PARSER FAILED: No valid log lines found ---")
+
+    print(f"Metrics: FileID {file_id} | {buffer.metrics()}\n")
+    return buffer.total_rows
+
+
+# Column order matches the (timestamp, severity_id, category_id, message_line) buffer tuples.
+# The inserted rows are folded into log_rollups_hourly by the same statement,
+# which returns the page's timestamp bounds as Postgres stored them.
+INSERT_LOGS_SQL = (
+    "WITH inserted AS ("
+    "INSERT INTO log_entries "
+    "(file_id, team_id, uploaded_by, environment_id, "
+    "log_timestamp, severity_id, category_id, message_line) "
+    "VALUES %s "
+    "RETURNING log_timestamp, team_id, environment_id, severity_id, category_id), "
+    "rolled_up AS (" + rollup_upsert_sql("inserted") + ") "
+    "SELECT min(log_timestamp), max(log_timestamp) FROM inserted"
+)
+
+
+def _sql_int(value) -> str:
+    return "NULL" if value is None else str(int(value))
+
+
+def _write_rows(db: Session, raw_file: RawFile, environment_id, rows: list, stats: FileStatsAccumulator):
+    """
+    Insert one buffer's worth of rows (and their hourly rollups) inside the
+    current transaction, and add them to the file's running stats.
+    The buffered tuples are passed to psycopg2 as-is; the per-file constants
+    live in the VALUES template so no per-row dict or ORM object is built.
+    """
+    template = "({}, {}, {}, {}, %s, %s, %s, %s)".format(
+        _sql_int(raw_file.file_id),
+        _sql_int(raw_file.team_id),
+        _sql_int(raw_file.uploaded_by),
+        _sql_int(environment_id)
+    )
+    cursor = db.connection().connection.cursor()
+    try:
+        bounds = execute_values(cursor, INSERT_LOGS_SQL, rows, template=template, page_size=1000, fetch=True)
+    finally:
+        cursor.close()
+
+    stats.add_rows(rows)
+    for min_ts, max_ts in bounds:
+        stats.add_bounds(min_ts, max_ts)
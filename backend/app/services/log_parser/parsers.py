@@ -1,9 +1,10 @@
 import re
 import json
 import csv
+import hashlib
 import io
 import xml.etree.ElementTree as ET
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 # Regex for Text/Log files
 LOG_PATTERN = re.compile(
@@ -16,85 +17,158 @@ LOG_PATTERN = re.compile(
     re.IGNORECASE
 )
 
+class LogRecord:
+    """
+    Compact parsed log line handed from the parsers to the bulk writer.
+    Uses __slots__ so each line costs one small object instead of a 4-key dict.
+    """
+    __slots__ = ("timestamp", "severity", "service", "message")
+
+    def __init__(self, timestamp, severity, service, message):
+        self.timestamp = timestamp
+        self.severity = severity
+        self.service = service
+        self.message = message
+
+
+def iter_lines(text: str):
+    """
+    Yield the lines of `text` one at a time, without their newline.
+    Each line is sliced out of the original string, so nothing the size of
+    the upload is built alongside it (io.StringIO keeps a full UCS-4 copy,
+    splitlines() a list of every line).
+    """
+    start, end_of_text = 0, len(text)
+    while start < end_of_text:
+        end = text.find("\n", start)
+        if end < 0:
+            end = end_of_text
+        yield text[start:end]
+        start = end + 1
+
+
 # ---LOGIC FOR DEDUPLICATION 
+def row_fingerprint(timestamp, severity, service, message) -> bytes:
+    """128-bit digest identifying a parsed line; shared by every parser's dedup."""
+    # Only a 128-bit digest of the fields is kept, so the set holds 16 bytes per
+    # line instead of a second copy of every message. A 64-bit hash() is not
+    # enough: a collision would silently drop a distinct line. The short fields
+    # are length-prefixed so different field splits never encode the same way.
+    severity = str(severity)
+    service = str(service)
+    key = f"{timestamp}|{len(severity)}:{severity}|{len(service)}:{service}|{message}"
+    return hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
 def is_duplicate(log_entry, seen_set):
     """
     Creates a unique fingerprint for a log line.
     Returns True if log is already in the set, otherwise adds it and returns False.
     """
-    # We create a tuple of the data. Tuples are hashable and can be stored in a set.
-    fingerprint = (
-        str(log_entry['timestamp']),
-        log_entry['severity'],
-        log_entry['service'],
-        log_entry['message'].strip()
-    )
+    fingerprint = row_fingerprint(log_entry.timestamp, log_entry.severity, log_entry.service, log_entry.message)
     
     if fingerprint in seen_set:
         return True
     seen_set.add(fingerprint)
     return False
 
-def parse_text(text: str):
-    results = []
+def parse_text(text: str, max_event_lines: int = 200, max_event_chars: int = 65536):
+    """
+    Streaming parser for timestamped text logs.
+    Lines that do not start a new event (stack trace frames, "Caused by:",
+    wrapped messages) are attached to the event before them, so a whole
+    exception is stored as one row. Only one event is open at a time and it
+    is capped at `max_event_lines` continuation lines / `max_event_chars`
+    characters; anything past the cap is counted, not kept.
+    """
     seen_logs = set()
-    
-    for line in text.splitlines():
-        line = line.strip()
+    event = None          # LogRecord for the open event's header line
+    continuation = []     # its continuation lines (bounded)
+    continuation_chars = 0
+    truncated = 0
+
+    for raw_line in iter_lines(text):
+        line = raw_line.strip()
         if not line:  # it will Skip empty lines
             continue
         
         match = LOG_PATTERN.search(line)
-        if match:
-            data = match.groupdict()
-            try:
-                entry = {
-                    "timestamp": datetime.strptime(data["timestamp"], "%Y-%m-%d %H:%M:%S"),
-                    "severity": data["severity"].upper(),
-                    "service": data.get("service") if data.get("service") else "SYSTEM",
-                    "message": data["message"].strip()
-                }
-                
-                # Check for empty message or duplicate
-                if entry["message"] and not is_duplicate(entry, seen_logs):
-                    results.append(entry)
-                    
-            except Exception as e:
-                print(f"Row match found but parsing failed: {e}")
-                
-    return results
+        if not match:
+            # Continuation of the open event; lines before the first header are dropped
+            if event is not None:
+                line = raw_line.rstrip()
+                # Once a line is over the cap the rest are only counted, so the
+                # stored event stays a contiguous prefix of the original
+                if not truncated and len(continuation) < max_event_lines \
+                        and continuation_chars + len(line) <= max_event_chars:
+                    continuation.append(line)
+                    continuation_chars += len(line) + 1
+                else:
+                    truncated += 1
+            continue
+
+        # A new header closes the previous event
+        if event is not None:
+            entry = _close_event(event, continuation, truncated)
+            if entry.message and not is_duplicate(entry, seen_logs):
+                yield entry
+        event, continuation, continuation_chars, truncated = None, [], 0, 0
+
+        try:
+            # Read groups straight off the match instead of building a groupdict()
+            event = LogRecord(
+                datetime.strptime(match["timestamp"], "%Y-%m-%d %H:%M:%S"),
+                match["severity"].upper(),
+                match["service"] or "SYSTEM",
+                match["message"].strip()
+            )
+        except Exception as e:
+            print(f"Row match found but parsing failed: {e}")
+
+    if event is not None:
+        entry = _close_event(event, continuation, truncated)
+        if entry.message and not is_duplicate(entry, seen_logs):
+            yield entry
+
+
+def _close_event(event: LogRecord, continuation: list, truncated: int) -> LogRecord:
+    if continuation or truncated:
+        parts = [event.message] if event.message else []
+        parts.extend(continuation)
+        # Also when even the first continuation line was over the cap
+        if truncated:
+            parts.append(f"... [{truncated} more lines truncated]")
+        event.message = "\n".join(parts)
+    return event
 
 
 def parse_json(text: str):
     try:
         data = json.loads(text) #it will loads the entire raw text into list of log entries
-        items = data if isinstance(data, list) else [data] #if data is not in list form it will convert
-        results = []
-        seen_logs = set()
-
-        for i in items:
-            # Check if required keys exist and are not empty
-            if not i.get("timestamp") or not i.get("message"):
-                continue
-                
-            try:
-                entry = {
-                    "timestamp": datetime.strptime(i["timestamp"], "%Y-%m-%d %H:%M:%S"),
-                    "severity": i.get("severity", "INFO").upper(),
-                    "service": i.get("service", "JSON-SVC"),
-                    "message": i["message"].strip()
-                }
-                
-                if not is_duplicate(entry, seen_logs):
-                    results.append(entry)
-            except:
-                continue
-        return results
     except:
-        return []
+        return
+    items = data if isinstance(data, list) else [data] #if data is not in list form it will convert
+    seen_logs = set()
+
+    for i in items:
+        # Check if required keys exist and are not empty
+        if not isinstance(i, dict) or not i.get("timestamp") or not i.get("message"):
+            continue
+            
+        try:
+            entry = LogRecord(
+                datetime.strptime(i["timestamp"], "%Y-%m-%d %H:%M:%S"),
+                i.get("severity", "INFO").upper(),
+                i.get("service", "JSON-SVC"),
+                i["message"].strip()
+            )
+        except:
+            continue
+
+        if not is_duplicate(entry, seen_logs):
+            yield entry
 
 def parse_csv(text: str):
-    results = []
     seen_logs = set()
     f = io.StringIO(text.strip())
     # skipinitialspace=True handles spaces after commas automatically
@@ -111,54 +185,317 @@ def parse_csv(text: str):
             continue
 
         try:
-            entry = {
-                "timestamp": datetime.strptime(ts.strip(), "%Y-%m-%d %H:%M:%S"),
-                "severity": clean_row.get("severity", "INFO").strip().upper(),
-                "service": clean_row.get("service", "CSV-SVC").strip(),
-                "message": msg.strip()
-            }
-            
-            if not is_duplicate(entry, seen_logs):
-                results.append(entry)
+            entry = LogRecord(
+                datetime.strptime(ts.strip(), "%Y-%m-%d %H:%M:%S"),
+                clean_row.get("severity", "INFO").strip().upper(),
+                clean_row.get("service", "CSV-SVC").strip(),
+                msg.strip()
+            )
         except:
             continue
-            
-    return results
+
+        if not is_duplicate(entry, seen_logs):
+            yield entry
 
 def parse_xml(text: str):
-    results = []
     seen_logs = set()
     try:
         root = ET.fromstring(text.strip())
-        for log in root.findall('log'):
-            ts_node = log.find('timestamp')
-            msg_node = log.find('message')
+    except:
+        return
+
+    for log in root.findall('log'):
+        ts_node = log.find('timestamp')
+        msg_node = log.find('message')
+        
+        if ts_node is None or msg_node is None: # Skip if tags are missing
+            continue
             
-            if ts_node is None or msg_node is None: # Skip if tags are missing
-                continue
-                
-            ts = ts_node.text
-            msg = msg_node.text
+        ts = ts_node.text
+        msg = msg_node.text
+        
+        if not ts or not msg: # Skip if tags are empty
+            continue
+
+        try:
+            sev_node = log.find('severity')
+            svc_node = log.find('service')
             
-            if not ts or not msg: # Skip if tags are empty
+            entry = LogRecord(
+                datetime.strptime(ts.strip(), "%Y-%m-%d %H:%M:%S"),
+                sev_node.text.strip().upper() if sev_node is not None else "INFO",
+                svc_node.text.strip() if svc_node is not None else "XML-SVC",
+                msg.strip()
+            )
+        except:
+            continue
+
+        if not is_duplicate(entry, seen_logs):
+            yield entry
+
+
+# --- HAND-TUNED PARSERS FOR COMMON SERVER FORMATS
+# These split lines positionally (find/partition/slicing) instead of using
+# backtracking regexes, since access logs and syslog files are often huge.
+
+MONTHS = {m: i for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1
+)}
+
+# Aliases seen in logfmt levels and syslog keywords -> our severity codes
+SEVERITY_ALIASES = {
+    "TRACE": "DEBUG", "DEBUG": "DEBUG",
+    "INFO": "INFO", "NOTICE": "INFO",
+    "WARN": "WARN", "WARNING": "WARN",
+    "ERR": "ERROR", "ERROR": "ERROR",
+    "CRIT": "FATAL", "CRITICAL": "FATAL", "FATAL": "FATAL",
+    "ALERT": "FATAL", "EMERG": "FATAL", "PANIC": "FATAL",
+}
+
+# Syslog severity is the low 3 bits of PRI (RFC 5424 section 6.2.1)
+SYSLOG_SEVERITIES = ["FATAL", "FATAL", "FATAL", "ERROR", "WARN", "INFO", "INFO", "DEBUG"]
+
+_tz_cache = {}
+
+
+def normalise_severity(level: str) -> str:
+    level = level.strip().upper()
+    return SEVERITY_ALIASES.get(level, level)
+
+
+def _parse_clf_time(value: str) -> datetime:
+    """Parse '10/Oct/2000:13:55:36 -0700' by position."""
+    offset = value[21:26]
+    tz = _tz_cache.get(offset)
+    if tz is None:
+        minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+        tz = timezone(timedelta(minutes=-minutes if offset[0] == "-" else minutes))
+        _tz_cache[offset] = tz
+    return datetime(
+        int(value[7:11]), MONTHS[value[3:6]], int(value[0:2]),
+        int(value[12:14]), int(value[15:17]), int(value[18:20]),
+        tzinfo=tz
+    )
+
+
+def _parse_iso_time(value: str) -> datetime:
+    # Unix epoch seconds are common in logfmt output
+    if value[:1].isdigit() and value.replace(".", "", 1).isdigit():
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    return datetime.fromisoformat(value)
+
+
+def parse_access_log(text: str):
+    """
+    Nginx / Apache common and combined access logs:
+    host ident user [10/Oct/2000:13:55:36 -0700] "GET / HTTP/1.1" 200 2326 "referer" "agent"
+    Severity follows the status code: 5xx -> ERROR, 4xx -> WARN, otherwise INFO.
+    """
+    seen_logs = set()
+
+    for line in iter_lines(text):
+        line = line.strip()
+        if not line:
+            continue
+
+        ts_start = line.find(" [")
+        ts_end = line.find("] ", ts_start)
+        if ts_start < 0 or ts_end < 0:
+            continue
+
+        try:
+            timestamp = _parse_clf_time(line[ts_start + 2:ts_end])
+            request_end = line.find('"', ts_end + 3) if line[ts_end + 2:ts_end + 3] == '"' else ts_end + 1
+            if request_end < 0:
                 continue
+            status = line[request_end + 1:].split(None, 1)[0]
+            code = int(status) if status.isdigit() else 0
+        except (KeyError, ValueError, IndexError):
+            continue
+
+        if code >= 500:
+            severity = "ERROR"
+        elif code >= 400:
+            severity = "WARN"
+        else:
+            severity = "INFO"
+
+        host = line[:line.find(" ")]
+        entry = LogRecord(timestamp, severity, "HTTP", f"{host} {line[ts_end + 2:]}")
+
+        if not is_duplicate(entry, seen_logs):
+            yield entry
 
-            try:
-                sev_node = log.find('severity')
-                svc_node = log.find('service')
-                
-                entry = {
-                    "timestamp": datetime.strptime(ts.strip(), "%Y-%m-%d %H:%M:%S"),
-                    "severity": sev_node.text.strip().upper() if sev_node is not None else "INFO",
-                    "service": svc_node.text.strip() if svc_node is not None else "XML-SVC",
-                    "message": msg.strip()
-                }
-                
-                if not is_duplicate(entry, seen_logs):
-                    results.append(entry)
-            except:
+
+def split_logfmt(line: str) -> dict:
+    """Split 'key=value key2="quoted value" flag' into a dict, left to right."""
+    fields = {}
+    i, n = 0, len(line)
+
+    while i < n:
+        if line[i] == " ":
+            i += 1
+            continue
+
+        eq = line.find("=", i)
+        space = line.find(" ", i)
+        if eq < 0 or (0 <= space < eq):
+            # Bare key without a value
+            end = n if space < 0 else space
+            fields[line[i:end]] = ""
+            i = end
+            continue
+
+        key = line[i:eq]
+        i = eq + 1
+        if i < n and line[i] == '"':
+            end = line.find('"', i + 1)
+            while end > 0 and line[end - 1] == "\\":
+                end = line.find('"', end + 1)
+            if end < 0:
+                end = n
+            value = line[i + 1:end]
+            if "\\" in value:
+                value = value.replace('\\"', '"').replace("\\\\", "\\")
+            i = end + 1
+        else:
+            end = line.find(" ", i)
+            if end < 0:
+                end = n
+            value = line[i:end]
+            i = end
+
+        fields[key] = value
+
+    return fields
+
+
+LOGFMT_TIME_KEYS = ("time", "ts", "timestamp", "t")
+LOGFMT_LEVEL_KEYS = ("level", "lvl", "severity")
+LOGFMT_MESSAGE_KEYS = ("msg", "message")
+LOGFMT_SERVICE_KEYS = ("service", "svc", "app", "component", "logger")
+
+
+def _first(fields: dict, keys: tuple):
+    for key in keys:
+        value = fields.pop(key, None)
+        if value:
+            return value
+    return None
+
+
+def parse_logfmt(text: str):
+    """
+    logfmt lines as emitted by Go services (logrus, zap, slog):
+    time=2026-01-15T10:15:22Z level=info msg="user login" service=auth user_id=42
+    Fields other than time/level/msg/service are kept as key=value after the message.
+    """
+    seen_logs = set()
+
+    for line in iter_lines(text):
+        line = line.strip()
+        if not line:
+            continue
+
+        fields = split_logfmt(line)
+        ts = _first(fields, LOGFMT_TIME_KEYS)
+        if not ts:
+            continue
+
+        try:
+            timestamp = _parse_iso_time(ts)
+        except ValueError:
+            continue
+
+        level = _first(fields, LOGFMT_LEVEL_KEYS)
+        service = _first(fields, LOGFMT_SERVICE_KEYS) or "LOGFMT"
+        message = _first(fields, LOGFMT_MESSAGE_KEYS) or ""
+        if fields:
+            extra = " ".join(f"{k}={v}" if v else k for k, v in fields.items())
+            message = f"{message} {extra}" if message else extra
+
+        entry = LogRecord(
+            timestamp,
+            normalise_severity(level) if level else "INFO",
+            service,
+            message.strip()
+        )
+
+        if entry.message and not is_duplicate(entry, seen_logs):
+            yield entry
+
+
+def parse_syslog(text: str):
+    """
+    Syslog files, with or without a <PRI> prefix:
+    RFC 5424: <165>1 2003-10-11T22:14:15.003Z host app procid msgid [sd] message
+    RFC 3164: <34>Oct 11 22:14:15 host app[123]: message
+    RFC 3164 has no year, so the current year is assumed (last year if that would be in the future).
+    """
+    seen_logs = set()
+    now = datetime.now()
+
+    for line in iter_lines(text):
+        line = line.strip()
+        if not line:
+            continue
+
+        severity = "INFO"
+        try:
+            if line[0] == "<":
+                close = line.find(">", 1, 5)
+                severity = SYSLOG_SEVERITIES[int(line[1:close]) & 7]
+                line = line[close + 1:]
+
+            if line[:2] == "1 ":
+                # RFC 5424: VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID SD MSG
+                parts = line.split(" ", 6)
+                timestamp = datetime.fromisoformat(parts[1])
+                host, service = parts[2], parts[3]
+                message = _strip_structured_data(parts[6] if len(parts) > 6 else "")
+            else:
+                # RFC 3164: "Mmm dd hh:mm:ss HOST TAG: MSG"
+                timestamp = datetime(
+                    now.year, MONTHS[line[0:3]], int(line[4:6]),
+                    int(line[7:9]), int(line[10:12]), int(line[13:15])
+                )
+                if timestamp > now + timedelta(days=1):
+                    timestamp = timestamp.replace(year=now.year - 1)
+                host, _, rest = line[16:].partition(" ")
+                tag, sep, message = rest.partition(": ")
+                if not sep:
+                    tag, message = "", rest
+                service = tag.split("[", 1)[0]
+        except (KeyError, ValueError, IndexError):
+            continue
+
+        if service in ("", "-"):
+            service = "SYSLOG"
+
+        entry = LogRecord(timestamp, severity, service, f"{host} {message.strip()}")
+
+        if message.strip() and not is_duplicate(entry, seen_logs):
+            yield entry
+
+
+def _strip_structured_data(rest: str) -> str:
+    """Drop the RFC 5424 STRUCTURED-DATA field ('-' or one or more [..] blocks)."""
+    if rest[:1] == "-":
+        return rest[2:]
+    i = 0
+    while rest[i:i + 1] == "[":
+        # Skip to the closing bracket, ignoring brackets inside quoted params
+        i += 1
+        in_quotes = False
+        while i < len(rest):
+            ch = rest[i]
+            if ch == "\\":
+                i += 2
                 continue
-    except:
-        pass
-        
-    return results
\ No newline at end of file
+            if ch == '"':
+                in_quotes = not in_quotes
+            elif ch == "]" and not in_quotes:
+                break
+            i += 1
+        i += 1
+    return rest[i:].lstrip()
@@ -9,36 +9,60 @@ def get_lookups(db: Session, environment_code: str):
         "env": db.query(Environment).filter(Environment.environment_code == environment_code).first()
     }
 
+# Checked in order; the first category with a matching keyword wins.
+# Shared with the vectorised CSV path so both classify identically.
+CATEGORY_KEYWORDS = [
+    ("SECURITY", ["login", "auth", "token", "permission"]),
+    ("INFRASTRUCTURE", ["cpu", "memory", "disk", "server", "node"]),
+    ("AUDIT", ["audit", "compliance", "policy"]),
+    ("APPLICATION", ["error", "exception", "failed", "timeout"]),
+]
+
 def classify_log(message: str) -> str:
     msg = str(message).lower()
-    if any(k in msg for k in ["login", "auth", "token", "permission"]): return "SECURITY"
-    if any(k in msg for k in ["cpu", "memory", "disk", "server", "node"]): return "INFRASTRUCTURE"
-    if any(k in msg for k in ["audit", "compliance", "policy"]): return "AUDIT"
-    if any(k in msg for k in ["error", "exception", "failed", "timeout"]): return "APPLICATION"
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(k in msg for k in keywords): return category
     return "UNCATEGORIZED"
 
 
-def detect_actual_format(raw_text: str, extension_format: str) -> str:
-    # Clean and get a sample of the first 1000 characters
-    content = raw_text.strip()
-    if not content:
-        return extension_format
+# Format sniffing patterns (only ever run against the first data line)
+NON_BLANK = re.compile(r"\S")
+SYSLOG_PRI_PATTERN = re.compile(r"^<\d{1,3}>")
+SYSLOG_BSD_PATTERN = re.compile(r"^[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2} \S+ ")
+ACCESS_LOG_PATTERN = re.compile(r"^\S+ \S+ \S+ \[\d{2}/[A-Z][a-z]{2}/\d{4}:\d{2}:\d{2}:\d{2} [+-]\d{4}\] ")
+LOGFMT_KEY_PATTERN = re.compile(r"(?:^|\s)[\w.\-]+=")
+LOGFMT_CORE_KEY_PATTERN = re.compile(r"(?:^|\s)(?:time|ts|level|lvl|msg)=")
+
 
-    #Skip leading empty lines to find the first real data line
-    lines = [l.strip() for l in content.split('\n') if l.strip()]
-    if not lines:
+def detect_actual_format(raw_text: str, extension_format: str) -> str:
+    #Skip leading blank space to find the first real data line; it is sliced
+    # out by index, so the (possibly huge) upload is never copied
+    first_char = NON_BLANK.search(raw_text)
+    if not first_char:
         return extension_format
-    
-    first_line = lines[0]
+    line_end = raw_text.find("\n", first_char.start())
+    first_line = raw_text[first_char.start():line_end if line_end >= 0 else None].strip()
 
     #Check for JSON (Starts with [ or { )
     if first_line.startswith(('[', '{')):
         return "JSON"
 
+    #Check for syslog before XML, since both can start with '<' ("<34>Oct 11 ...")
+    if SYSLOG_PRI_PATTERN.match(first_line) or SYSLOG_BSD_PATTERN.match(first_line):
+        return "SYSLOG"
+
     #Check for XML (Starts with < )
     if first_line.startswith('<'):
         return "XML"
 
+    #Check for Nginx/Apache access logs: host ident user [10/Oct/2000:13:55:36 -0700] "..."
+    if ACCESS_LOG_PATTERN.match(first_line):
+        return "ACCESS"
+
+    #Check for logfmt (key=value pairs including a time/level/msg key)
+    if len(LOGFMT_KEY_PATTERN.findall(first_line)) >= 2 and LOGFMT_CORE_KEY_PATTERN.search(first_line):
+        return "LOGFMT"
+
     #Check for "Standard Log" pattern (Starts with a Date 0000-00-00)
     # If it starts with a date, it's definitely a LOG, even if it has commas
     if re.match(r"^[\[]?\d{4}-\d{2}-\d{2}", first_line):
@@ -1,14 +1,29 @@
+import asyncio
+import heapq
+from datetime import datetime, timezone
+from itertools import islice
 from typing import List, Optional
-from datetime import datetime
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.time_range import resolve_range
+from app.models.archives import Archive
 from app.models.log_entries import LogEntry
+from app.repositories.archive_repository import ArchiveRepository, row_key
 from app.repositories.log_repository import LogRepository
 from app.repositories.file_repository import FileRepository
 from app.services.team_service import TeamService
+from app.services.dashboard_cache import DashboardCache
+from app.services.file_stats_service import FileStatsService
 from app.services.role_service import RoleService
+from app.services.rollup_service import RollupService
+
+# Exact totals reused across page requests with identical filters (count_mode=cached)
+_count_cache = TTLCache(ttl_seconds=settings.LOG_COUNT_CACHE_TTL_SECONDS)
 
 
 
@@ -47,7 +62,7 @@ class LogService:
         )
 
         # 3. Validate file ownership
-        raw_file = FileRepository.get_by_id(db, file_id)
+        raw_file = FileRepository.get_by_id(db, file_id, for_write=True)
         if not raw_file:
             raise ValueError("File not found")
 
@@ -60,6 +75,8 @@ class LogService:
         # 4. Create log entry
         log = LogEntry(
             file_id=file_id,
+            team_id=raw_file.team_id,
+            uploaded_by=raw_file.uploaded_by,
             log_timestamp=log_timestamp,
             severity_id=severity_id,
             category_id=category_id,
@@ -69,7 +86,11 @@ class LogService:
 
         try:
             db.add(log)
+            db.flush()
+            RollupService.record_rows(db, [LogService._rollup_row(log)])
+            FileStatsService.record_entries(db, raw_file, [log])
             db.commit()
+            DashboardCache.invalidate(team_id=raw_file.team_id, user_id=raw_file.uploaded_by)
             db.refresh(log)
             return log
 
@@ -108,7 +129,7 @@ class LogService:
             user_id=user_id
         )
 
-        raw_file = FileRepository.get_by_id(db, file_id)
+        raw_file = FileRepository.get_by_id(db, file_id, for_write=True)
         if not raw_file or raw_file.team_id != team.team_id:
             raise ValueError("Invalid file or team mismatch")
 
@@ -121,6 +142,8 @@ class LogService:
         for item in logs:
             entry = LogEntry(
                 file_id=file_id,
+                team_id=raw_file.team_id,
+                uploaded_by=raw_file.uploaded_by,
                 log_timestamp=item["log_timestamp"],
                 message_line=item["message_line"],
                 severity_id=item.get("severity_id"),
@@ -131,7 +154,10 @@ class LogService:
 
         try:
             db.bulk_save_objects(entries)
+            RollupService.record_rows(db, [LogService._rollup_row(e) for e in entries])
+            FileStatsService.record_entries(db, raw_file, entries)
             db.commit()
+            DashboardCache.invalidate(team_id=raw_file.team_id, user_id=raw_file.uploaded_by)
             return len(entries)
 
         except IntegrityError:
@@ -191,3 +217,275 @@ class LogService:
             "total": total,
             "items": logs
         }
+
+    @staticmethod
+    def _rollup_row(log: LogEntry) -> tuple:
+        return (log.log_timestamp, log.team_id, log.environment_id, log.severity_id, log.category_id)
+
+    # One Log Explorer page: items plus total according to count_mode
+    @staticmethod
+    def list_logs_page(db: Session, *, count_mode: str = "exact", limit: int = 10, offset: int = 0,
+                       cursor: Optional[str] = None, include_archived: bool = False,
+                       facets: Optional[List[str]] = None, **filters) -> dict:
+        """
+        On top of the count_logs strategies:
+          window   - total from count(*) OVER () on the page query itself (one round trip)
+          has_more - fetch limit + 1 rows and report has_more instead of a total
+        The window total would only cover rows after a cursor, so cursor pages
+        fall back to a separate exact count.
+        include_archived also searches the cold-tier archives (see _list_with_archives).
+        facets adds per-value counts over the whole filtered set (see facet_counts).
+        """
+        if include_archived:
+            return LogService._list_with_archives(
+                db, count_mode=count_mode, limit=limit, offset=offset, cursor=cursor,
+                facets=facets, **filters
+            )
+
+        page = LogService._list_page(
+            db, count_mode=count_mode, limit=limit, offset=offset, cursor=cursor, **filters
+        )
+        if facets:
+            page["facets"] = LogService.facet_counts(db, facets, **filters)
+        return page
+
+    # list_logs_page for the async routes
+    @staticmethod
+    async def list_logs_page_async(db: AsyncSession, *, count_mode: str = "exact", limit: int = 10,
+                                   offset: int = 0, cursor: Optional[str] = None,
+                                   include_archived: bool = False,
+                                   facets: Optional[List[str]] = None, **filters) -> dict:
+        """
+        Database work runs on the session through run_sync. With include_archived
+        the Arrow scan of the archives runs on the archive scan pool at the same
+        time as the live query, outside run_sync, so it holds neither the event
+        loop nor the connection; the two are merged once both are done.
+        """
+        if not include_archived:
+            return await db.run_sync(
+                LogService.list_logs_page, count_mode=count_mode, limit=limit, offset=offset,
+                cursor=cursor, facets=facets, **filters
+            )
+
+        start, keep = LogService._archive_window(limit, offset, cursor)
+        scan = await db.run_sync(
+            ArchiveRepository.plan, keep=keep, count=count_mode != "has_more", cursor=cursor,
+            facets=facets, **filters
+        )
+        live, archived = await asyncio.gather(
+            db.run_sync(LogService._live_for_archives, count_mode=count_mode, keep=keep, cursor=cursor, **filters),
+            scan.run_async()
+        )
+        page = LogService._merge_archive_page(
+            live, archived, count_mode=count_mode, limit=limit, offset=offset, cursor=cursor
+        )
+        if facets:
+            page["facets"] = await db.run_sync(
+                LogService.facet_counts, facets, archived=archived[2], exclude_archive_copies=True, **filters
+            )
+        return page
+
+    @staticmethod
+    def _list_page(db: Session, *, count_mode: str, limit: int, offset: int, cursor: Optional[str],
+                   **filters) -> dict:
+        if count_mode == "window" and cursor:
+            count_mode = "exact"
+
+        if count_mode == "window":
+            items, total = LogRepository.list_logs_with_total(db, limit=limit, offset=offset, **filters)
+            if total is None:
+                # Empty page: past the end (offset > 0) still needs a total for the pager
+                total = LogRepository.count_logs(db, **filters) if offset > 0 else 0
+            return {
+                "items": items,
+                "total": total,
+                "count_mode": "window",
+                "total_is_exact": True,
+                "has_more": offset + len(items) < total,
+            }
+
+        if count_mode == "has_more":
+            items = LogRepository.list_logs(db, limit=limit + 1, offset=offset, cursor=cursor, **filters)
+            has_more = len(items) > limit
+            items = items[:limit]
+            # No count query: total is only the number of rows known to exist
+            return {
+                "items": items,
+                "total": offset + len(items) + int(has_more),
+                "count_mode": "has_more",
+                "total_is_exact": not has_more and not cursor,
+                "has_more": has_more,
+            }
+
+        items = LogRepository.list_logs(db, limit=limit, offset=offset, cursor=cursor, **filters)
+        counts = LogService.count_logs(db, count_mode=count_mode, **filters)
+        return {"items": items, **counts}
+
+    @staticmethod
+    def _list_with_archives(db: Session, *, count_mode: str, limit: int, offset: int,
+                            cursor: Optional[str], facets: Optional[List[str]] = None,
+                            **filters) -> dict:
+        """
+        One page over log_entries and the archived Parquet files together.
+        Both sides return their newest offset + limit + 1 matches in listing
+        order and the two runs are merged by (log_timestamp, log_id), so
+        offsets and cursors page across tiers as if they were one table.
+        Archived rows are counted exactly while they are scanned (except for
+        has_more); window is served as exact since it cannot span both tiers.
+        Facets add the archived rows' counts, so they sum to the same total.
+        """
+        start, keep = LogService._archive_window(limit, offset, cursor)
+        archived = ArchiveRepository.search(
+            db, keep=keep, count=count_mode != "has_more", cursor=cursor, facets=facets, **filters
+        )
+        live = LogService._live_for_archives(db, count_mode=count_mode, keep=keep, cursor=cursor, **filters)
+        page = LogService._merge_archive_page(
+            live, archived, count_mode=count_mode, limit=limit, offset=offset, cursor=cursor
+        )
+        if facets:
+            page["facets"] = LogService.facet_counts(
+                db, facets, archived=archived[2], exclude_archive_copies=True, **filters
+            )
+        return page
+
+    @staticmethod
+    def _archive_window(limit: int, offset: int, cursor: Optional[str]) -> tuple:
+        # (rows to skip in the merged run, rows each side must return)
+        start = 0 if cursor else offset
+        return start, start + limit + 1
+
+    # Live side of a page with archives: the newest `keep` rows and, unless
+    # count_mode is has_more, the live total. Rows of archives still being
+    # purged are left to the archive side, so none is listed twice.
+    @staticmethod
+    def _live_for_archives(db: Session, *, count_mode: str, keep: int, cursor: Optional[str],
+                           **filters) -> tuple:
+        filters["exclude_archive_copies"] = True
+        rows = LogRepository.list_logs(db, limit=keep, offset=0, cursor=cursor, **filters)
+        if count_mode == "has_more":
+            return rows, None
+        counts = LogService.count_logs(
+            db, count_mode="exact" if count_mode == "window" else count_mode, **filters
+        )
+        return rows, counts
+
+    @staticmethod
+    def _merge_archive_page(live: tuple, archived: tuple, *, count_mode: str, limit: int,
+                            offset: int, cursor: Optional[str]) -> dict:
+        (live_rows, counts), (archived_rows, archived_total, _) = live, archived
+        start, keep = LogService._archive_window(limit, offset, cursor)
+        merged = list(islice(heapq.merge(live_rows, archived_rows, key=row_key, reverse=True), start, keep))
+        has_more = len(merged) > limit
+        items = merged[:limit]
+
+        if count_mode == "has_more":
+            return {
+                "items": items,
+                "total": offset + len(items) + int(has_more),
+                "count_mode": "has_more",
+                "total_is_exact": not has_more and not cursor,
+                "has_more": has_more,
+            }
+        return {**counts, "items": items, "total": counts["total"] + archived_total, "has_more": has_more}
+
+    # Facet counts for a log listing
+    @staticmethod
+    def facet_counts(db: Session, facets: List[str], archived: Optional[dict] = None, **filters) -> dict:
+        """
+        {facet: [{"value": label, "count": n}, ...]} for each requested facet
+        (severity, category, environment), largest first; value None counts
+        rows without one. All facets come from a single grouped query: over
+        the hourly rollups when they can answer the filters exactly, else a
+        GROUPING SETS scan of the filtered log_entries. `archived` adds the
+        cold-tier counts ({facet: {label: n}}, from ArchiveRepository.search).
+        """
+        if LogService._rollups_cover(db, filters):
+            start_ts, end_ts = resolve_range(filters.get("start_date"), filters.get("end_date"), filters.get("tz"))
+            counts = RollupService.facet_counts(
+                db, facets,
+                team_id=filters.get("team_id"),
+                severity_code=filters.get("severity_code"),
+                category_name=filters.get("category_name"),
+                environment_code=filters.get("environment_code"),
+                start_ts=start_ts,
+                end_ts=end_ts
+            )
+        else:
+            counts = LogRepository.facet_counts(db, facets, **filters)
+
+        labels = LogRepository.facet_labels(db, facets)
+        result = {}
+        for name in facets:
+            by_label = dict((archived or {}).get(name, {}))
+            for value, n in counts[name].items():
+                label = labels[name].get(value)
+                by_label[label] = by_label.get(label, 0) + n
+            result[name] = sorted(
+                ({"value": label, "count": n} for label, n in by_label.items()),
+                key=lambda facet: (-facet["count"], facet["value"] or "")
+            )
+        return result
+
+    @staticmethod
+    def _rollups_cover(db: Session, filters: dict) -> bool:
+        # The rollup key is (UTC hour, team, environment, severity, category)
+        search = filters.get("search")
+        if filters.get("user_id") or filters.get("file_id") or (search and str(search).strip()):
+            return False
+        for bound in resolve_range(filters.get("start_date"), filters.get("end_date"), filters.get("tz")):
+            if bound is None:
+                continue
+            # Dates in zones like Asia/Kolkata fall mid-hour in UTC
+            utc = bound.astimezone(timezone.utc)
+            if utc.minute or utc.second or utc.microsecond:
+                return False
+        # Files awaiting background deletion are netted out by visible_counts();
+        # rows an unfinished archive purge has already exported are not, and
+        # the archive side counts them
+        if filters.get("exclude_archive_copies"):
+            unpurged = db.query(Archive.archive_id).filter(
+                Archive.storage_path.isnot(None),
+                Archive.purged_at.is_(None)
+            ).first()
+            return unpurged is None
+        return True
+
+    # Total for a log listing using the requested count strategy
+    @staticmethod
+    def count_logs(db: Session, *, count_mode: str = "exact", **filters) -> dict:
+        """
+        count_mode:
+          exact    - COUNT(*) over every matching row
+          estimate - planner row estimate from EXPLAIN, no scan
+          capped   - exact up to LOG_COUNT_CAP, then reported as "cap+"
+          cached   - exact count reused for LOG_COUNT_CACHE_TTL_SECONDS per filter set
+        Returns total, the mode used and whether total is exact.
+        """
+        if count_mode == "estimate":
+            total = LogRepository.estimate_logs(db, **filters)
+            return {"total": total, "count_mode": "estimate", "total_is_exact": False}
+
+        if count_mode == "capped":
+            total, exceeded = LogRepository.count_logs_capped(db, cap=settings.LOG_COUNT_CAP, **filters)
+            return {"total": total, "count_mode": "capped", "total_is_exact": not exceeded}
+
+        if count_mode == "cached":
+            key = LogService._count_cache_key(filters)
+            total = _count_cache.get(key)
+            if total is None:
+                total = LogRepository.count_logs(db, **filters)
+                _count_cache.set(key, total)
+            return {"total": total, "count_mode": "cached", "total_is_exact": True}
+
+        total = LogRepository.count_logs(db, **filters)
+        return {"total": total, "count_mode": "exact", "total_is_exact": True}
+
+    @staticmethod
+    def _count_cache_key(filters: dict) -> tuple:
+        # Empty filters are dropped and values trimmed so equivalent requests share an entry
+        normalised = []
+        for name, value in filters.items():
+            if value is None or str(value).strip() == "":
+                continue
+            normalised.append((name, str(value).strip()))
+        return tuple(sorted(normalised))
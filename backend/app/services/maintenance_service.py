@@ -0,0 +1,80 @@
+import threading
+import traceback
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.archive_service import ArchiveService
+from app.services.file_deletion_service import FileDeletionService
+from app.services.partition_service import PartitionService
+from app.services.retention_service import RetentionService
+
+
+# pg advisory lock key so only one worker runs maintenance at a time
+MAINTENANCE_LOCK_KEY = 4821001
+
+# Set to make the loop start its next pass now instead of at the next interval
+_wakeup = threading.Event()
+_loop_thread = None
+
+
+def run_maintenance() -> dict:
+    """One maintenance pass over the log tables, in its own session."""
+    db = SessionLocal()
+    # Held on its own connection: the session returns its connection to the
+    # pool at each commit, and a session-level lock would go with it
+    lock_conn = db.get_bind().connect()
+    locked = False
+    try:
+        locked = lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        ).scalar()
+        lock_conn.commit()
+        if not locked:
+            return {"skipped": "another worker holds the maintenance lock"}
+
+        report = {
+            "partitions": PartitionService.run_maintenance(db),
+            "archive_purges": ArchiveService.resume_purges(db),
+            "file_deletions": FileDeletionService.resume_pending(db),
+            "retention": RetentionService.enforce(db),
+        }
+        print(f"Maintenance: {report}")
+        return report
+
+    except Exception:
+        db.rollback()
+        print("--- MAINTENANCE ERROR ---")
+        print(traceback.format_exc())
+        return {"error": True}
+    finally:
+        if locked:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+            lock_conn.commit()
+        lock_conn.close()
+        db.close()
+
+
+def start_maintenance_loop() -> threading.Thread:
+    """Run maintenance now and then every MAINTENANCE_INTERVAL_MINUTES on a daemon thread."""
+    global _loop_thread
+
+    def _loop():
+        while True:
+            run_maintenance()
+            # Requests that arrive during a pass fold into one follow-up pass
+            _wakeup.wait(settings.MAINTENANCE_INTERVAL_MINUTES * 60)
+            _wakeup.clear()
+
+    _loop_thread = threading.Thread(target=_loop, name="log-maintenance", daemon=True)
+    _loop_thread.start()
+    return _loop_thread
+
+
+def request_maintenance() -> bool:
+    """Wake the maintenance loop for a pass now; False when this process runs no loop."""
+    if _loop_thread is None or not _loop_thread.is_alive():
+        return False
+    _wakeup.set()
+    return True
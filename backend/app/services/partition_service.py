@@ -0,0 +1,160 @@
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.file_stats_service import FileStatsService
+from app.services.rollup_service import RollupService
+
+
+PARENT_TABLE = "log_entries"
+DEFAULT_PARTITION = "log_entries_default"
+
+# pg_get_expr() output: FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-11-01 00:00:00+00')
+BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class PartitionService:
+    """
+    Maintenance for the range-partitioned log_entries table.
+    Keeps upcoming partitions created ahead of ingestion and detaches
+    partitions that fall entirely outside the retention window.
+    """
+
+    # Check whether log_entries is partitioned (false on un-migrated databases)
+    @staticmethod
+    def is_partitioned(db: Session) -> bool:
+        return bool(db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table"
+            ),
+            {"table": PARENT_TABLE}
+        ).scalar())
+
+    # Period containing `day` for the configured interval: (start, end, partition name)
+    @staticmethod
+    def period_for(day: date, interval: str) -> Tuple[date, date, str]:
+        if interval == "day":
+            start = day
+            end = day + timedelta(days=1)
+            name = f"{PARENT_TABLE}_p{start:%Y_%m_%d}"
+        else:
+            start = day.replace(day=1)
+            end = (start + timedelta(days=32)).replace(day=1)
+            name = f"{PARENT_TABLE}_p{start:%Y_%m}"
+        return start, end, name
+
+    # List attached partitions with their [start, end) bounds
+    @staticmethod
+    def list_partitions(db: Session) -> List[dict]:
+        rows = db.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table"
+            ),
+            {"table": PARENT_TABLE}
+        ).all()
+
+        partitions = []
+        for name, bound in rows:
+            match = BOUND_PATTERN.search(bound or "")
+            partitions.append({
+                "name": name,
+                "start": datetime.fromisoformat(match.group(1)) if match else None,
+                "end": datetime.fromisoformat(match.group(2)) if match else None,
+            })
+        return partitions
+
+    # Create the default partition plus the current and next N periods
+    @staticmethod
+    def ensure_partitions(db: Session, ahead: Optional[int] = None) -> List[str]:
+        interval = settings.LOG_PARTITION_INTERVAL
+        ahead = settings.LOG_PARTITION_PREMAKE if ahead is None else ahead
+
+        existing = {p["name"] for p in PartitionService.list_partitions(db)}
+        created = []
+
+        # Rows outside every range (e.g. historical uploads) land here
+        if DEFAULT_PARTITION not in existing:
+            db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+            created.append(DEFAULT_PARTITION)
+
+        day = datetime.now(timezone.utc).date()
+        for _ in range(ahead + 1):
+            start, end, name = PartitionService.period_for(day, interval)
+            if name not in existing:
+                try:
+                    # Savepoint: fails if the default partition already holds rows for this range
+                    with db.begin_nested():
+                        db.execute(text(
+                            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                            f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') "
+                            f"TO ('{end.isoformat()} 00:00:00+00')"
+                        ))
+                    created.append(name)
+                except DBAPIError as exc:
+                    print(f"Partition {name} not created: {exc.orig}")
+            day = end
+
+        db.commit()
+        return created
+
+    # Detach and drop partitions whose whole range is older than the retention window
+    @staticmethod
+    def detach_expired(db: Session, retention_days: Optional[int] = None) -> List[str]:
+        retention_days = settings.LOG_PARTITION_RETENTION_DAYS if retention_days is None else retention_days
+        if not retention_days:
+            return []
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        return [p["name"] for p in PartitionService.detach_before(db, cutoff)]
+
+    # Detach and drop every partition that ends at or before `cutoff`.
+    # Returns [{"name", "rows", "bytes"}], bytes being the partition's size (table + indexes + toast).
+    @staticmethod
+    def detach_before(db: Session, cutoff: datetime) -> List[dict]:
+        detached = []
+
+        for partition in PartitionService.list_partitions(db):
+            if partition["end"] is None or partition["end"] > cutoff:
+                continue
+            size = db.execute(
+                text("SELECT pg_total_relation_size(CAST(:name AS regclass))"), {"name": partition["name"]}
+            ).scalar()
+            # Per-file counts of the rows about to go, for the raw_files stats
+            groups = db.execute(text(
+                f"SELECT file_id, severity_id, category_id, environment_id, count(*) "
+                f"FROM {partition['name']} GROUP BY 1, 2, 3, 4"
+            )).all()
+            db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition['name']}"))
+            db.execute(text(f"DROP TABLE {partition['name']}"))
+            # Partitions are UTC-aligned, so their rows map onto whole rollup hours
+            RollupService.delete_range(db, partition["start"], partition["end"])
+            FileStatsService.remove_groups(db, groups)
+            detached.append({
+                "name": partition["name"],
+                "rows": sum(g[4] for g in groups),
+                "bytes": int(size or 0),
+            })
+
+        db.commit()
+        return detached
+
+    # Full maintenance pass
+    @staticmethod
+    def run_maintenance(db: Session) -> dict:
+        if not PartitionService.is_partitioned(db):
+            return {"partitioned": False, "created": [], "detached": []}
+
+        created = PartitionService.ensure_partitions(db)
+        detached = PartitionService.detach_expired(db)
+        return {"partitioned": True, "created": created, "detached": detached}
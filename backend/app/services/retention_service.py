@@ -0,0 +1,273 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.log_entries import Environment, LogSeverity
+from app.models.raw_file import RawFile
+from app.models.retention_policy import RetentionPolicy
+from app.repositories.retention_repository import RetentionRepository
+from app.repositories.team_repository import TeamRepository
+from app.services.dashboard_cache import DashboardCache
+from app.services.file_stats_service import FileStatsService
+from app.services.partition_service import PartitionService
+from app.services.rollup_service import RollupService
+
+
+# Worst replay lag over all connected standbys; NULL (idle, caught up) counts as 0
+REPLICATION_LAG_SQL = "SELECT COALESCE(max(EXTRACT(EPOCH FROM replay_lag)), 0) FROM pg_stat_replication"
+
+LAG_POLL_SECONDS = 5
+
+# Columns a policy can pin; unset ones match every row
+SCOPE_COLUMNS = ("team_id", "environment_id", "severity_id")
+
+
+class RetentionService:
+    """
+    Retention policies and their enforcement.
+
+    Each row is kept for as long as the policy that governs it says: of the
+    active policies covering the row, the most specific one (most scope
+    columns set), and the longest retention among equally specific ones.
+    So "ERROR for a year" keeps ERROR rows past an unscoped 30-day policy,
+    and "DEBUG for a week" still removes DEBUG rows before it.
+
+    Whole partitions are only detached once they end before the cutoff of
+    every active policy, and only when an unscoped policy covers the rows no
+    other policy does; everything else is deleted oldest first in
+    RETENTION_BATCH_ROWS transactions that also update the hourly rollups
+    and raw_files stats. Batches are paced (RETENTION_BATCH_PAUSE_SECONDS)
+    and hold off while a standby lags, so WAL volume and replication delay
+    stay bounded.
+    """
+
+    # Create policy
+    @staticmethod
+    def create_policy(db: Session, *, team_id: Optional[int] = None, environment_code: Optional[str] = None,
+                      severity_code: Optional[str] = None, retain_days: int) -> RetentionPolicy:
+        if team_id is not None and not TeamRepository.get_by_id(db, team_id):
+            raise ValueError("Team not found")
+
+        environment_id = None
+        if environment_code:
+            environment_id = db.query(Environment.environment_id) \
+                .filter(Environment.environment_code == environment_code).scalar()
+            if environment_id is None:
+                raise ValueError(f"Unknown environment: {environment_code}")
+
+        severity_id = None
+        if severity_code:
+            severity_id = db.query(LogSeverity.severity_id) \
+                .filter(LogSeverity.severity_code == severity_code).scalar()
+            if severity_id is None:
+                raise ValueError(f"Unknown severity: {severity_code}")
+
+        policy = RetentionPolicy(
+            team_id=team_id,
+            environment_id=environment_id,
+            severity_id=severity_id,
+            retain_days=retain_days,
+            is_active=True
+        )
+        return RetentionRepository.create_policy(db, policy)
+
+    # List policies
+    @staticmethod
+    def list_policies(db: Session) -> List[RetentionPolicy]:
+        return RetentionRepository.list_policies(db)
+
+    # Update retain_days / is_active
+    @staticmethod
+    def update_policy(db: Session, policy_id: int, *, retain_days: Optional[int] = None,
+                      is_active: Optional[bool] = None) -> RetentionPolicy:
+        policy = RetentionRepository.get_by_id(db, policy_id)
+        if not policy:
+            raise ValueError("Retention policy not found")
+
+        if retain_days is not None:
+            policy.retain_days = retain_days
+        if is_active is not None:
+            policy.is_active = is_active
+        db.commit()
+        db.refresh(policy)
+        return policy
+
+    # Delete policy
+    @staticmethod
+    def delete_policy(db: Session, policy_id: int):
+        policy = RetentionRepository.get_by_id(db, policy_id)
+        if not policy:
+            raise ValueError("Retention policy not found")
+        RetentionRepository.delete_policy(db, policy)
+
+    # One enforcement pass over every active policy (maintenance hook).
+    # RETENTION_MAX_ROWS_PER_RUN is shared out: each policy may delete an equal
+    # share of what is left, so one with a large backlog cannot starve the rest,
+    # and a share a policy does not use passes on to the policies after it.
+    # Detached partitions cost no row-by-row WAL and do not count against it.
+    @staticmethod
+    def enforce(db: Session) -> List[dict]:
+        budget = settings.RETENTION_MAX_ROWS_PER_RUN
+        policies = RetentionRepository.list_policies(db, active_only=True)
+        reports = []
+
+        for i, policy in enumerate(policies):
+            share = budget // (len(policies) - i)
+            report = RetentionService._enforce_policy(db, policy, share, policies)
+            reports.append(report)
+            budget -= report["deleted_rows"] - report["detached_rows"]
+            if report["stopped"]:
+                break
+        return reports
+
+    @staticmethod
+    def _enforce_policy(db: Session, policy: RetentionPolicy, budget: int,
+                        policies: List[RetentionPolicy]) -> dict:
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=policy.retain_days)
+        report = {
+            "policy_id": policy.policy_id,
+            "cutoff": cutoff.isoformat(),
+            "deleted_rows": 0,
+            "reclaimed_bytes": 0,
+            "detached_partitions": [],
+            "detached_rows": 0,
+            "stopped": None,
+        }
+        file_ids = set()
+
+        # 1. The unscoped policy that governs the rows no other policy covers drops
+        # whole partitions past every policy's cutoff: no row-by-row WAL at all
+        condition = RetentionService._expiry_condition(policy, policies, cutoff)
+        detach_cutoff = RetentionService._detach_cutoff(policies, now)
+        governs_uncovered = condition is not None and RetentionService._specificity(policy) == 0
+        if governs_uncovered and detach_cutoff and PartitionService.is_partitioned(db):
+            for partition in PartitionService.detach_before(db, detach_cutoff):
+                report["detached_partitions"].append(partition["name"])
+                report["detached_rows"] += partition["rows"]
+                report["deleted_rows"] += partition["rows"]
+                report["reclaimed_bytes"] += partition["bytes"]
+
+        # 2. The rows it governs that are older than its cutoff go in paced batches
+        # (none when more specific or longer policies govern everything it covers)
+        where, params = condition if condition is not None else (None, None)
+        batch_rows = settings.RETENTION_BATCH_ROWS
+        deleted = 0
+        while where is not None and deleted < budget:
+            if not RetentionService._wait_for_standbys(db):
+                report["stopped"] = "replication lag"
+                break
+
+            size = min(batch_rows, budget - deleted)
+            batch = RollupService.delete_batch(db, where, params, size)
+            FileStatsService.remove_groups(db, batch["groups"])
+            RollupService.prune(db)
+            db.commit()
+
+            deleted += batch["rows"]
+            report["deleted_rows"] += batch["rows"]
+            report["reclaimed_bytes"] += batch["bytes"]
+            file_ids.update(g[0] for g in batch["groups"] if g[0] is not None)
+            if batch["rows"] < size:
+                break
+
+            # Next batch starts at the newest timestamp removed so far
+            if "from_ts" not in params:
+                where += " AND log_timestamp >= :from_ts"
+            params["from_ts"] = batch["last_ts"]
+            time.sleep(settings.RETENTION_BATCH_PAUSE_SECONDS)
+
+        policy.last_run_at = datetime.now(timezone.utc)
+        policy.last_deleted_rows = report["deleted_rows"]
+        policy.last_reclaimed_bytes = report["reclaimed_bytes"]
+        db.commit()
+
+        if report["deleted_rows"]:
+            RetentionService._invalidate_dashboards(db, policy, file_ids)
+        print(f"Retention policy {policy.policy_id}: {report}")
+        return report
+
+    # Number of scope columns the policy sets
+    @staticmethod
+    def _specificity(policy: RetentionPolicy) -> int:
+        return sum(getattr(policy, column) is not None for column in SCOPE_COLUMNS)
+
+    # True when `other` rather than `policy` decides how long the rows both
+    # cover are kept (see the class docstring); False for disjoint scopes
+    @staticmethod
+    def _overrides(other: RetentionPolicy, policy: RetentionPolicy) -> bool:
+        if other.policy_id == policy.policy_id:
+            return False
+        for column in SCOPE_COLUMNS:
+            mine, theirs = getattr(policy, column), getattr(other, column)
+            if mine is not None and theirs is not None and mine != theirs:
+                return False
+        a, b = RetentionService._specificity(other), RetentionService._specificity(policy)
+        return a > b or (a == b and other.retain_days > policy.retain_days)
+
+    # WHERE clause and params for the rows `policy` governs that are older than
+    # `cutoff`; None when another policy governs every row it covers
+    @staticmethod
+    def _expiry_condition(policy: RetentionPolicy, policies: List[RetentionPolicy], cutoff: datetime):
+        where = "log_timestamp < :cutoff"
+        params = {"cutoff": cutoff}
+        for column in SCOPE_COLUMNS:
+            value = getattr(policy, column)
+            if value is not None:
+                where += f" AND {column} = :{column}"
+                params[column] = value
+
+        # Rows an overriding policy also covers are left to it; the IS NOT NULL
+        # keeps a NULL column from turning the whole NOT (...) into NULL
+        for other in policies:
+            if not RetentionService._overrides(other, policy):
+                continue
+            clauses = []
+            for column in SCOPE_COLUMNS:
+                value = getattr(other, column)
+                if value is not None:
+                    name = f"p{other.policy_id}_{column}"
+                    clauses.append(f"{column} IS NOT NULL AND {column} = :{name}")
+                    params[name] = value
+            if not clauses:
+                return None
+            where += " AND NOT (" + " AND ".join(clauses) + ")"
+        return where, params
+
+    # Partitions ending before this hold only rows every policy has expired;
+    # None when no unscoped policy covers the rows the others do not
+    @staticmethod
+    def _detach_cutoff(policies: List[RetentionPolicy], now: datetime) -> Optional[datetime]:
+        if not any(RetentionService._specificity(p) == 0 for p in policies):
+            return None
+        return now - timedelta(days=max(p.retain_days for p in policies))
+
+    # Block while any standby replays further behind than allowed; False once
+    # RETENTION_LAG_WAIT_SECONDS have passed without it catching up
+    @staticmethod
+    def _wait_for_standbys(db: Session) -> bool:
+        waited = 0
+        while True:
+            lag = float(db.execute(text(REPLICATION_LAG_SQL)).scalar() or 0)
+            # Don't sit on an open transaction (and its snapshot) while waiting
+            db.commit()
+            if lag <= settings.RETENTION_MAX_REPLICATION_LAG_SECONDS:
+                return True
+            if waited >= settings.RETENTION_LAG_WAIT_SECONDS:
+                return False
+            print(f"Retention paused: standby replay lag {lag:.1f}s")
+            time.sleep(LAG_POLL_SECONDS)
+            waited += LAG_POLL_SECONDS
+
+    @staticmethod
+    def _invalidate_dashboards(db: Session, policy: RetentionPolicy, file_ids: set):
+        DashboardCache.invalidate(team_id=policy.team_id)
+        if not file_ids:
+            return
+        owners = db.query(RawFile.team_id, RawFile.uploaded_by).filter(RawFile.file_id.in_(file_ids)).distinct().all()
+        for team_id, uploaded_by in owners:
+            DashboardCache.invalidate(team_id=team_id, user_id=uploaded_by)
@@ -0,0 +1,246 @@
+from typing import Dict, List, Optional
+
+from psycopg2.extras import execute_values
+from sqlalchemy import func, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.models.log_entries import Environment, LogCategory, LogSeverity
+from app.models.log_rollups import LogRollupHourly, LogRollupPending
+from app.repositories.log_repository import FACET_COLUMNS, split_grouping_sets
+
+
+ROLLUP_COLUMNS = "bucket_hour, team_id, environment_id, severity_id, category_id, log_count"
+
+
+def rollup_upsert_sql(source: str, sign: int = 1) -> str:
+    """
+    INSERT ... SELECT that folds the rows of `source` (a table, CTE or VALUES
+    alias exposing log_timestamp, team_id, environment_id, severity_id and
+    category_id) into log_rollups_hourly, adding (sign=1) or subtracting
+    (sign=-1) their counts. Hours are truncated in UTC by Postgres itself so
+    increments and decrements always land on the same bucket.
+    """
+    return (
+        f"INSERT INTO log_rollups_hourly ({ROLLUP_COLUMNS}) "
+        f"SELECT date_trunc('hour', log_timestamp, 'UTC'), "
+        f"COALESCE(team_id, 0), COALESCE(environment_id, 0), "
+        f"COALESCE(severity_id, 0), COALESCE(category_id, 0), "
+        f"{'-' if sign < 0 else ''}count(*) "
+        f"FROM {source} GROUP BY 1, 2, 3, 4, 5 "
+        f"ON CONFLICT (bucket_hour, team_id, environment_id, severity_id, category_id) "
+        f"DO UPDATE SET log_count = log_rollups_hourly.log_count + EXCLUDED.log_count"
+    )
+
+
+# Bucket key of a log row, as rollup_upsert_sql groups it
+BUCKET_KEY_SQL = (
+    "date_trunc('hour', log_timestamp, 'UTC') AS bucket_hour, "
+    "COALESCE(team_id, 0) AS team_id, COALESCE(environment_id, 0) AS environment_id, "
+    "COALESCE(severity_id, 0) AS severity_id, COALESCE(category_id, 0) AS category_id"
+)
+
+
+def pending_release_sql(source: str) -> str:
+    """
+    UPDATE that subtracts the rows of `source` (exposing file_id plus the
+    rollup columns) from the counts held in log_rollups_pending, so a held
+    file's rows are never subtracted twice once they leave log_entries.
+    """
+    return (
+        f"UPDATE log_rollups_pending p SET log_count = p.log_count - r.n "
+        f"FROM (SELECT file_id, {BUCKET_KEY_SQL}, count(*) AS n "
+        f"FROM {source} GROUP BY 1, 2, 3, 4, 5, 6) r "
+        f"WHERE p.file_id = r.file_id AND p.bucket_hour = r.bucket_hour "
+        f"AND p.team_id = r.team_id AND p.environment_id = r.environment_id "
+        f"AND p.severity_id = r.severity_id AND p.category_id = r.category_id"
+    )
+
+
+# One statement: delete the matching log rows and subtract them from the rollups
+DELETE_WITH_ROLLUP_SQL = (
+    "WITH removed AS ("
+    "DELETE FROM log_entries WHERE {where} "
+    "RETURNING log_timestamp, file_id, team_id, environment_id, severity_id, category_id), "
+    "released AS (" + pending_release_sql("removed") + ") "
+    + rollup_upsert_sql("removed", sign=-1)
+)
+
+# Bounded variant: removes the oldest :batch_rows matching rows and summarises
+# them per (file, severity, category, environment) with the newest timestamp
+# and the row bytes freed, so a large delete can run as small committed
+# transactions that each start where the last one ended
+BATCH_DELETE_WITH_ROLLUP_SQL = (
+    "WITH removed AS ("
+    "DELETE FROM log_entries WHERE (log_id, log_timestamp) IN ("
+    "SELECT log_id, log_timestamp FROM log_entries WHERE {where} "
+    "ORDER BY log_timestamp LIMIT :batch_rows) "
+    "RETURNING log_timestamp, file_id, team_id, environment_id, severity_id, category_id, "
+    "pg_column_size(log_entries.*) AS row_bytes), "
+    "rolled_up AS (" + rollup_upsert_sql("removed", sign=-1) + "), "
+    "released AS (" + pending_release_sql("removed") + ") "
+    "SELECT file_id, severity_id, category_id, environment_id, "
+    "count(*), max(log_timestamp), sum(row_bytes) "
+    "FROM removed GROUP BY 1, 2, 3, 4"
+)
+
+class RollupService:
+    """
+    Keeps log_rollups_hourly in step with log_entries.
+    Every change runs inside the caller's transaction; the caller commits.
+
+    Files awaiting deletion have their counts held in log_rollups_pending
+    until the purge is done; visible_counts() is what readers should sum.
+    """
+
+    # Rollup rows net of held files: bucket_hour, team_id, environment_id,
+    # severity_id, category_id and log_count, like log_rollups_hourly
+    @staticmethod
+    def visible_counts():
+        held = [LogRollupPending.bucket_hour, LogRollupPending.team_id, LogRollupPending.environment_id,
+                LogRollupPending.severity_id, LogRollupPending.category_id]
+        return union_all(
+            select(LogRollupHourly.bucket_hour, LogRollupHourly.team_id, LogRollupHourly.environment_id,
+                   LogRollupHourly.severity_id, LogRollupHourly.category_id, LogRollupHourly.log_count),
+            select(*held, (-LogRollupPending.log_count).label("log_count"))
+        ).subquery("rollups")
+
+    # Hold back the counts of a file's rows (those matching `where`) from
+    # readers while its deletion is pending; runs in the request's transaction
+    @staticmethod
+    def hold_file(db: Session, file_id: int, where: str, params: dict):
+        db.execute(text(
+            f"INSERT INTO log_rollups_pending (file_id, {ROLLUP_COLUMNS}) "
+            f"SELECT :held_file_id, {BUCKET_KEY_SQL}, count(*) "
+            f"FROM log_entries WHERE {where} GROUP BY 2, 3, 4, 5, 6 "
+            f"ON CONFLICT DO NOTHING"
+        ), {**params, "held_file_id": file_id})
+
+    # Drop whatever is still held for a file once its rows are gone
+    @staticmethod
+    def release_file(db: Session, file_id: int):
+        db.execute(text("DELETE FROM log_rollups_pending WHERE file_id = :file_id"), {"file_id": file_id})
+
+    # Add rows that were inserted through the ORM:
+    # (log_timestamp, team_id, environment_id, severity_id, category_id) tuples
+    @staticmethod
+    def record_rows(db: Session, rows: list):
+        if not rows:
+            return
+        sql = rollup_upsert_sql(
+            "(VALUES %s) AS v (log_timestamp, team_id, environment_id, severity_id, category_id)"
+        )
+        cursor = db.connection().connection.cursor()
+        try:
+            execute_values(
+                cursor, sql, rows,
+                template="(%s::timestamptz, %s::bigint, %s::smallint, %s::smallint, %s::smallint)",
+                page_size=10000
+            )
+        finally:
+            cursor.close()
+
+    # Delete a single log row and subtract it from the rollups
+    @staticmethod
+    def delete_log(db: Session, log_id: int):
+        db.execute(text(DELETE_WITH_ROLLUP_SQL.format(where="log_id = :log_id")), {"log_id": log_id})
+        RollupService.prune(db)
+
+    # Delete the oldest `batch_rows` rows matching `where` (with the rollup decrement).
+    # Returns rows deleted, the newest timestamp among them, the row bytes freed
+    # and (file_id, severity_id, category_id, environment_id, rows) groups
+    @staticmethod
+    def delete_batch(db: Session, where: str, params: dict, batch_rows: int) -> dict:
+        groups = db.execute(
+            text(BATCH_DELETE_WITH_ROLLUP_SQL.format(where=where)),
+            {**params, "batch_rows": batch_rows}
+        ).all()
+        return {
+            "rows": sum(g[4] for g in groups),
+            "last_ts": max((g[5] for g in groups), default=None),
+            "bytes": sum(int(g[6] or 0) for g in groups),
+            "groups": [tuple(g[:5]) for g in groups],
+        }
+
+    # Run delete_batch until nothing matches, committing after every batch.
+    # Each batch starts at the newest timestamp the previous one removed;
+    # `before_batch()` opens each batch's transaction (e.g. transaction-local
+    # settings) and `on_batch(batch)` runs inside it (e.g. progress).
+    # Returns the number of rows deleted.
+    @staticmethod
+    def delete_in_batches(db: Session, where: str, params: dict, batch_rows: int,
+                          on_batch=None, before_batch=None) -> int:
+        params = dict(params)
+        condition = where
+        total = 0
+        while True:
+            if before_batch:
+                before_batch()
+            batch = RollupService.delete_batch(db, condition, params, batch_rows)
+            RollupService.prune(db)
+            if on_batch:
+                on_batch(batch)
+            db.commit()
+
+            total += batch["rows"]
+            if batch["rows"] < batch_rows:
+                return total
+            condition = where + " AND log_timestamp >= :from_ts"
+            params["from_ts"] = batch["last_ts"]
+
+    # Drop buckets that reached zero
+    @staticmethod
+    def prune(db: Session):
+        db.execute(text("DELETE FROM log_rollups_hourly WHERE log_count <= 0"))
+        db.execute(text("DELETE FROM log_rollups_pending WHERE log_count <= 0"))
+
+    # Drop the buckets of a removed [start, end) time range (e.g. a dropped partition)
+    @staticmethod
+    def delete_range(db: Session, start, end):
+        for table in ("log_rollups_hourly", "log_rollups_pending"):
+            db.execute(
+                text(f"DELETE FROM {table} WHERE bucket_hour >= :start AND bucket_hour < :end"),
+                {"start": start, "end": end}
+            )
+
+    # Facet counts (see LogRepository.facet_counts) summed from the visible buckets
+    # instead of log_entries. Only valid for filters the rollup key holds: team, severity,
+    # category, environment and whole-hour [start_ts, end_ts) bounds.
+    @staticmethod
+    def facet_counts(db: Session, facets: List[str], *, team_id=None, severity_code=None,
+                     category_name=None, environment_code=None, start_ts=None,
+                     end_ts=None) -> Dict[str, Dict[Optional[int], int]]:
+        rollups = RollupService.visible_counts()
+        columns = [rollups.c[FACET_COLUMNS[name][0]] for name in facets]
+        total = func.sum(rollups.c.log_count)
+        query = select(*columns, *(func.grouping(c) for c in columns), total)
+
+        if team_id:
+            query = query.where(rollups.c.team_id == team_id)
+        if severity_code and severity_code.strip():
+            query = query.where(rollups.c.severity_id == select(LogSeverity.severity_id)
+                                .where(LogSeverity.severity_code == severity_code).scalar_subquery())
+        if category_name and category_name.strip():
+            query = query.where(rollups.c.category_id == select(LogCategory.category_id)
+                                .where(LogCategory.category_name == category_name).scalar_subquery())
+        if environment_code and environment_code.strip():
+            query = query.where(rollups.c.environment_id == select(Environment.environment_id)
+                                .where(Environment.environment_code == environment_code).scalar_subquery())
+        if start_ts:
+            query = query.where(rollups.c.bucket_hour >= start_ts)
+        if end_ts:
+            query = query.where(rollups.c.bucket_hour < end_ts)
+
+        query = query.group_by(func.grouping_sets(*columns)).having(total > 0)
+        counts = split_grouping_sets(db.execute(query).all(), facets)
+        # 0 is the rollups' stand-in for NULL
+        return {
+            name: {(value or None): n for value, n in values.items()}
+            for name, values in counts.items()
+        }
+
+    # Recompute every bucket from log_entries (backfill / repair)
+    @staticmethod
+    def rebuild(db: Session):
+        db.execute(text("DELETE FROM log_rollups_hourly"))
+        db.execute(text(rollup_upsert_sql("log_entries")))
+        db.commit()
@@ -9,6 +9,7 @@ from app.models.user import User
 from app.models.user_credentials import UserCredential
 from app.repositories.user_repository import UserRepository
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.dashboard_cache import DashboardCache
 
  
 # Password hashing context
@@ -130,11 +131,15 @@ class UserService:
         try:
             db.commit()
             db.refresh(user)
-            return user
         except IntegrityError:
             db.rollback()
             raise ValueError("User update failed")
 
+        # A deactivated user loses the token-only 304 on the dashboards
+        if user.is_deleted or not user.is_active:
+            DashboardCache.revoke_user(user.user_id)
+        return user
+
     
     @staticmethod
     def delete_user(db: Session, user: User) -> None:
@@ -142,4 +147,5 @@ class UserService:
         user.is_deleted = True
         user.is_active = False 
         db.commit()
+        DashboardCache.revoke_user(user.user_id)
     # Now the user is still in the DB, but cannot log in.
@@ -0,0 +1,69 @@
+-- Convert log_entries into a table range-partitioned on log_timestamp.
+--
+-- Run once, in a maintenance window (rows are copied into the new table).
+-- Monthly partitions are created for the span of existing data plus the
+-- next three months; after that PartitionService keeps upcoming partitions
+-- created and detaches expired ones (see LOG_PARTITION_* settings).
+
+BEGIN;
+
+ALTER TABLE log_entries RENAME TO log_entries_legacy;
+ALTER INDEX IF EXISTS log_entries_pkey RENAME TO log_entries_legacy_pkey;
+ALTER INDEX IF EXISTS ix_log_entries_log_id RENAME TO ix_log_entries_legacy_log_id;
+
+CREATE TABLE log_entries (
+    log_id          BIGINT NOT NULL DEFAULT nextval('log_entries_log_id_seq'),
+    file_id         BIGINT REFERENCES raw_files (file_id) ON DELETE CASCADE,
+    log_timestamp   TIMESTAMPTZ NOT NULL,
+    severity_id     SMALLINT REFERENCES log_severities (severity_id),
+    category_id     SMALLINT REFERENCES log_categories (category_id),
+    environment_id  SMALLINT REFERENCES environments (environment_id),
+    message_line    TEXT NOT NULL,
+    created_at      TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (log_id, log_timestamp)
+) PARTITION BY RANGE (log_timestamp);
+
+-- Keep the id sequence alive when the legacy table is dropped
+ALTER SEQUENCE log_entries_log_id_seq OWNED BY log_entries.log_id;
+
+CREATE TABLE log_entries_default PARTITION OF log_entries DEFAULT;
+
+DO $$
+DECLARE
+    month_start DATE;
+    last_month  DATE := date_trunc('month', (now() + interval '3 months') AT TIME ZONE 'UTC')::date;
+BEGIN
+    -- Months are UTC months, like the ones PartitionService creates, whatever
+    -- the TimeZone of the session running this script
+    SELECT date_trunc('month', coalesce(min(log_timestamp), now()) AT TIME ZONE 'UTC')::date
+      INTO month_start
+      FROM log_entries_legacy;
+
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF log_entries FOR VALUES FROM (%L) TO (%L)',
+            'log_entries_p' || to_char(month_start, 'YYYY_MM'),
+            month_start::timestamp AT TIME ZONE 'UTC',
+            (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO log_entries (
+    log_id, file_id, log_timestamp, severity_id, category_id,
+    environment_id, message_line, created_at
+)
+SELECT
+    log_id, file_id, log_timestamp, severity_id, category_id,
+    environment_id, message_line, created_at
+FROM log_entries_legacy;
+
+CREATE INDEX ix_log_entries_log_id ON log_entries (log_id);
+CREATE INDEX ix_log_entries_log_timestamp ON log_entries (log_timestamp);
+
+DROP TABLE log_entries_legacy;
+
+ANALYZE log_entries;
+
+COMMIT;
@@ -0,0 +1,15 @@
+-- Full-text search on log_entries.message_line.
+--
+-- Adds a stored tsvector column (the 'simple' config: lowercased words,
+-- no stemming or stop words, which suits log text) and a GIN index on it.
+-- Adding a stored generated column rewrites every partition.
+
+BEGIN;
+
+ALTER TABLE log_entries
+    ADD COLUMN message_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', message_line)) STORED;
+
+CREATE INDEX ix_log_entries_message_tsv ON log_entries USING gin (message_tsv);
+
+COMMIT;
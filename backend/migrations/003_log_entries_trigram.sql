@@ -0,0 +1,10 @@
+-- Trigram index on log_entries.message_line for substring and regex search.
+--
+-- Lets ILIKE '%fragment%' and ~* 'regex' (search_mode=substring / regex,
+-- and the non-word fallback of search_mode=auto) use an index instead of
+-- scanning every row. Needs the pg_trgm extension.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_log_entries_message_trgm
+    ON log_entries USING gin (message_line gin_trgm_ops);
@@ -0,0 +1,42 @@
+-- Denormalise raw_files.team_id / uploaded_by onto log_entries.
+--
+-- Team- and uploader-scoped log queries can then filter and order on
+-- log_entries alone: (team_id, log_timestamp DESC) and
+-- (uploaded_by, log_timestamp DESC) serve them as one index range scan.
+-- New rows get both columns at ingest; existing rows are backfilled
+-- below in log_id batches, committing after each batch so locks and
+-- WAL stay bounded. Run outside an explicit transaction.
+
+ALTER TABLE log_entries ADD COLUMN IF NOT EXISTS team_id BIGINT;
+ALTER TABLE log_entries ADD COLUMN IF NOT EXISTS uploaded_by BIGINT;
+
+DO $$
+DECLARE
+    batch_size CONSTANT BIGINT := 50000;
+    batch_start BIGINT;
+    max_id      BIGINT;
+BEGIN
+    SELECT min(log_id), max(log_id) INTO batch_start, max_id FROM log_entries;
+
+    WHILE batch_start IS NOT NULL AND batch_start <= max_id LOOP
+        UPDATE log_entries le
+           SET team_id = rf.team_id,
+               uploaded_by = rf.uploaded_by
+          FROM raw_files rf
+         WHERE rf.file_id = le.file_id
+           AND le.log_id >= batch_start
+           AND le.log_id < batch_start + batch_size
+           AND le.team_id IS NULL
+           AND le.uploaded_by IS NULL;
+
+        COMMIT;
+        batch_start := batch_start + batch_size;
+    END LOOP;
+END $$;
+
+CREATE INDEX IF NOT EXISTS ix_log_entries_team_ts
+    ON log_entries (team_id, log_timestamp DESC);
+CREATE INDEX IF NOT EXISTS ix_log_entries_uploader_ts
+    ON log_entries (uploaded_by, log_timestamp DESC);
+
+ANALYZE log_entries;
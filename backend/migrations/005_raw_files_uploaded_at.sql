@@ -0,0 +1,8 @@
+-- Index raw_files.uploaded_at for the file list's date filter and ordering.
+--
+-- FileRepository.list_files now filters with a half-open
+-- uploaded_at >= start AND uploaded_at < end range instead of
+-- date(uploaded_at) = day, so this index can serve the range scan.
+
+CREATE INDEX IF NOT EXISTS ix_raw_files_uploaded_at
+    ON raw_files (uploaded_at);
@@ -0,0 +1,35 @@
+-- Hourly rollups of log_entries for the dashboard.
+--
+-- One row per (UTC hour, team, environment, severity, category) holding the
+-- number of log rows in that bucket; 0 in an id column means "not set".
+-- Ingestion, file deletion and single-log deletion keep it up to date in the
+-- same statement that changes log_entries (see RollupService).
+-- date_trunc(..., 'UTC') needs PostgreSQL 12+.
+
+CREATE TABLE IF NOT EXISTS log_rollups_hourly (
+    bucket_hour     TIMESTAMPTZ NOT NULL,
+    team_id         BIGINT      NOT NULL DEFAULT 0,
+    environment_id  SMALLINT    NOT NULL DEFAULT 0,
+    severity_id     SMALLINT    NOT NULL DEFAULT 0,
+    category_id     SMALLINT    NOT NULL DEFAULT 0,
+    log_count       BIGINT      NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_hour, team_id, environment_id, severity_id, category_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_log_rollups_hourly_team_hour
+    ON log_rollups_hourly (team_id, bucket_hour);
+
+CREATE INDEX IF NOT EXISTS ix_log_rollups_hourly_empty
+    ON log_rollups_hourly (bucket_hour) WHERE log_count <= 0;
+
+-- Backfill from existing rows (same statement RollupService.rebuild runs)
+BEGIN;
+DELETE FROM log_rollups_hourly;
+INSERT INTO log_rollups_hourly (bucket_hour, team_id, environment_id, severity_id, category_id, log_count)
+SELECT date_trunc('hour', log_timestamp, 'UTC'),
+       COALESCE(team_id, 0), COALESCE(environment_id, 0),
+       COALESCE(severity_id, 0), COALESCE(category_id, 0),
+       count(*)
+FROM log_entries
+GROUP BY 1, 2, 3, 4, 5;
+COMMIT;
@@ -0,0 +1,60 @@
+-- Ingest-time summary stats on raw_files.
+--
+-- line_count, min/max_log_ts and per-severity / category / environment
+-- counts ({code: rows} JSONB) let file listings filter on log content and
+-- archiving report record counts from one raw_files row instead of
+-- joining or counting log_entries. New uploads fill them at ingest
+-- (FileStatsService); existing files are backfilled below.
+
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS line_count BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS min_log_ts TIMESTAMPTZ;
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS max_log_ts TIMESTAMPTZ;
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS severity_counts JSONB NOT NULL DEFAULT '{}'::jsonb;
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS category_counts JSONB NOT NULL DEFAULT '{}'::jsonb;
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS environment_counts JSONB NOT NULL DEFAULT '{}'::jsonb;
+
+BEGIN;
+
+UPDATE raw_files f
+SET line_count = t.line_count,
+    min_log_ts = t.min_log_ts,
+    max_log_ts = t.max_log_ts
+FROM (
+    SELECT file_id, count(*) AS line_count,
+           min(log_timestamp) AS min_log_ts, max(log_timestamp) AS max_log_ts
+    FROM log_entries
+    GROUP BY file_id
+) t
+WHERE f.file_id = t.file_id;
+
+UPDATE raw_files f
+SET severity_counts = t.counts
+FROM (
+    SELECT c.file_id, jsonb_object_agg(s.severity_code, c.n) AS counts
+    FROM (SELECT file_id, severity_id, count(*) AS n FROM log_entries GROUP BY 1, 2) c
+    JOIN log_severities s ON s.severity_id = c.severity_id
+    GROUP BY c.file_id
+) t
+WHERE f.file_id = t.file_id;
+
+UPDATE raw_files f
+SET category_counts = t.counts
+FROM (
+    SELECT c.file_id, jsonb_object_agg(lc.category_name, c.n) AS counts
+    FROM (SELECT file_id, category_id, count(*) AS n FROM log_entries GROUP BY 1, 2) c
+    JOIN log_categories lc ON lc.category_id = c.category_id
+    GROUP BY c.file_id
+) t
+WHERE f.file_id = t.file_id;
+
+UPDATE raw_files f
+SET environment_counts = t.counts
+FROM (
+    SELECT c.file_id, jsonb_object_agg(e.environment_code, c.n) AS counts
+    FROM (SELECT file_id, environment_id, count(*) AS n FROM log_entries GROUP BY 1, 2) c
+    JOIN environments e ON e.environment_id = c.environment_id
+    GROUP BY c.file_id
+) t
+WHERE f.file_id = t.file_id;
+
+COMMIT;
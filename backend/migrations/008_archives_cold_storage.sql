@@ -0,0 +1,20 @@
+-- Cold-tier archives.
+--
+-- Archiving a file now exports its log rows to a zstd-compressed Parquet
+-- file under uploads/archives (ArchiveService) and deletes them from
+-- log_entries in small batches. The archive row records where the file
+-- lives, its size and timestamp bounds, and purged_at once the hot rows
+-- are gone (maintenance finishes any purge that was interrupted).
+--
+-- Archives made before this change keep their rows in log_entries and
+-- have storage_path NULL.
+
+ALTER TABLE archives ADD COLUMN IF NOT EXISTS storage_path TEXT;
+ALTER TABLE archives ADD COLUMN IF NOT EXISTS size_bytes BIGINT;
+ALTER TABLE archives ADD COLUMN IF NOT EXISTS min_log_ts TIMESTAMPTZ;
+ALTER TABLE archives ADD COLUMN IF NOT EXISTS max_log_ts TIMESTAMPTZ;
+ALTER TABLE archives ADD COLUMN IF NOT EXISTS purged_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS ix_archives_unpurged
+    ON archives (archive_id)
+    WHERE purged_at IS NULL AND storage_path IS NOT NULL;
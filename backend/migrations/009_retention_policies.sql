@@ -0,0 +1,21 @@
+-- Retention policies.
+--
+-- Each row keeps log_entries rows for retain_days, optionally scoped to a
+-- team, environment and/or severity (NULL = any). RetentionService enforces
+-- them from the maintenance loop: unscoped policies detach whole expired
+-- partitions, everything else is deleted in small throttled batches.
+
+CREATE TABLE IF NOT EXISTS retention_policies (
+    policy_id BIGSERIAL PRIMARY KEY,
+    team_id BIGINT REFERENCES teams (team_id),
+    environment_id SMALLINT REFERENCES environments (environment_id),
+    severity_id SMALLINT REFERENCES log_severities (severity_id),
+    retain_days INTEGER NOT NULL CHECK (retain_days > 0),
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    last_run_at TIMESTAMPTZ,
+    last_deleted_rows BIGINT NOT NULL DEFAULT 0,
+    last_reclaimed_bytes BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS ix_retention_policies_policy_id ON retention_policies (policy_id);
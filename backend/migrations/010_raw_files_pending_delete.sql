@@ -0,0 +1,16 @@
+-- Background file deletion.
+--
+-- DELETE /files/{id} now only flags the file (is_pending_delete) and
+-- returns; FileDeletionService removes its log rows in small batches,
+-- tracking progress in deleted_rows, and drops the raw_files row last.
+-- Every file and log query excludes flagged files in the meantime;
+-- maintenance resumes purges interrupted by a restart.
+
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS is_pending_delete BOOLEAN NOT NULL DEFAULT false;
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS delete_requested_at TIMESTAMPTZ;
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS delete_requested_by BIGINT;
+ALTER TABLE raw_files ADD COLUMN IF NOT EXISTS deleted_rows BIGINT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS ix_raw_files_pending_delete
+    ON raw_files (file_id)
+    WHERE is_pending_delete;
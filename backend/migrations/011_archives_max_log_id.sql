@@ -0,0 +1,11 @@
+-- Bound archive purges by what was exported.
+--
+-- Manual archiving now runs as a background task, and the purge no longer
+-- runs under the row lock taken for the export. max_log_id records the
+-- highest log_id written to the Parquet file; the purge only deletes rows
+-- up to it, so a row that never reached the archive is never removed.
+--
+-- Archives made before this change have max_log_id NULL and purge by
+-- file_id as before.
+
+ALTER TABLE archives ADD COLUMN IF NOT EXISTS max_log_id BIGINT;
@@ -0,0 +1,30 @@
+-- Rollup counts held back for files awaiting background deletion.
+--
+-- DELETE /files/{id} hides a file at once, but its rows leave log_entries
+-- (and log_rollups_hourly) only as the purge works through them. The
+-- request now copies the file's per-bucket counts here, and readers of the
+-- rollups subtract them, so dashboards and facet counts stay on the rollups
+-- while the purge runs. Every batch delete releases the counts of the rows
+-- it removes, and the purge drops what is left once the file is gone.
+
+CREATE TABLE IF NOT EXISTS log_rollups_pending (
+    file_id         BIGINT      NOT NULL,
+    bucket_hour     TIMESTAMPTZ NOT NULL,
+    team_id         BIGINT      NOT NULL DEFAULT 0,
+    environment_id  SMALLINT    NOT NULL DEFAULT 0,
+    severity_id     SMALLINT    NOT NULL DEFAULT 0,
+    category_id     SMALLINT    NOT NULL DEFAULT 0,
+    log_count       BIGINT      NOT NULL DEFAULT 0,
+    PRIMARY KEY (file_id, bucket_hour, team_id, environment_id, severity_id, category_id)
+);
+
+-- Backfill files already pending (same statement RollupService.hold_file runs)
+INSERT INTO log_rollups_pending (file_id, bucket_hour, team_id, environment_id, severity_id, category_id, log_count)
+SELECT l.file_id, date_trunc('hour', l.log_timestamp, 'UTC'),
+       COALESCE(l.team_id, 0), COALESCE(l.environment_id, 0),
+       COALESCE(l.severity_id, 0), COALESCE(l.category_id, 0),
+       count(*)
+FROM log_entries l
+JOIN raw_files r ON r.file_id = l.file_id AND r.is_pending_delete
+GROUP BY 1, 2, 3, 4, 5, 6
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,12 @@
+import os
+
+# app.core.config.Settings requires these; the unit tests never connect to a database
+for key, value in {
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "SECRET_KEY": "test",
+}.items():
+    os.environ.setdefault(key, value)
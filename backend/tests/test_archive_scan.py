@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.repositories.archive_repository import ARCHIVE_SCHEMA, ArchiveScan, _FileScan, row_key
+from app.repositories.log_repository import ROW_COLUMNS, decode_cursor, encode_cursor
+from app.services.log_service import LogService
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+GROUP_ROWS = 4
+
+
+def _row(log_id, minutes, severity="INFO"):
+    return {
+        "log_id": log_id,
+        "log_timestamp": T0 + timedelta(minutes=minutes),
+        "severity_code": severity,
+        "category_name": "APP",
+        "environment_code": "PROD",
+        "file_name": "a.log",
+        "team_name": "core",
+        "message_line": f"event {log_id}",
+        "file_id": 1,
+        "team_id": 1,
+        "uploaded_by": 1,
+        "environment_id": 1,
+        "severity_id": 1,
+        "category_id": 1,
+    }
+
+
+def _write(path, rows):
+    # Oldest first, GROUP_ROWS per row group, as ArchiveService exports them
+    rows = sorted(rows, key=row_key)
+    table = pa.Table.from_pylist(rows, schema=ARCHIVE_SCHEMA)
+    pq.write_table(table, path, row_group_size=GROUP_ROWS)
+    return str(path)
+
+
+def _scan(**kwargs):
+    options = dict(start_ts=None, end_ts=None, cursor_key=None, equals={}, search=None, keep=100, count=True)
+    options.update(kwargs)
+    return _FileScan(**options)
+
+
+def _surviving_groups(path, scan):
+    metadata = pq.ParquetFile(path).metadata
+    columns = {name: i for i, name in enumerate(metadata.schema.names)}
+    return [i for i in range(metadata.num_row_groups) if scan._may_match(metadata.row_group(i), columns)]
+
+
+@pytest.fixture
+def three_groups(tmp_path):
+    # Group 0: minutes 0-3 (INFO), group 1: 10-13 (ERROR), group 2: 20-23 (INFO)
+    rows = []
+    for group, severity in enumerate(["INFO", "ERROR", "INFO"]):
+        for n in range(GROUP_ROWS):
+            log_id = group * GROUP_ROWS + n + 1
+            rows.append(_row(log_id, group * 10 + n, severity))
+    return _write(tmp_path / "archive.parquet", rows)
+
+
+def test_time_range_prunes_row_groups(three_groups):
+    scan = _scan(start_ts=T0 + timedelta(minutes=10), end_ts=T0 + timedelta(minutes=20))
+    assert _surviving_groups(three_groups, scan) == [1]
+
+
+def test_equality_filter_prunes_row_groups(three_groups):
+    assert _surviving_groups(three_groups, _scan(equals={"severity_code": "ERROR"})) == [1]
+
+
+def test_cursor_prunes_only_when_not_counting(three_groups):
+    cursor_key = (T0 + timedelta(minutes=5), 0)
+    assert _surviving_groups(three_groups, _scan(cursor_key=cursor_key, count=False)) == [0]
+    # The total covers every match, so counting scans read past the cursor
+    assert _surviving_groups(three_groups, _scan(cursor_key=cursor_key, count=True)) == [0, 1, 2]
+
+
+def test_scan_returns_newest_rows_and_full_count(three_groups):
+    rows, matched, _ = _scan(keep=3, equals={"severity_code": "INFO"}).run(three_groups)
+    assert [r["log_id"] for r in rows] == [12, 11, 10]
+    assert list(rows[0]) == list(ROW_COLUMNS)
+    assert matched == 8
+
+
+def _live_page(rows, keep, cursor):
+    # What LogRepository.list_logs returns: newest first, strictly after the cursor
+    ordered = sorted(rows, key=row_key, reverse=True)
+    if cursor:
+        cursor_key = decode_cursor(cursor)
+        ordered = [r for r in ordered if row_key(r) < cursor_key]
+    return ordered[:keep]
+
+
+def test_live_and_archive_pages_merge_across_cursors(tmp_path):
+    # 30 rows, several sharing a timestamp, split between the two tiers
+    rows = [_row(log_id, log_id // 3) for log_id in range(1, 31)]
+    archived = [r for r in rows if r["log_id"] % 2]
+    live = [{k: r[k] for k in ROW_COLUMNS} for r in rows if not r["log_id"] % 2]
+    path = _write(tmp_path / "archive.parquet", archived)
+
+    limit, cursor, seen = 7, None, []
+    while True:
+        start, keep = LogService._archive_window(limit, 0, cursor)
+        scan = _scan(keep=keep, cursor_key=decode_cursor(cursor) if cursor else None)
+        page = LogService._merge_archive_page(
+            (_live_page(live, keep, cursor), {"total": len(live), "count_mode": "exact", "total_is_exact": True}),
+            ArchiveScan([path], scan).run(),
+            count_mode="exact", limit=limit, offset=0, cursor=cursor
+        )
+        # Every page reports the same total, cursor or not
+        assert page["total"] == 30
+        seen += [item["log_id"] for item in page["items"]]
+        if not page["has_more"]:
+            break
+        last = page["items"][-1]
+        cursor = encode_cursor(last["log_timestamp"], last["log_id"])
+
+    assert seen == [r["log_id"] for r in sorted(rows, key=row_key, reverse=True)]
+
+
+def test_offset_page_skips_into_the_merged_run(tmp_path):
+    rows = [_row(log_id, log_id) for log_id in range(1, 11)]
+    path = _write(tmp_path / "archive.parquet", [r for r in rows if r["log_id"] > 5])
+    live = [{k: r[k] for k in ROW_COLUMNS} for r in rows if r["log_id"] <= 5]
+
+    start, keep = LogService._archive_window(3, 4, None)
+    page = LogService._merge_archive_page(
+        (_live_page(live, keep, None), None),
+        ArchiveScan([path], _scan(keep=keep, count=False)).run(),
+        count_mode="has_more", limit=3, offset=4, cursor=None
+    )
+    assert [item["log_id"] for item in page["items"]] == [6, 5, 4]
+    assert page["has_more"] is True
+
+
+def test_facets_count_every_match_including_rows_before_the_cursor(three_groups):
+    scan = _scan(keep=2, cursor_key=(T0 + timedelta(minutes=12), 0), facets=["severity", "environment"])
+    _, matched, facets = scan.run(three_groups)
+    assert matched == 12
+    assert facets == {"severity": {"INFO": 8, "ERROR": 4}, "environment": {"PROD": 12}}
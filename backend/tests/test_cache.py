@@ -0,0 +1,18 @@
+from app.core.cache import VersionCounter
+
+
+def test_bump_advances_only_the_named_scopes():
+    versions = VersionCounter()
+    versions.bump("global", ("user", 1))
+    assert versions.get("global") == 1
+    assert versions.get(("user", 1)) == 1
+    assert versions.get(("user", 2)) == 0
+
+
+def test_changed_within_tracks_the_last_bump():
+    versions = VersionCounter()
+    assert not versions.changed_within("global", 60)
+    versions.bump("global")
+    assert versions.changed_within("global", 60)
+    assert not versions.changed_within("global", 0)
+    assert not versions.changed_within(("team", 1), 60)
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from app.services.log_parser.csv_frames import parse_csv_frames
+
+CSV = (
+    "timestamp,severity,service,message\n"
+    "2025-01-01 10:00:00,ERROR,api,disk full\n"
+    "2025-01-01 10:00:00,ERROR,api,disk nearly full\n"
+    "2025-01-01 10:00:00,ERROR,api,disk full\n"
+    "2025-01-01 10:00:01,INFO,api,disk full\n"
+    "2025-01-01 10:00:00,ERROR,api,disk full\n"
+)
+
+
+def _messages(text, chunk_rows):
+    return [
+        (str(row.timestamp), row.severity, row.message)
+        for frame in parse_csv_frames(text, chunk_rows)
+        for row in frame.itertuples()
+    ]
+
+
+def test_duplicates_dropped_within_and_across_chunks():
+    assert _messages(CSV, chunk_rows=2) == [
+        ("2025-01-01 10:00:00", "ERROR", "disk full"),
+        ("2025-01-01 10:00:00", "ERROR", "disk nearly full"),
+        ("2025-01-01 10:00:01", "INFO", "disk full"),
+    ]
+
+
+def test_distinct_rows_survive_a_64_bit_hash_collision(monkeypatch):
+    # Every row hashes the same under pandas; none of the distinct ones may be lost
+    def colliding_hash(obj, *args, **kwargs):
+        return pd.Series(0, index=obj.index, dtype="uint64")
+
+    monkeypatch.setattr(pd.util, "hash_pandas_object", colliding_hash)
+    assert len(_messages(CSV, chunk_rows=100)) == 3
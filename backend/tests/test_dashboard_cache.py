@@ -0,0 +1,45 @@
+import asyncio
+
+from fastapi import Response
+from starlette.requests import Request
+
+from app.services.dashboard_cache import DashboardCache
+
+SCOPE = ("user", 901)
+
+
+def _request(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def _cached_etag():
+    async def build():
+        return {"total_logs": 1}
+
+    response = Response()
+    asyncio.run(DashboardCache.respond(SCOPE, _request(), response, build))
+    return response.headers["etag"]
+
+
+def test_not_modified_needs_a_recent_active_check():
+    etag = _cached_etag()
+    # Token alone is not enough until a full request has seen the user active
+    assert DashboardCache.not_modified(SCOPE, _request(etag), 901) is None
+
+    DashboardCache.mark_active(901)
+    assert DashboardCache.not_modified(SCOPE, _request(etag), 901).status_code == 304
+    assert DashboardCache.not_modified(SCOPE, _request(etag), None) is None
+    assert DashboardCache.not_modified(SCOPE, _request('"stale"'), 901) is None
+
+
+def test_revoked_user_gets_no_304():
+    etag = _cached_etag()
+    DashboardCache.mark_active(901)
+    DashboardCache.revoke_user(901)
+    assert DashboardCache.not_modified(SCOPE, _request(etag), 901) is None
+
+    # Re-checked and re-cached under the new version, the 304 comes back
+    etag = _cached_etag()
+    DashboardCache.mark_active(901)
+    assert DashboardCache.not_modified(SCOPE, _request(etag), 901).status_code == 304
@@ -0,0 +1,44 @@
+from app.services.log_parser.parsers import parse_text
+
+
+def _events(text, **caps):
+    # LOG_PATTERN keeps the "service:" prefix in the message
+    return [entry.message for entry in parse_text(text, **caps)]
+
+
+def test_continuation_lines_join_the_event():
+    text = (
+        "2025-01-01 10:00:00 ERROR api: request failed\n"
+        "Traceback (most recent call last):\n"
+        "  File \"app.py\", line 1\n"
+        "2025-01-01 10:00:01 INFO api: next\n"
+    )
+    assert _events(text) == [
+        "api: request failed\nTraceback (most recent call last):\n  File \"app.py\", line 1",
+        "api: next",
+    ]
+
+
+def test_no_lines_appended_after_the_first_overflow():
+    text = (
+        "2025-01-01 10:00:00 ERROR api: boom\n"
+        "short one\n"
+        + "x" * 50 + "\n"
+        "short two\n"
+        "short three\n"
+    )
+    (message,) = _events(text, max_event_chars=30)
+    # The later short lines would fit, but the event must stay a contiguous prefix
+    assert message == "api: boom\nshort one\n... [3 more lines truncated]"
+
+
+def test_marker_when_first_continuation_line_is_over_the_cap():
+    text = "2025-01-01 10:00:00 ERROR api: boom\n" + "y" * 100 + "\n"
+    (message,) = _events(text, max_event_chars=30)
+    assert message == "api: boom\n... [1 more lines truncated]"
+
+
+def test_line_cap():
+    text = "2025-01-01 10:00:00 ERROR api: boom\n" + "".join(f"frame {i}\n" for i in range(5))
+    (message,) = _events(text, max_event_lines=2)
+    assert message == "api: boom\nframe 0\nframe 1\n... [3 more lines truncated]"
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+
+import orjson
+
+from app.api.routes.log_routes import _empty_page, _page_response
+from app.repositories.log_repository import ROW_COLUMNS, decode_cursor
+from app.schemas.log import LogListResponse
+from app.services.log_service import LogService
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _item(log_id):
+    row = {column: None for column in ROW_COLUMNS}
+    row.update(log_id=log_id, log_timestamp=T0 + timedelta(minutes=log_id), message_line=f"event {log_id}")
+    return row
+
+
+def _body(response):
+    # What the client receives, checked against the declared response model
+    payload = orjson.loads(response.body)
+    assert set(payload) == set(LogListResponse.model_fields)
+    return payload, LogListResponse.model_validate(payload)
+
+
+def test_page_payload_matches_the_response_model():
+    live = [_item(n) for n in (5, 4, 3)]
+    page = LogService._merge_archive_page(
+        (live, {"total": 7, "count_mode": "exact", "total_is_exact": True}),
+        ([_item(2)], 2, {}),
+        count_mode="exact", limit=3, offset=0, cursor=None
+    )
+    payload, parsed = _body(_page_response(page, limit=3))
+
+    assert parsed.total == 9
+    assert [item.log_id for item in parsed.items] == [5, 4, 3]
+    assert set(payload["items"][0]) == set(ROW_COLUMNS)
+    assert decode_cursor(parsed.next_cursor)[1] == 3
+
+
+def test_empty_page_payload_matches_the_response_model():
+    payload, parsed = _body(_empty_page())
+    assert payload == LogListResponse(total=0, items=[]).model_dump()
+    assert parsed.next_cursor is None
@@ -0,0 +1,17 @@
+import threading
+
+from app.services import maintenance_service
+
+
+def test_request_wakes_the_loop_for_another_pass(monkeypatch):
+    passes = threading.Semaphore(0)
+    monkeypatch.setattr(maintenance_service, "run_maintenance", passes.release)
+    monkeypatch.setattr(maintenance_service, "_loop_thread", None)
+
+    assert maintenance_service.request_maintenance() is False
+
+    maintenance_service.start_maintenance_loop()
+    assert passes.acquire(timeout=5)
+    # The next scheduled pass is an hour away; a request runs one now
+    assert maintenance_service.request_maintenance() is True
+    assert passes.acquire(timeout=5)
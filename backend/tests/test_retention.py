@@ -0,0 +1,132 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.repositories.retention_repository import RetentionRepository
+from app.services.retention_service import RetentionService
+
+
+def _run(monkeypatch, backlogs, budget, detached=None, stop_at=None):
+    # enforce() over fake policies: policy i has backlogs[i] expired rows
+    # (plus detached[i] rows in whole partitions); returns rows deleted per policy
+    detached = detached or {}
+    policies = [SimpleNamespace(policy_id=i) for i in range(len(backlogs))]
+    shares = []
+
+    def enforce_policy(db, policy, share, policies):
+        shares.append(share)
+        rows = min(backlogs[policy.policy_id], share)
+        extra = detached.get(policy.policy_id, 0)
+        return {
+            "policy_id": policy.policy_id,
+            "deleted_rows": rows + extra,
+            "detached_rows": extra,
+            "stopped": "replication lag" if policy.policy_id == stop_at else None,
+        }
+
+    monkeypatch.setattr(settings, "RETENTION_MAX_ROWS_PER_RUN", budget)
+    monkeypatch.setattr(RetentionRepository, "list_policies", lambda db, active_only=False: policies)
+    monkeypatch.setattr(RetentionService, "_enforce_policy", enforce_policy)
+    reports = RetentionService.enforce(None)
+    return [r["deleted_rows"] - r["detached_rows"] for r in reports], shares
+
+
+def test_large_backlog_does_not_starve_later_policies(monkeypatch):
+    deleted, _ = _run(monkeypatch, [10_000, 10_000, 10_000], budget=900)
+    assert deleted == [300, 300, 300]
+
+
+def test_unused_share_passes_on(monkeypatch):
+    deleted, shares = _run(monkeypatch, [50, 10_000, 10_000], budget=900)
+    assert shares == [300, 425, 425]
+    assert deleted == [50, 425, 425]
+
+
+def test_detached_partitions_do_not_use_the_budget(monkeypatch):
+    deleted, shares = _run(monkeypatch, [0, 10_000], budget=1000, detached={0: 5_000_000})
+    assert shares == [500, 1000]
+    assert deleted == [0, 1000]
+
+
+def test_replication_lag_stops_the_pass(monkeypatch):
+    deleted, _ = _run(monkeypatch, [10, 10, 10], budget=900, stop_at=1)
+    assert deleted == [10, 10]
+
+
+# --- Mixed scoped / unscoped policies: which rows each policy's delete reaches
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+ERROR, DEBUG, INFO = 4, 1, 2
+
+
+def _policy(policy_id, retain_days, team_id=None, environment_id=None, severity_id=None):
+    return SimpleNamespace(policy_id=policy_id, retain_days=retain_days, team_id=team_id,
+                           environment_id=environment_id, severity_id=severity_id)
+
+
+def _survivors(policies, rows):
+    # Run every policy's expiry condition against an in-memory log_entries;
+    # rows are (name, age_days, team_id, environment_id, severity_id)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE log_entries (name, log_timestamp, team_id, environment_id, severity_id)")
+    conn.executemany("INSERT INTO log_entries VALUES (?, ?, ?, ?, ?)", [
+        (name, (NOW - timedelta(days=age)).isoformat(), team, env, sev) for name, age, team, env, sev in rows
+    ])
+    for policy in policies:
+        cutoff = (NOW - timedelta(days=policy.retain_days)).isoformat()
+        condition = RetentionService._expiry_condition(policy, policies, cutoff)
+        if condition is not None:
+            where, params = condition
+            conn.execute(f"DELETE FROM log_entries WHERE {where}", params)
+    return sorted(name for (name,) in conn.execute("SELECT name FROM log_entries"))
+
+
+def test_longer_scoped_policy_keeps_rows_past_an_unscoped_one():
+    policies = [_policy(1, 30), _policy(2, 365, severity_id=ERROR)]
+    rows = [
+        ("error-60d", 60, 1, 1, ERROR),
+        ("error-400d", 400, 1, 1, ERROR),
+        ("info-60d", 60, 1, 1, INFO),
+        ("info-10d", 10, 1, None, INFO),
+    ]
+    assert _survivors(policies, rows) == ["error-60d", "info-10d"]
+
+
+def test_shorter_scoped_policy_still_expires_its_rows():
+    policies = [_policy(1, 90), _policy(2, 7, severity_id=DEBUG)]
+    rows = [("debug-10d", 10, 1, 1, DEBUG), ("info-10d", 10, 1, 1, INFO), ("info-100d", 100, 1, 1, INFO)]
+    assert _survivors(policies, rows) == ["info-10d"]
+
+
+def test_most_specific_then_longest_policy_decides():
+    policies = [
+        _policy(1, 30),
+        _policy(2, 365, severity_id=ERROR),
+        _policy(3, 14, team_id=2),
+        _policy(4, 60, team_id=2, severity_id=ERROR),
+    ]
+    rows = [
+        ("t1-error-200d", 200, 1, 1, ERROR),   # severity policy: a year
+        ("t2-error-50d", 50, 2, 1, ERROR),     # team + severity policy: 60 days
+        ("t2-error-70d", 70, 2, 1, ERROR),
+        ("t2-info-20d", 20, 2, 1, INFO),       # team policy: 14 days
+        ("t3-info-20d", 20, 3, None, INFO),    # unscoped: 30 days
+        ("t3-null-sev-40d", 40, 3, 1, None),
+    ]
+    assert _survivors(policies, rows) == ["t1-error-200d", "t2-error-50d", "t3-info-20d"]
+
+
+def test_rows_no_policy_covers_are_kept():
+    policies = [_policy(1, 7, severity_id=DEBUG)]
+    rows = [("debug-10d", 10, 1, 1, DEBUG), ("info-400d", 400, 1, 1, INFO)]
+    assert _survivors(policies, rows) == ["info-400d"]
+
+
+def test_partitions_detach_only_past_every_policy_cutoff():
+    unscoped, errors = _policy(1, 30), _policy(2, 365, severity_id=ERROR)
+    assert RetentionService._detach_cutoff([unscoped, errors], NOW) == NOW - timedelta(days=365)
+    # Without an unscoped policy some rows are kept forever
+    assert RetentionService._detach_cutoff([errors], NOW) is None
+    # Only the unscoped policy that is not overridden governs the uncovered rows
+    assert RetentionService._expiry_condition(_policy(3, 10), [unscoped, _policy(3, 10)], NOW) is None
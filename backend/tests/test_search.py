@@ -0,0 +1,81 @@
+import pyarrow as pa
+import pytest
+
+from app.repositories.archive_repository import _search_expression
+from app.repositories.log_repository import build_tsquery
+
+
+MESSAGES = [
+    "Connection timeout to db-01",
+    "connected to replica",
+    "disk full on /var",
+    "full disk warning",
+    "DEBUG error while parsing",
+    "user_id=42 logged in",
+    "warn: retrying",
+]
+
+
+def _matches(search, search_mode="auto"):
+    # Messages an archived-file scan would keep for this search
+    expression = _search_expression(search, search_mode)
+    table = pa.table({"message_line": MESSAGES})
+    return table.filter(expression).column("message_line").to_pylist()
+
+
+@pytest.mark.parametrize("search, expected", [
+    ("error", "error"),
+    ("Error Timeout", "error & timeout"),
+    ("conn*", "conn:*"),
+    ("-debug error", "!debug & error"),
+    ("error NOT debug", "error & !debug"),
+    ("error OR warn", "error | warn"),
+    ('"disk full"', "(disk <-> full)"),
+    ('-"disk full"', "!(disk <-> full)"),
+])
+def test_build_tsquery(search, expected):
+    assert build_tsquery(search) == expected
+
+
+@pytest.mark.parametrize("search", ["user_id=42", "", "   "])
+def test_build_tsquery_falls_back_for_non_word_input(search):
+    assert build_tsquery(search) is None
+
+
+def test_word_search_matches_whole_words_only():
+    # "connected" is not the word "connection"
+    assert _matches("connection") == ["Connection timeout to db-01"]
+
+
+def test_prefix_search():
+    assert _matches("conn*") == ["Connection timeout to db-01", "connected to replica"]
+
+
+def test_negated_word():
+    assert _matches("disk -warning") == ["disk full on /var"]
+
+
+def test_or_binds_looser_than_and():
+    # (error & parsing) | warn
+    assert _matches("error parsing OR warn") == ["DEBUG error while parsing", "warn: retrying"]
+
+
+def test_phrase_needs_adjacent_words_in_order():
+    assert _matches('"disk full"') == ["disk full on /var"]
+
+
+def test_non_word_search_falls_back_to_substring():
+    assert _matches("id=42") == ["user_id=42 logged in"]
+    assert _matches("db-0", "substring") == ["Connection timeout to db-01"]
+
+
+def test_text_mode_without_words_matches_nothing():
+    assert _matches("=-=", "text") == []
+
+
+def test_regex_mode():
+    assert _matches(r"^(disk|full)\b", "regex") == ["disk full on /var", "full disk warning"]
+
+
+def test_blank_search_is_no_filter():
+    assert _search_expression("  ", "auto") is None
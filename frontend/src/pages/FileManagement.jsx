@@ -133,7 +133,7 @@ export default function FileManagement() {
     if (window.confirm("Manual Archive: Are you sure?")) {
       try {
         await api.patch(`/files/${id}/archive`);
-        alert("File successfully moved to archives.");
+        alert("Archiving started. The file is marked archived once its logs are moved.");
         fetchFiles();
       } catch (err) { alert("Archive failed."); }
     }